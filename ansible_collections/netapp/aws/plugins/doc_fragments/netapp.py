@@ -42,6 +42,14 @@ options:
     description:
     - Should https certificates be validated?
     type: bool
+  time_out:
+    required: false
+    default: 1800
+    description:
+    - Time to wait for a job to complete, in seconds, at least 1 second.
+    - Job state is polled with an exponential backoff, from 1 second up to 30 seconds.
+    type: int
+    version_added: 21.1.0
 notes:
   - The modules prefixed with aws\\_cvs\\_netapp are built to Manage AWS Cloud Volumes Service .
 """
@@ -29,6 +29,8 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import time
+
 from ansible.module_utils.basic import missing_required_lib
 
 try:
@@ -66,7 +68,8 @@ def aws_cvs_host_argument_spec():
         api_url=dict(required=True, type='str'),
         validate_certs=dict(required=False, type='bool', default=True),
         api_key=dict(required=True, type='str'),
-        secret_key=dict(required=True, type='str')
+        secret_key=dict(required=True, type='str'),
+        time_out=dict(required=False, type='int', default=1800)
     )
 
 
@@ -79,6 +82,12 @@ class AwsCvsRestAPI(object):
         self.verify = self.module.params['validate_certs']
         self.timeout = timeout
         self.url = 'https://' + self.api_url + '/v1/'
+        # progress for each job waited on, job_status is the last one
+        self.jobs = list()
+        self.job_status = None
+        time_out = self.module.params.get('time_out')
+        if time_out is not None and time_out < 1:
+            self.module.fail_json(msg='Error: time_out must be at least 1 second, got: %s' % time_out)
         self.check_required_library()
 
     def check_required_library(self):
@@ -151,9 +160,55 @@ class AwsCvsRestAPI(object):
         method = 'DELETE'
         return self.send_request(method, api, params, json=data)
 
-    def get_state(self, job_id):
-        """ Method to get the state of the job """
-        response, dummy = self.get('Jobs/%s' % job_id)
-        while str(response['state']) not in 'done':
-            response, dummy = self.get('Jobs/%s' % job_id)
-        return 'done'
+    def get_state(self, job_id, timeout=None, max_interval=30, max_retries=3):
+        """ Method to wait for a job to complete, returns 'done'
+            polls with an exponential backoff, from 1 second up to max_interval seconds
+            fails the module if the job fails, if the state cannot be read after max_retries attempts,
+            or if the job does not complete within timeout seconds (time_out option by default)
+            progress is recorded in self.job_status, and appended to self.jobs
+        """
+        if timeout is None:
+            timeout = self.module.params.get('time_out')
+        if timeout is None:
+            timeout = 1800
+        start = time.time()
+        interval = 1
+        slept = 0
+        retries = 0
+        state = None
+        self.job_status = dict(job_id=job_id, state=state, polls=0, elapsed=0)
+        self.jobs.append(self.job_status)
+        while True:
+            response, error = self.get('Jobs/%s' % job_id)
+            elapsed = max(slept, time.time() - start)
+            self.job_status['polls'] += 1
+            self.job_status['elapsed'] = elapsed
+            progress = '%d poll(s) in %.1f seconds' % (self.job_status['polls'], elapsed)
+            if error is not None or not isinstance(response, dict):
+                retries += 1
+                if retries > max_retries:
+                    self.module.fail_json(msg='Error: unable to get state for job %s after %s: %s' % (job_id, progress, error or response),
+                                          jobs=self.jobs)
+            else:
+                retries = 0
+                state = str(response.get('state'))
+                self.job_status['state'] = state
+                self.module.debug('job %s: state %s after %s' % (job_id, state, progress))
+                if state == 'done':
+                    return 'done'
+                if state in ('error', 'failed'):
+                    details = response.get('stateDetails') or response.get('message') or state
+                    self.module.fail_json(msg='Error: job %s failed after %s: %s' % (job_id, progress, details), jobs=self.jobs)
+            if elapsed >= timeout:
+                self.module.fail_json(msg='Error: timeout waiting for job %s, state: %s, after %s' % (job_id, state, progress), jobs=self.jobs)
+            delay = min(interval, timeout - elapsed)
+            time.sleep(delay)
+            slept += delay
+            interval = min(interval * 2, max_interval)
+
+    def wait_on_jobs(self, response):
+        """ wait for the jobs reported in a response, if any """
+        jobs = response.get('jobs') if isinstance(response, dict) else None
+        for job in jobs or []:
+            if isinstance(job, dict) and job.get('jobId') is not None:
+                self.get_state(job['jobId'])
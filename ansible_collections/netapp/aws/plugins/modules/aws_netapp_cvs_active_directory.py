@@ -107,6 +107,14 @@ EXAMPLES = """
 """
 
 RETURN = '''
+jobs:
+  description:
+    - Progress for each job waited on by the module, in the order they were started.
+    - Each entry reports job_id, state, polls, and elapsed time in seconds.
+  returned: always
+  type: list
+  elements: dict
+  version_added: 21.1.0
 '''
 
 from ansible.module_utils.basic import AnsibleModule
@@ -185,6 +193,7 @@ class AwsCvsNetappActiveDir(object):
         response, error = self.rest_api.post(api, data)
 
         if not error:
+            self.rest_api.wait_on_jobs(response)
             return response
         else:
             self.module.fail_json(msg=response['message'])
@@ -198,6 +207,7 @@ class AwsCvsNetappActiveDir(object):
             data = None
             response, error = self.rest_api.delete(api, data)
             if not error:
+                self.rest_api.wait_on_jobs(response)
                 return response
             else:
                 self.module.fail_json(msg=response['message'])
@@ -219,6 +229,7 @@ class AwsCvsNetappActiveDir(object):
 
         response, error = self.rest_api.put(api, data)
         if not error:
+            self.rest_api.wait_on_jobs(response)
             return response
         else:
             self.module.fail_json(msg=response['message'])
@@ -259,7 +270,7 @@ class AwsCvsNetappActiveDir(object):
                 elif cd_action == 'delete':
                     self.delete_activedirectory()
 
-        self.module.exit_json(changed=self.na_helper.changed)
+        self.module.exit_json(changed=self.na_helper.changed, jobs=self.rest_api.jobs)
 
 
 def main():
@@ -159,6 +159,14 @@ EXAMPLES = """
 """
 
 RETURN = """
+jobs:
+  description:
+    - Progress for each job waited on by the module, in the order they were started.
+    - Each entry reports job_id, state, polls, and elapsed time in seconds.
+  returned: always
+  type: list
+  elements: dict
+  version_added: 21.1.0
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -347,7 +355,7 @@ class AwsCvsNetappFileSystem(object):
                 else:   # modify
                     self.update_filesystem(filesystem_id)
                     result_message = "FileSystem Updated"
-        self.module.exit_json(changed=self.na_helper.changed, msg=result_message)
+        self.module.exit_json(changed=self.na_helper.changed, msg=result_message, jobs=self.rest_api.jobs)
 
 
 def main():
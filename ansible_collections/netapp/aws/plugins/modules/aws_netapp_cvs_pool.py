@@ -108,6 +108,14 @@ EXAMPLES = """
 """
 
 RETURN = '''
+jobs:
+  description:
+    - Progress for each job waited on by the module, in the order they were started.
+    - Each entry reports job_id, state, polls, and elapsed time in seconds.
+  returned: always
+  type: list
+  elements: dict
+  version_added: 21.1.0
 '''
 
 from ansible.module_utils.basic import AnsibleModule
@@ -181,9 +189,10 @@ class NetAppAWSCVS(object):
             "vendorID": self.parameters['vendorID']
         }
 
-        dummy, error = self.rest_api.post(api, pool)
+        response, error = self.rest_api.post(api, pool)
         if error is not None:
             self.module.fail_json(changed=False, msg=error)
+        self.rest_api.wait_on_jobs(response)
 
     def update_aws_netapp_cvs_pool(self, update_pool_info, pool_id):
         """
@@ -199,9 +208,10 @@ class NetAppAWSCVS(object):
             "vendorID": update_pool_info['vendorID']
         }
 
-        dummy, error = self.rest_api.put(api, pool)
+        response, error = self.rest_api.put(api, pool)
         if error is not None:
             self.module.fail_json(changed=False, msg=error)
+        self.rest_api.wait_on_jobs(response)
 
     def delete_aws_netapp_cvs_pool(self, pool_id):
         """
@@ -209,10 +219,11 @@ class NetAppAWSCVS(object):
         """
         api = 'Pools/' + pool_id
         data = None
-        dummy, error = self.rest_api.delete(api, data)
+        response, error = self.rest_api.delete(api, data)
 
         if error is not None:
             self.module.fail_json(changed=False, msg=error)
+        self.rest_api.wait_on_jobs(response)
 
     def apply(self):
         """
@@ -254,7 +265,7 @@ class NetAppAWSCVS(object):
                 elif cd_action == 'delete':
                     self.delete_aws_netapp_cvs_pool(current['poolId'])
 
-        self.module.exit_json(changed=self.na_helper.changed)
+        self.module.exit_json(changed=self.na_helper.changed, jobs=self.rest_api.jobs)
 
 
 def main():
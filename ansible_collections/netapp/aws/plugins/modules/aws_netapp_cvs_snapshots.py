@@ -93,6 +93,14 @@ EXAMPLES = """
 """
 
 RETURN = """
+jobs:
+  description:
+    - Progress for each job waited on by the module, in the order they were started.
+    - Each entry reports job_id, state, polls, and elapsed time in seconds.
+  returned: always
+  type: list
+  elements: dict
+  version_added: 21.1.0
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -173,23 +181,26 @@ class AwsCvsNetappSnapshot(object):
     def create_snapshot(self):
         # Create Snapshot
         api = 'Snapshots'
-        dummy, error = self.rest_api.post(api, self.data)
+        response, error = self.rest_api.post(api, self.data)
         if error:
             self.module.fail_json(msg=error)
+        self.rest_api.wait_on_jobs(response)
 
     def rename_snapshot(self, snapshot_id):
         # Rename Snapshot
         api = 'Snapshots/' + snapshot_id
-        dummy, error = self.rest_api.put(api, self.data)
+        response, error = self.rest_api.put(api, self.data)
         if error:
             self.module.fail_json(msg=error)
+        self.rest_api.wait_on_jobs(response)
 
     def delete_snapshot(self, snapshot_id):
         # Delete Snapshot
         api = 'Snapshots/' + snapshot_id
-        dummy, error = self.rest_api.delete(api, self.data)
+        response, error = self.rest_api.delete(api, self.data)
         if error:
             self.module.fail_json(msg=error)
+        self.rest_api.wait_on_jobs(response)
 
     def apply(self):
         """
@@ -230,7 +241,7 @@ class AwsCvsNetappSnapshot(object):
                         # If from_name is not defined, Create from scratch.
                         result_message = "Snapshot Created"
 
-        self.module.exit_json(changed=self.na_helper.changed, msg=result_message)
+        self.module.exit_json(changed=self.na_helper.changed, msg=result_message, jobs=self.rest_api.jobs)
 
 
 def main():
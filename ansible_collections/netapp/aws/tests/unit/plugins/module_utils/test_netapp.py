@@ -0,0 +1,123 @@
+# (c) 2020, NetApp, Inc
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' unit tests for module_utils netapp.py - AwsCvsRestAPI job waiter '''
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+import json
+import pytest
+
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.netapp.aws.tests.unit.compat.mock import patch
+import ansible_collections.netapp.aws.plugins.module_utils.netapp as netapp_utils
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)  # pylint: disable=protected-access
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+
+def fail_json(*args, **kwargs):  # pylint: disable=unused-argument
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+def create_restapi_object(time_out=None):
+    args = {
+        'api_url': 'api_url',
+        'api_key': 'api_key',
+        'secret_key': 'secret_key',
+    }
+    if time_out is not None:
+        args['time_out'] = time_out
+    set_module_args(args)
+    module = basic.AnsibleModule(netapp_utils.aws_cvs_host_argument_spec())
+    module.fail_json = fail_json
+    return netapp_utils.AwsCvsRestAPI(module)
+
+
+def job(state, **kwargs):
+    response = {'jobId': 'job_id', 'state': state}
+    response.update(kwargs)
+    return response, None
+
+
+@patch('time.sleep')
+@patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.get')
+def test_get_state_backoff(mock_get, mock_sleep):
+    ''' the job is polled with an increasing interval until done '''
+    mock_get.side_effect = [job('ongoing'), job('ongoing'), (None, 'transient error'), job('ongoing'), job('done')]
+    rest_api = create_restapi_object()
+    assert rest_api.get_state('job_id') == 'done'
+    assert [args[0][0] for args in mock_sleep.call_args_list] == [1, 2, 4, 8]
+    assert rest_api.job_status == dict(job_id='job_id', state='done', polls=5, elapsed=15)
+    mock_get.assert_called_with('Jobs/job_id')
+
+
+@patch('time.sleep')
+@patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.get')
+def test_get_state_failure(mock_get, mock_sleep):
+    mock_get.side_effect = [job('ongoing'), job('error', stateDetails='not enough space')]
+    rest_api = create_restapi_object()
+    with pytest.raises(AnsibleFailJson) as exc:
+        rest_api.get_state('job_id')
+    assert exc.value.args[0]['msg'] == 'Error: job job_id failed after 2 poll(s) in 1.0 seconds: not enough space'
+    assert exc.value.args[0]['jobs'] == [dict(job_id='job_id', state='error', polls=2, elapsed=1)]
+
+
+@patch('time.sleep')
+@patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.get')
+def test_get_state_timeout(mock_get, mock_sleep):
+    ''' time_out is honored, the last sleep is shortened '''
+    mock_get.return_value = job('ongoing')
+    rest_api = create_restapi_object(time_out=10)
+    with pytest.raises(AnsibleFailJson) as exc:
+        rest_api.get_state('job_id')
+    assert [args[0][0] for args in mock_sleep.call_args_list] == [1, 2, 4, 3]
+    assert exc.value.args[0]['msg'] == 'Error: timeout waiting for job job_id, state: ongoing, after 5 poll(s) in 10.0 seconds'
+
+
+@patch('time.sleep')
+@patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.get')
+def test_get_state_max_retries(mock_get, mock_sleep):
+    mock_get.return_value = None, 'connection error'
+    rest_api = create_restapi_object()
+    with pytest.raises(AnsibleFailJson) as exc:
+        rest_api.get_state('job_id')
+    assert exc.value.args[0]['msg'] == 'Error: unable to get state for job job_id after 4 poll(s) in 7.0 seconds: connection error'
+
+
+@patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.get_state')
+def test_wait_on_jobs(mock_get_state):
+    rest_api = create_restapi_object()
+    rest_api.wait_on_jobs(None)
+    rest_api.wait_on_jobs({'name': 'no job'})
+    assert not mock_get_state.called
+    rest_api.wait_on_jobs({'jobs': [{'jobId': 'job_1'}, {'jobId': 'job_2'}]})
+    assert [args[0][0] for args in mock_get_state.call_args_list] == ['job_1', 'job_2']
+
+
+@patch('time.sleep')
+@patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.get')
+def test_wait_on_jobs_reports_each_job(mock_get, mock_sleep):
+    ''' progress is kept for each job '''
+    mock_get.side_effect = [job('ongoing'), job('done'), job('done')]
+    rest_api = create_restapi_object()
+    rest_api.wait_on_jobs({'jobs': [{'jobId': 'job_1'}, {'jobId': 'job_2'}]})
+    assert [(status['job_id'], status['state'], status['polls']) for status in rest_api.jobs] == [('job_1', 'done', 2), ('job_2', 'done', 1)]
+    assert rest_api.job_status is rest_api.jobs[-1]
+
+
+def test_time_out_below_one_second():
+    ''' 0 is rejected, rather than silently replaced with the default '''
+    with pytest.raises(AnsibleFailJson) as exc:
+        create_restapi_object(time_out=0)
+    assert exc.value.args[0]['msg'] == 'Error: time_out must be at least 1 second, got: 0'
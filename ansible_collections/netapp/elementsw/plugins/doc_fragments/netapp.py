@@ -40,6 +40,14 @@ options:
       - Password for the specified user.
       aliases: ['pass']
       type: str
+  api_version:
+      description:
+      - The Element API version to use, eg 10.1.
+      - When set, connections are created without asking the cluster or node for its supported API versions, saving one request
+        per connection.  Otherwise the current version is requested once for each hostname and port, in each task.
+      - The version is not kept across tasks, so set this option to avoid the request in every task.
+      type: str
+      version_added: 21.1.0
 
 requirements:
   - The modules were developed with SolidFire 10.1
@@ -51,8 +51,11 @@ SF_BYTE_MAP = dict(
 )
 
 try:
-    from solidfire.factory import ElementFactory
+    from solidfire import Element
+    from solidfire.factory import min_sdk_version
     import solidfire.common
+    import requests
+    from requests.auth import HTTPBasicAuth
     HAS_SF_SDK = True
 except ImportError:
     HAS_SF_SDK = False
@@ -69,26 +72,76 @@ def ontap_sf_host_argument_spec():
     return dict(
         hostname=dict(required=True, type='str'),
         username=dict(required=True, type='str', aliases=['user']),
-        password=dict(required=True, type='str', aliases=['pass'], no_log=True)
+        password=dict(required=True, type='str', aliases=['pass'], no_log=True),
+        api_version=dict(required=False, type='str')
     )
 
 
+# one HTTP session per endpoint, shared by all the connections in this process
+SF_SESSIONS = dict()
+# API version per endpoint, as reported by the first connection in this process
+SF_API_VERSIONS = dict()
+
+
+if HAS_SF_SDK:
+    class SessionDispatcher(solidfire.common.CurlDispatcher):
+        ''' same as CurlDispatcher, but connections are kept alive, and reused by all the dispatchers for the same target '''
+        def __init__(self, target, api_version, username, password, verify_ssl=False):
+            endpoint = 'https://%s/json-rpc/%s' % (target, float(api_version))
+            super(SessionDispatcher, self).__init__(endpoint, username, password, verify_ssl)
+            if target not in SF_SESSIONS:
+                SF_SESSIONS[target] = requests.Session()
+            self.session = SF_SESSIONS[target]
+
+        def post(self, data):
+            if self._username is None or self._password is None:
+                raise ValueError("Username or Password is not set")
+            resp = self.session.post(self._endpoint, data=data, verify=self._verify_ssl, timeout=(self._connect_timeout, self._timeout),
+                                     auth=HTTPBasicAuth(self._username, self._password))
+            if resp.text == '':
+                return {"code": resp.status_code, "name": resp.reason, "message": ""}
+            return resp.text
+
+
+def create_element(target, username, password, api_version, timeout):
+    ''' create an Element object, using a shared session
+        when the API version is not known, the target is asked for its current version, and the version is cached
+    '''
+    if api_version is None:
+        api_version = SF_API_VERSIONS.get(target)
+    if api_version is None:
+        element = Element(target, username, password, min_sdk_version, dispatcher=SessionDispatcher(target, min_sdk_version, username, password))
+        element.timeout(timeout)
+        api_version = element.get_api().current_version
+        SF_API_VERSIONS[target] = api_version
+    element = Element(target, username, password, api_version, dispatcher=SessionDispatcher(target, api_version, username, password))
+    element.timeout(timeout)
+    return element
+
+
 def create_sf_connection(module, hostname=None, port=None, raise_on_connection_error=False, timeout=None):
     if hostname is None:
         hostname = module.params['hostname']
     username = module.params['username']
     password = module.params['password']
-    options = dict()
-    if port is not None:
-        options['port'] = port
-    if timeout is not None:
-        options['timeout'] = timeout
+    api_version = module.params.get('api_version')
+    # same defaults as ElementFactory.create
+    target = hostname if port is None or port == 443 else '%s:%s' % (hostname, port)
+    if timeout is None:
+        timeout = 30
 
     if not HAS_SF_SDK:
         module.fail_json(msg="the python SolidFire SDK module is required")
 
+    if api_version is not None:
+        try:
+            if float(api_version) < min_sdk_version:
+                module.fail_json(msg="Error: api_version %s is lower than the minimum version supported by the SDK: %s" % (api_version, min_sdk_version))
+        except ValueError:
+            module.fail_json(msg="Error: api_version is expected to be a number, eg 10.1, got: %s" % api_version)
+
     try:
-        return_val = ElementFactory.create(hostname, username, password, **options)
+        return_val = create_element(target, username, password, api_version, timeout)
     except (solidfire.common.ApiConnectionError, solidfire.common.ApiServerError) as exc:
         if raise_on_connection_error:
             raise exc
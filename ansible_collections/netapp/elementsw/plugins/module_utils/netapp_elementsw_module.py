@@ -24,6 +24,8 @@ class NaElementSWModule(object):
     def __init__(self, elem):
         self.elem_connect = elem
         self.parameters = dict()
+        # active volumes per account, built on first use, see get_volume_index
+        self.volume_index = dict()
 
     def get_volume(self, volume_id):
         """
@@ -101,6 +103,60 @@ class NaElementSWModule(object):
         volume_id = self.get_volume_id(volume, account_id)
         return volume_id
 
+    def get_volume_index(self, account_id):
+        """
+            Return the active volumes for an account, indexed by name and by ID
+            The account volumes are listed once, and the index is reused for the rest of the run
+
+            :param account_id: Account ID (valid)
+            :type account_id: int
+            :return: dict with 'name' and 'id' keys, each a dict of volumes.
+                     With duplicate names, the first volume in the list is indexed, as in get_volume_id.
+            :rtype: dict
+        """
+        if account_id not in self.volume_index:
+            by_name = dict()
+            by_id = dict()
+            volume_list = self.elem_connect.list_volumes_for_account(account_id=account_id)
+            for volume in volume_list.volumes:
+                # skip volumes that are deleted, but not purged yet
+                if str(volume.delete_time) == "":
+                    by_name.setdefault(volume.name, volume)
+                    by_id[volume.volume_id] = volume
+            self.volume_index[account_id] = dict(name=by_name, id=by_id)
+        return self.volume_index[account_id]
+
+    def volumes_exist(self, volumes, account_id):
+        """
+            Return a list of volume IDs, with None for each volume that is not found
+            Same as calling volume_exists for each volume, but names are resolved with the volume index
+
+            :param volumes: Volume IDs or Names
+            :type volumes: list
+            :param account_id: Account ID (valid)
+            :type account_id: int
+            :return: list of Volume IDs, in the same order
+            :rtype: list
+        """
+        index = self.get_volume_index(account_id)
+        volume_ids = list()
+        for volume in volumes:
+            volume_id = None
+            if str(volume).isdigit():
+                if int(volume) in index['id']:
+                    volume_id = int(volume)
+                else:
+                    # the volume may belong to another account
+                    try:
+                        volume_id = self.volume_id_exists(int(volume))
+                    except solidfire.common.ApiServerError:
+                        # don't fail, continue and try by name
+                        pass
+            if volume_id is None and str(volume) in index['name']:
+                volume_id = index['name'][str(volume)].volume_id
+            volume_ids.append(volume_id)
+        return volume_ids
+
     def get_snapshot(self, snapshot_id, volume_id):
         """
             Return snapshot details if found
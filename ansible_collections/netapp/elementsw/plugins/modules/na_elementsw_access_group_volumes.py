@@ -178,8 +178,7 @@ class ElementSWAccessGroupVolumes(object):
         # Validate volume_ids
         # Return volume ids if found, fail if not found
         volume_ids = []
-        for volume in self.volumes:
-            volume_id = self.elementsw_helper.volume_exists(volume, self.account_id)
+        for volume, volume_id in zip(self.volumes, self.elementsw_helper.volumes_exist(self.volumes, self.account_id)):
             if volume_id:
                 volume_ids.append(volume_id)
             else:
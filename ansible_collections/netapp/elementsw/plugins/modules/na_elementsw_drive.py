@@ -65,6 +65,23 @@ options:
         description:
         - Flag to force during a bin sync operation.
         type: 'bool'
+
+    wait_for_completion:
+        description:
+        - Wait for the asynchronous drive operations started by this task to complete.
+        - When adding drives, the operation completes when the block and metadata sync are finished.
+        - Only the asynchronous handles returned for the drives touched by this task are polled, with an increasing delay between polls.
+        type: bool
+        default: false
+        version_added: 21.1.0
+
+    wait_timeout:
+        description:
+        - Maximum time to wait in seconds, when wait_for_completion is true.
+        - The module fails if the operations are still running after this time.
+        type: int
+        default: 3600
+        version_added: 21.1.0
 '''
 
 EXAMPLES = """
@@ -114,6 +131,16 @@ EXAMPLES = """
        force_during_upgrade: false
        force_during_bin_sync: false
 
+   - name: Add the drives of a new node and wait for the sync to complete
+     na_elementsw_drive:
+       hostname: "{{ elementsw_hostname }}"
+       username: "{{ elementsw_username }}"
+       password: "{{ elementsw_password }}"
+       state: present
+       node_ids: sf4805-meg-04
+       wait_for_completion: true
+       wait_timeout: 7200
+
 """
 
 
@@ -124,7 +151,18 @@ msg:
     returned: success
     type: str
 
+drives:
+    description:
+        - Progress for each drive touched by this task, when wait_for_completion is true.
+        - Each entry reports drive_id, async_handle, status (running, complete, or error),
+          and the details or error reported by GetAsyncResult on the last poll.
+    returned: when wait_for_completion is true and a drive operation is started
+    type: list
+    elements: dict
+    version_added: 21.1.0
+
 """
+import time
 import traceback
 
 from ansible.module_utils.basic import AnsibleModule
@@ -133,6 +171,10 @@ import ansible_collections.netapp.elementsw.plugins.module_utils.netapp as netap
 
 HAS_SF_SDK = netapp_utils.has_sf_sdk()
 
+# delay between polls of the asynchronous results, doubled after each poll
+POLL_DELAY_MIN = 2
+POLL_DELAY_MAX = 60
+
 
 class ElementSWDrive(object):
     """
@@ -146,7 +188,9 @@ class ElementSWDrive(object):
             drive_ids=dict(required=False, type='list', elements='str', aliases=['drive_id']),
             node_ids=dict(required=False, type='list', elements='str', aliases=['node_id']),
             force_during_upgrade=dict(required=False, type='bool'),
-            force_during_bin_sync=dict(required=False, type='bool')
+            force_during_bin_sync=dict(required=False, type='bool'),
+            wait_for_completion=dict(required=False, type='bool', default=False),
+            wait_timeout=dict(required=False, type='int', default=3600),
         ))
 
         self.module = AnsibleModule(
@@ -161,8 +205,12 @@ class ElementSWDrive(object):
         self.node_ids = input_params['node_ids']
         self.force_during_upgrade = input_params['force_during_upgrade']
         self.force_during_bin_sync = input_params['force_during_bin_sync']
+        self.wait_for_completion = input_params['wait_for_completion']
+        self.wait_timeout = input_params['wait_timeout']
         self.list_nodes = None
         self.debug = list()
+        # (async_handle, drive ids) for each drive operation started by this task
+        self.async_handles = list()
 
         if HAS_SF_SDK is False:
             self.module.fail_json(
@@ -275,42 +323,117 @@ class ElementSWDrive(object):
         Add Drive available for Cluster storage expansion
         """
         try:
-            self.sfe.add_drives(drives,
-                                force_during_upgrade=self.force_during_upgrade,
-                                force_during_bin_sync=self.force_during_bin_sync)
+            result = self.sfe.add_drives(drives,
+                                         force_during_upgrade=self.force_during_upgrade,
+                                         force_during_bin_sync=self.force_during_bin_sync)
         except Exception as exception_object:
             self.module.fail_json(msg='Error adding drive%s: %s: %s' %
                                   ('s' if len(drives) > 1 else '',
                                    str(drives),
                                    to_native(exception_object)),
                                   exception=traceback.format_exc())
+        self.record_async_handle(result, drives)
 
     def remove_drive(self, drives=None):
         """
         Remove Drive active in Cluster
         """
         try:
-            self.sfe.remove_drives(drives,
-                                   force_during_upgrade=self.force_during_upgrade)
+            result = self.sfe.remove_drives(drives,
+                                            force_during_upgrade=self.force_during_upgrade)
         except Exception as exception_object:
             self.module.fail_json(msg='Error removing drive%s: %s: %s' %
                                   ('s' if len(drives) > 1 else '',
                                    str(drives),
                                    to_native(exception_object)),
                                   exception=traceback.format_exc())
+        self.record_async_handle(result, drives)
 
     def secure_erase(self, drives=None):
         """
         Secure Erase any residual data existing on a drive
         """
         try:
-            self.sfe.secure_erase_drives(drives)
+            result = self.sfe.secure_erase_drives(drives)
         except Exception as exception_object:
             self.module.fail_json(msg='Error cleaning data from drive%s: %s: %s' %
                                   ('s' if len(drives) > 1 else '',
                                    str(drives),
                                    to_native(exception_object)),
                                   exception=traceback.format_exc())
+        self.record_async_handle(result, drives)
+
+    def record_async_handle(self, result, drives):
+        """
+        Keep the asynchronous handle returned for a drive operation, to track its completion
+        """
+        async_handle = getattr(result, 'async_handle', None)
+        if async_handle is not None:
+            self.async_handles.append((async_handle, drives))
+
+    def get_async_result(self, async_handle):
+        """
+        Poll an asynchronous handle, the result is kept on the cluster so that it can be polled again
+        """
+        try:
+            return self.sfe.get_async_result(async_handle, keep_result=True)
+        except Exception as exception_object:
+            self.module.fail_json(msg='Error getting result for async handle %s: %s' % (async_handle, to_native(exception_object)),
+                                  exception=traceback.format_exc())
+
+    def release_async_result(self, async_handle):
+        """
+        Read an asynchronous handle once more without keep_result, so that the cluster releases its result
+        The result was already read, an error is ignored
+        """
+        try:
+            self.sfe.get_async_result(async_handle)
+        except Exception:   # pylint: disable=broad-except
+            pass
+
+    def wait_for_async_handles(self):
+        """
+        Poll the asynchronous handles started by this task until they complete, with an increasing delay between polls
+        Return the progress for each drive
+        """
+        progress = dict()
+        for async_handle, drives in self.async_handles:
+            for drive_id in drives:
+                progress[drive_id] = dict(drive_id=drive_id, async_handle=async_handle, status='running')
+        pending = list(self.async_handles)
+        delay = POLL_DELAY_MIN
+        deadline = time.time() + self.wait_timeout
+        while True:
+            running = list()
+            for async_handle, drives in pending:
+                result = self.get_async_result(async_handle)
+                status = result.get('status')
+                for drive_id in drives:
+                    progress[drive_id]['status'] = 'error' if 'error' in result else status
+                    for key in ('details', 'error'):
+                        if key in result:
+                            progress[drive_id][key] = result[key]
+                if status != 'complete' and 'error' not in result:
+                    running.append((async_handle, drives))
+                else:
+                    self.release_async_result(async_handle)
+            pending = running
+            remaining = deadline - time.time()
+            if not pending or remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, POLL_DELAY_MAX)
+        drives = [progress[drive_id] for async_handle, drives in self.async_handles for drive_id in drives]
+        errors = [drive for drive in drives if drive['status'] == 'error']
+        if errors:
+            self.module.fail_json(msg='Error - drive operation failed for drive%s: %s: %s'
+                                  % ('s' if len(errors) > 1 else '', str([drive['drive_id'] for drive in errors]), errors[0]['error']),
+                                  changed=True, drives=drives)
+        if pending:
+            self.module.fail_json(msg='Error - drive operation still running after %d seconds for drives: %s'
+                                  % (self.wait_timeout, str([drive['drive_id'] for drive in drives if drive['status'] != 'complete'])),
+                                  changed=True, drives=drives)
+        return drives
 
     def apply(self):
         """
@@ -345,6 +468,8 @@ class ElementSWDrive(object):
             elif self.state == "clean":
                 self.secure_erase(action_list)
 
+        if self.wait_for_completion and self.async_handles:
+            self.module.exit_json(changed=changed, drives=self.wait_for_async_handles())
         self.module.exit_json(changed=changed)
 
 
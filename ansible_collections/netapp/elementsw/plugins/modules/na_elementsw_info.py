@@ -47,6 +47,7 @@ options:
     description:
       - When a list of records is returned, this can be used to limit the records to be returned.
       - If more than one key is used, all keys must match.
+      - When a key maps to a parameter of the Element API, eg account_id for cluster_accounts, the records are also selected by the API.
     type: dict
 
   fail_on_error:
@@ -67,6 +68,15 @@ options:
       - force an error when filter is used and no record is matched.
     type: bool
     default: false
+
+  parallelism:
+    description:
+      - Number of subsets to collect concurrently.
+      - Cluster and node subsets use separate connections, so they can be collected at the same time.
+      - The output does not depend on the number of workers.
+    type: int
+    default: 1
+    version_added: 21.1.0
 '''
 
 EXAMPLES = """
@@ -106,6 +116,9 @@ debug:
   type: list
 
 """
+import threading
+from multiprocessing.pool import ThreadPool
+
 from ansible.module_utils.basic import AnsibleModule
 
 import ansible_collections.netapp.elementsw.plugins.module_utils.netapp as netapp_utils
@@ -113,6 +126,18 @@ from ansible_collections.netapp.elementsw.plugins.module_utils.netapp_module imp
 
 HAS_SF_SDK = netapp_utils.has_sf_sdk()
 
+# filter keys that can be passed to the Element API, as a function returning the method arguments
+NATIVE_FILTERS = dict(
+    # ListAccounts does not accept a list of IDs, but returns accounts in ID order starting at start_account_id
+    cluster_accounts=dict(
+        account_id=lambda value: dict(start_account_id=value, limit=1)
+    ),
+)
+
+
+class SubsetError(Exception):
+    '''Raised in a worker thread instead of calling fail_json, the main thread reports the failure'''
+
 
 class ElementSWInfo(object):
     '''
@@ -127,6 +152,7 @@ class ElementSWInfo(object):
             fail_on_error=dict(type='bool', default=False),
             fail_on_key_not_found=dict(type='bool', default=True),
             fail_on_record_not_found=dict(type='bool', default=False),
+            parallelism=dict(type='int', default=1),
         ))
         self.module = AnsibleModule(
             argument_spec=self.argument_spec,
@@ -136,6 +162,8 @@ class ElementSWInfo(object):
         self.na_helper = NetAppModule()
         self.parameters = self.na_helper.set_parameters(self.module.params)
         self.debug = list()
+        # in a worker thread, thread_data.worker is set
+        self.thread_data = threading.local()
 
         if HAS_SF_SDK is False:
             self.module.fail_json(msg="Unable to import the SolidFire Python SDK")
@@ -172,6 +200,23 @@ class ElementSWInfo(object):
         # add telemetry attributes - does not matter if we are using cluster or node here
         # TODO: most if not all get and list APIs do not have an attributes parameter
 
+    def fail_json(self, **kwargs):
+        '''report a failure, a worker thread defers to the main thread'''
+        if getattr(self.thread_data, 'worker', False):
+            raise SubsetError(kwargs)
+        self.module.fail_json(**kwargs)
+
+    def get_native_args(self, name):
+        '''
+        Build the method arguments for the filter keys supported by the Element API
+        The records are still filtered after the call, as the API may return more records
+        '''
+        kwargs = dict()
+        for key, value in (self.parameters.get('filter') or dict()).items():
+            if key in NATIVE_FILTERS.get(name, dict()) and isinstance(value, int) and not isinstance(value, bool):
+                kwargs.update(NATIVE_FILTERS[name][key](value))
+        return kwargs
+
     def get_info(self, name):
         '''
         Get Element Info
@@ -182,9 +227,9 @@ class ElementSWInfo(object):
         if name not in self.methods:
             msg = 'Error: unknown subset %s.' % name
             msg += '  Known_subsets: %s' % ', '.join(self.methods.keys())
-            self.module.fail_json(msg=msg, debug=self.debug)
+            self.fail_json(msg=msg, debug=self.debug)
         try:
-            info = self.methods[name]()
+            info = self.methods[name](**self.get_native_args(name))
             return info.to_json()
         except netapp_utils.solidfire.common.ApiServerError as exc:
             if 'err_json=500 xUnknownAPIMethod  method=' in str(exc):
@@ -193,18 +238,27 @@ class ElementSWInfo(object):
                 info = 'Error'
             msg = '%s for subset: %s: %s' % (info, name, repr(exc))
             if self.parameters['fail_on_error']:
-                self.module.fail_json(msg=msg)
+                self.fail_json(msg=msg)
             self.debug.append(msg)
         return info
 
-    def filter_list_of_dict_by_key(self, records, key, value):
+    def filter_list_of_dict(self, records, filter_dict):
+        '''
+        Return the records matching all keys in filter_dict, in a single pass over the records
+        '''
         matched = list()
+        items = list(filter_dict.items())
         for record in records:
-            if key in record and record[key] == value:
+            for key, value in items:
+                if key not in record:
+                    if self.parameters['fail_on_key_not_found']:
+                        msg = 'Error: key %s not found in %s' % (key, repr(record))
+                        self.fail_json(msg=msg)
+                    break
+                if record[key] != value:
+                    break
+            else:
                 matched.append(record)
-            if key not in record and self.parameters['fail_on_key_not_found']:
-                msg = 'Error: key %s not found in %s' % (key, repr(record))
-                self.module.fail_json(msg=msg)
         return matched
 
     def filter_records(self, records, filter_dict):
@@ -215,13 +269,11 @@ class ElementSWInfo(object):
                 return dict({key: self.filter_records(value, filter_dict)})
         if not isinstance(records, list):
             return records
-        matched = records
-        for key, value in filter_dict.items():
-            matched = self.filter_list_of_dict_by_key(matched, key, value)
+        matched = self.filter_list_of_dict(records, filter_dict)
         if self.parameters['fail_on_record_not_found'] and len(matched) == 0:
             msg = 'Error: no match for %s out of %d records' % (repr(self.parameters['filter']), len(records))
             self.debug.append('Unmatched records: %s' % repr(records))
-            self.module.fail_json(msg=msg, debug=self.debug)
+            self.fail_json(msg=msg, debug=self.debug)
         return matched
 
     def get_and_filter_info(self, name):
@@ -236,6 +288,34 @@ class ElementSWInfo(object):
         matched = self.filter_records(records, self.parameters.get('filter'))
         return matched
 
+    def init_worker(self):
+        '''mark the thread as a worker, so that failures are reported by the main thread'''
+        self.thread_data.worker = True
+
+    def collect_subset(self, name):
+        '''run in a worker thread, returns subset name, info, and failure if any'''
+        try:
+            return name, self.get_and_filter_info(name), None
+        except SubsetError as exc:
+            return name, None, exc.args[0]
+
+    def get_subsets_in_parallel(self, names):
+        '''
+        Collect subsets using a pool of worker threads
+        Results are recorded in the requested order, and the first failure in that order is reported
+        '''
+        info = dict()
+        pool = ThreadPool(processes=min(self.parameters['parallelism'], len(names)), initializer=self.init_worker)
+        try:
+            for name, records, failure in pool.map(self.collect_subset, names):
+                if failure is not None:
+                    self.module.fail_json(**failure)
+                info[name] = records
+        finally:
+            pool.close()
+            pool.join()
+        return info
+
     def apply(self):
         '''
         Check connection and initialize node with cluster ownership
@@ -252,8 +332,12 @@ class ElementSWInfo(object):
             self.parameters['gather_subsets'] = self.cluster_methods.keys()
         if 'all_nodes' in self.parameters['gather_subsets']:
             self.parameters['gather_subsets'] = self.node_methods.keys()
-        for name in self.parameters['gather_subsets']:
-            info[name] = self.get_and_filter_info(name)
+        names = list(self.parameters['gather_subsets'])
+        if self.parameters['parallelism'] > 1 and len(names) > 1:
+            info = self.get_subsets_in_parallel(names)
+        else:
+            for name in names:
+                info[name] = self.get_and_filter_info(name)
         self.module.exit_json(changed=changed, info=info, debug=self.debug)
 
 
@@ -34,25 +34,25 @@ options:
     src_volume:
       description:
       - Source volume name or volume ID
-      required: true
+      - Required unless volume_pairs is used.
       type: str
 
     src_account:
       description:
       - Source account name or ID
-      required: true
+      - Required unless volume_pairs is used.
       type: str
 
     dest_volume:
       description:
       - Destination volume name or volume ID
-      required: true
+      - Required unless volume_pairs is used.
       type: str
 
     dest_account:
       description:
       - Destination account name or ID
-      required: true
+      - Required unless volume_pairs is used.
       type: str
 
     mode:
@@ -80,6 +80,49 @@ options:
       - Optional if this is same as source cluster password.
       type: str
 
+    volume_pairs:
+      description:
+      - List of volume pairs to create or delete, as an alternative to src_volume, src_account, dest_volume, and dest_account.
+      - The paired state of all the volumes is read with a single listing on each cluster.
+      - The pairings are started and completed concurrently, see parallelism.
+      - The result for each pair is reported in volume_pairs.
+      type: list
+      elements: dict
+      version_added: 21.1.0
+      suboptions:
+        src_volume:
+          description:
+          - Source volume name or volume ID
+          required: true
+          type: str
+        src_account:
+          description:
+          - Source account name or ID
+          required: true
+          type: str
+        dest_volume:
+          description:
+          - Destination volume name or volume ID
+          required: true
+          type: str
+        dest_account:
+          description:
+          - Destination account name or ID
+          required: true
+          type: str
+        mode:
+          description:
+          - Mode to start the volume pairing, defaults to the value of the mode option.
+          choices: ['async', 'sync', 'snapshotsonly']
+          type: str
+
+    parallelism:
+      description:
+      - Number of volume pairs to create or delete concurrently, when volume_pairs is used.
+      type: int
+      default: 4
+      version_added: 21.1.0
+
 '''
 
 EXAMPLES = """
@@ -110,12 +153,42 @@ EXAMPLES = """
        dest_username: "{{ dest_cluster_username }}"
        dest_password: "{{ dest_cluster_password }}"
 
+   - name: Create volume pairs in bulk
+     na_elementsw_volume_pair:
+       hostname: "{{ src_cluster_hostname }}"
+       username: "{{ src_cluster_username }}"
+       password: "{{ src_cluster_password }}"
+       state: present
+       volume_pairs:
+         - src_volume: test1
+           src_account: test2
+           dest_volume: test3
+           dest_account: test4
+         - src_volume: test5
+           src_account: test2
+           dest_volume: test6
+           dest_account: test4
+           mode: sync
+       parallelism: 8
+       dest_mvip: "{{ dest_cluster_hostname }}"
+
 """
 
 RETURN = """
 
+volume_pairs:
+  description:
+    - Result for each volume pair, in the order of the volume_pairs option.
+    - Each result reports src_volume, src_account, dest_volume, dest_account, src_volume_id, dest_volume_id,
+      action (create, delete, or None), changed, and error when the pair could not be resolved or the action failed.
+  returned: when volume_pairs is used
+  type: list
+  elements: dict
+
 """
 
+from multiprocessing.pool import ThreadPool
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
 import ansible_collections.netapp.elementsw.plugins.module_utils.netapp as netapp_utils
@@ -140,20 +213,32 @@ class ElementSWVolumePair(object):
         self.argument_spec.update(dict(
             state=dict(required=False, choices=['present', 'absent'],
                        default='present'),
-            src_volume=dict(required=True, type='str'),
-            src_account=dict(required=True, type='str'),
-            dest_volume=dict(required=True, type='str'),
-            dest_account=dict(required=True, type='str'),
+            src_volume=dict(required=False, type='str'),
+            src_account=dict(required=False, type='str'),
+            dest_volume=dict(required=False, type='str'),
+            dest_account=dict(required=False, type='str'),
             mode=dict(required=False, type='str',
                       choices=['async', 'sync', 'snapshotsonly'],
                       default='async'),
             dest_mvip=dict(required=True, type='str'),
             dest_username=dict(required=False, type='str'),
-            dest_password=dict(required=False, type='str', no_log=True)
+            dest_password=dict(required=False, type='str', no_log=True),
+            volume_pairs=dict(required=False, type='list', elements='dict', options=dict(
+                src_volume=dict(required=True, type='str'),
+                src_account=dict(required=True, type='str'),
+                dest_volume=dict(required=True, type='str'),
+                dest_account=dict(required=True, type='str'),
+                mode=dict(required=False, type='str', choices=['async', 'sync', 'snapshotsonly']),
+            )),
+            parallelism=dict(required=False, type='int', default=4),
         ))
 
+        pair_options = ['src_volume', 'src_account', 'dest_volume', 'dest_account']
         self.module = AnsibleModule(
             argument_spec=self.argument_spec,
+            required_one_of=[['src_volume', 'volume_pairs']],
+            required_together=[pair_options],
+            mutually_exclusive=[['volume_pairs', option] for option in pair_options],
             supports_check_mode=True
         )
 
@@ -267,10 +352,142 @@ class ElementSWVolumePair(object):
         self.get_volume_id(self.parameters['src_volume'], 'src')
         self.get_volume_id(self.parameters['dest_volume'], 'dest')
 
+    def get_paired_volumes(self, elem, volume_ids, cluster):
+        """
+            Return the remote volume ID for each paired volume, indexed by volume ID
+            The paired state of all the volumes is read with a single listing
+        """
+        paired = dict()
+        if not volume_ids:
+            return paired
+        try:
+            paired_volumes = elem.list_volumes(volume_ids=volume_ids, is_paired=True)
+        except solidfire.common.ApiServerError as err:
+            self.module.fail_json(msg="Error listing paired volumes on %s cluster" % cluster,
+                                  exception=to_native(err))
+        for vol in paired_volumes.volumes:
+            for pair in vol.volume_pairs:
+                if pair is not None:
+                    paired[vol.volume_id] = pair.remote_volume_id
+                    break
+        return paired
+
+    def resolve_volume_pairs(self):
+        """
+            Get IDs for volumes and accounts for all the pairs
+            Accounts are resolved once, and volume names with the account volume index
+            Return a result dict for each pair, with an error if a volume or account is not found
+        """
+        helpers = dict(src=self.elementsw_helper, dest=self.dest_elementsw_helper)
+        account_ids = dict(src=dict(), dest=dict())
+        results = list()
+        for pair in self.parameters['volume_pairs']:
+            result = dict(src_volume=pair['src_volume'], src_account=pair['src_account'],
+                          dest_volume=pair['dest_volume'], dest_account=pair['dest_account'],
+                          src_volume_id=None, dest_volume_id=None, action=None, changed=False)
+            errors = list()
+            for side, label in [('src', 'source'), ('dest', 'destination')]:
+                account = pair[side + '_account']
+                if account not in account_ids[side]:
+                    try:
+                        account_ids[side][account] = helpers[side].account_exists(account)
+                    except solidfire.common.ApiServerError:
+                        account_ids[side][account] = None
+                account_id = account_ids[side][account]
+                if account_id is None:
+                    errors.append("%s account %s does not exist" % (label, account))
+                    continue
+                volume_id = helpers[side].volumes_exist([pair[side + '_volume']], account_id)[0]
+                if volume_id is None:
+                    errors.append("%s volume %s does not exist" % (label, pair[side + '_volume']))
+                result[side + '_volume_id'] = volume_id
+            if errors:
+                result['error'] = "Error: %s" % ', '.join(errors)
+            results.append(result)
+        # a volume can have only one pair
+        for side in ('src', 'dest'):
+            seen = set()
+            for result in results:
+                volume_id = result[side + '_volume_id']
+                if volume_id is not None and volume_id in seen and 'error' not in result:
+                    result['error'] = "Error: volume %s is used in more than one pair" % result[side + '_volume']
+                seen.add(volume_id)
+        return results
+
+    def apply_volume_pair(self, args):
+        """
+            Start and complete, or remove, a volume pairing in a worker thread
+            Return a tuple (error, changed), error is None if the action succeeded
+            changed is True if the source volume was updated, even if the destination volume could not be updated
+        """
+        result, mode = args
+        action = 'pairing' if result['action'] == 'create' else 'unpairing'
+        src_done = False
+        try:
+            if result['action'] == 'create':
+                pair_key = self.elem.start_volume_pairing(volume_id=result['src_volume_id'], mode=mode)
+                src_done = True
+                self.dest_elem.complete_volume_pairing(volume_pairing_key=pair_key.volume_pairing_key,
+                                                       volume_id=result['dest_volume_id'])
+            else:
+                self.elem.remove_volume_pair(volume_id=result['src_volume_id'])
+                src_done = True
+                self.dest_elem.remove_volume_pair(volume_id=result['dest_volume_id'])
+        except solidfire.common.ApiServerError as err:
+            error = "Error %s volume ids %s and %s: %s" % (action, result['src_volume_id'], result['dest_volume_id'], to_native(err))
+            if src_done:
+                error += " - %s is half done, source volume id %s was updated but destination volume id %s was not" \
+                         % (action, result['src_volume_id'], result['dest_volume_id'])
+            return error, src_done
+        return None, True
+
+    def apply_volume_pairs(self):
+        """
+            Create or delete all the volume pairs, using a pool of worker threads
+        """
+        results = self.resolve_volume_pairs()
+        failed = [result for result in results if 'error' in result]
+        if failed:
+            self.module.fail_json(msg="Error: %d of %d volume pairs cannot be resolved: %s"
+                                      % (len(failed), len(results), '; '.join(result['error'] for result in failed)),
+                                  volume_pairs=results)
+        src_paired = self.get_paired_volumes(self.elem, [result['src_volume_id'] for result in results], 'source')
+        dest_paired = self.get_paired_volumes(self.dest_elem, [result['dest_volume_id'] for result in results], 'destination')
+        pending = list()
+        for result, pair in zip(results, self.parameters['volume_pairs']):
+            paired = result['src_volume_id'] in src_paired or result['dest_volume_id'] in dest_paired
+            if self.parameters['state'] == 'present' and not paired:
+                result['action'] = 'create'
+            elif self.parameters['state'] == 'absent' and paired:
+                result['action'] = 'delete'
+            if result['action'] is not None:
+                result['changed'] = True
+                pending.append((result, pair.get('mode') or self.parameters['mode']))
+        if pending and not self.module.check_mode:
+            pool = ThreadPool(processes=max(1, min(self.parameters['parallelism'], len(pending))))
+            try:
+                outcomes = pool.map(self.apply_volume_pair, pending)
+            finally:
+                pool.close()
+                pool.join()
+            for (result, dummy), (error, pair_changed) in zip(pending, outcomes):
+                if error is not None:
+                    result['error'] = error
+                result['changed'] = pair_changed
+        changed = any(result['changed'] for result in results)
+        failed = [result for result in results if 'error' in result]
+        if failed:
+            self.module.fail_json(msg="Error: %d of %d volume pairs failed: %s"
+                                      % (len(failed), len(results), '; '.join(result['error'] for result in failed)),
+                                  changed=changed, volume_pairs=results)
+        self.module.exit_json(changed=changed, volume_pairs=results)
+
     def apply(self):
         """
             Call create / delete volume pair methods
         """
+        if self.parameters.get('volume_pairs') is not None:
+            self.apply_volume_pairs()
         self.get_ids()
         paired = self.pairing_exists(self.parameters['src_vol_id'],
                                      self.parameters['dest_vol_id'])
@@ -0,0 +1,110 @@
+# Copyright (c) 2021 NetApp
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' unit tests for module_utils netapp.py '''
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import pytest
+
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.netapp.elementsw.tests.unit.compat.mock import patch
+import ansible_collections.netapp.elementsw.plugins.module_utils.netapp as netapp_utils
+
+if not netapp_utils.has_sf_sdk():
+    pytestmark = pytest.mark.skip('skipping as missing required SolidFire Python SDK')
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)  # pylint: disable=protected-access
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+
+def fail_json(*args, **kwargs):  # pylint: disable=unused-argument
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+def create_module(api_version=None):
+    args = dict(hostname='10.10.10.10', username='admin', password='password')
+    if api_version is not None:
+        args['api_version'] = api_version
+    set_module_args(args)
+    module = basic.AnsibleModule(netapp_utils.ontap_sf_host_argument_spec())
+    module.fail_json = fail_json
+    return module
+
+
+class MockResponse(object):
+    ''' mock a JSON-RPC response from requests '''
+
+    def __init__(self, result):
+        self.status_code = 200
+        self.reason = 'OK'
+        self.text = json.dumps(dict(id=1, result=result))
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    netapp_utils.SF_SESSIONS.clear()
+    netapp_utils.SF_API_VERSIONS.clear()
+
+
+@pytest.fixture
+def mock_post():
+    ''' record the sessions and JSON-RPC methods used '''
+    calls = list()
+
+    def post(session, url, data=None, **kwargs):   # pylint: disable=unused-argument
+        method = json.loads(data)['method']
+        calls.append((session, url, method))
+        if method == 'GetAPI':
+            return MockResponse(dict(currentVersion='12.0', supportedVersions=['11.0', '12.0']))
+        return MockResponse(dict(clusterInfo=dict(name='cluster1')))
+    with patch('requests.Session.post', autospec=True, side_effect=post):
+        yield calls
+
+
+def test_api_version_is_requested_once_per_target(mock_post):
+    module = create_module()
+    first = netapp_utils.create_sf_connection(module)
+    second = netapp_utils.create_sf_connection(module)
+    node = netapp_utils.create_sf_connection(module, port=442)
+    assert first.api_version == second.api_version == node.api_version == 12.0
+    first.get_cluster_info()
+    second.get_cluster_info()
+    assert [(url, method) for session, url, method in mock_post] == [
+        ('https://10.10.10.10/json-rpc/7.0', 'GetAPI'),
+        ('https://10.10.10.10:442/json-rpc/7.0', 'GetAPI'),
+        ('https://10.10.10.10/json-rpc/12.0', 'GetClusterInfo'),
+        ('https://10.10.10.10/json-rpc/12.0', 'GetClusterInfo'),
+    ]
+    # the same session is used for all the requests to the cluster
+    assert mock_post[0][0] is mock_post[2][0] is mock_post[3][0]
+    assert mock_post[1][0] is not mock_post[0][0]
+
+
+def test_api_version_option_skips_probe(mock_post):
+    connection = netapp_utils.create_sf_connection(create_module(api_version='11.0'))
+    assert connection.api_version == 11.0
+    connection.get_cluster_info()
+    assert [(url, method) for session, url, method in mock_post] == [('https://10.10.10.10/json-rpc/11.0', 'GetClusterInfo')]
+
+
+@pytest.mark.parametrize('api_version, msg', [
+    ('6.0', 'Error: api_version 6.0 is lower than the minimum version supported by the SDK: 7.0'),
+    ('latest', 'Error: api_version is expected to be a number, eg 10.1, got: latest'),
+])
+def test_api_version_option_errors(api_version, msg):
+    with pytest.raises(AnsibleFailJson) as exc:
+        netapp_utils.create_sf_connection(create_module(api_version=api_version))
+    assert exc.value.args[0]['msg'] == msg
@@ -67,6 +67,7 @@ class MockSFConnection(object):
         self.force_error = force_error
         self.where = where
         self.volume_id = volume_id
+        self.list_volumes_calls = 0
 
     def list_volume_access_groups(self, *args, **kwargs):  # pylint: disable=unused-argument
         ''' build access_group list: access_groups.name, access_groups.account_id '''
@@ -82,8 +83,13 @@ class MockSFConnection(object):
 
     def list_volumes_for_account(self, *args, **kwargs):  # pylint: disable=unused-argument
         ''' build volume list: volume.name, volume.id '''
+        self.list_volumes_calls += 1
         volume = self.Bunch(name='element_volumename', volume_id=VOLUME_ID, delete_time='')
         volumes = [volume]
+        for index in range(3):
+            volumes.append(self.Bunch(name='element_volume_%d' % index, volume_id=VOLUME_ID + 1 + index, delete_time=''))
+        # deleted, but not purged yet
+        volumes.append(self.Bunch(name='deleted_volume', volume_id=999, delete_time='2021-01-01T00:00:00Z'))
         volume_list = self.Bunch(volumes=volumes)
         return volume_list
 
@@ -243,3 +249,21 @@ class TestMyModule(unittest.TestCase):
         print(exc.value.args[0])
         message = 'Error: Specified account id "%s" does not exist.' % 'element_account_id'
         assert exc.value.args[0]['msg'] == message
+
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_volume_ids_use_index(self, mock_create_sf_connection):
+        ''' volumes are resolved with a single listing, by name or ID, deleted volumes are ignored '''
+        args = dict(self.ARGS)
+        args['volumes'] = ['element_volume_0', str(VOLUME_ID + 2), 'element_volume_2', 'element_volumename']
+        set_module_args(args)
+        connection = MockSFConnection()
+        mock_create_sf_connection.return_value = connection
+        my_obj = my_module()
+        my_obj.account_id = 1
+        assert my_obj.get_volume_ids() == [VOLUME_ID + 1, VOLUME_ID + 2, VOLUME_ID + 3, VOLUME_ID]
+        assert connection.list_volumes_calls == 1
+        my_obj.volumes = ['deleted_volume']
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.get_volume_ids()
+        assert exc.value.args[0]['msg'] == 'Error: Specified volume deleted_volume does not exist'
+        assert connection.list_volumes_calls == 1
@@ -0,0 +1,181 @@
+''' unit test for Ansible module: na_elementsw_drive.py '''
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import pytest
+
+from ansible_collections.netapp.elementsw.tests.unit.compat import unittest
+from ansible_collections.netapp.elementsw.tests.unit.compat.mock import patch
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+import ansible_collections.netapp.elementsw.plugins.module_utils.netapp as netapp_utils
+
+if not netapp_utils.has_sf_sdk():
+    pytestmark = pytest.mark.skip('skipping as missing required SolidFire Python SDK')
+
+from ansible_collections.netapp.elementsw.plugins.modules.na_elementsw_drive \
+    import ElementSWDrive as my_module  # module under test
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)  # pylint: disable=protected-access
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+
+def exit_json(*args, **kwargs):  # pylint: disable=unused-argument
+    """function to patch over exit_json; package return data into an exception"""
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):  # pylint: disable=unused-argument
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+ASYNC_HANDLE = 42
+
+
+class MockSFConnection(object):
+    ''' mock connection to ElementSW host, drives 1 and 2 are available, drive 3 is active '''
+
+    class Bunch(object):  # pylint: disable=too-few-public-methods
+        ''' create object with arbitrary attributes '''
+        def __init__(self, **kw):
+            ''' called with (k1=v1, k2=v2), creates obj.k1, obj.k2 with values v1, v2 '''
+            setattr(self, '__dict__', kw)
+
+    def __init__(self, async_results=None):
+        ''' async_results is the list of results returned by successive calls to get_async_result '''
+        self.async_results = list(async_results or list())
+        self.called = list()
+
+    def list_drives(self):
+        self.called.append('list_drives')
+        drives = [self.Bunch(drive_id=1, serial='serial_1', node_id=1, status='available'),
+                  self.Bunch(drive_id=2, serial='serial_2', node_id=1, status='available'),
+                  self.Bunch(drive_id=3, serial='serial_3', node_id=2, status='active')]
+        return self.Bunch(drives=drives)
+
+    def add_drives(self, drives, **kwargs):  # pylint: disable=unused-argument
+        self.called.append(('add_drives', drives))
+        return self.Bunch(async_handle=ASYNC_HANDLE)
+
+    def remove_drives(self, drives, **kwargs):  # pylint: disable=unused-argument
+        self.called.append(('remove_drives', drives))
+        return self.Bunch(async_handle=ASYNC_HANDLE + 1)
+
+    def get_async_result(self, async_handle, keep_result=None):
+        self.called.append(('get_async_result', async_handle, keep_result))
+        if not keep_result:
+            # the result is released
+            return dict(status='complete')
+        return self.async_results.pop(0)
+
+
+class TestMyModule(unittest.TestCase):
+    ''' a group of related Unit Tests '''
+
+    ARGS = {
+        'hostname': 'hostname',
+        'username': 'username',
+        'password': 'password',
+    }
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule,
+                                                 exit_json=exit_json,
+                                                 fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_add_drives_no_wait(self, mock_create_sf_connection):
+        ''' async handle is not polled by default '''
+        set_module_args(dict(self.ARGS))
+        mock_create_sf_connection.return_value = MockSFConnection()
+        my_obj = my_module()
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        assert exc.value.args[0]['changed']
+        assert 'drives' not in exc.value.args[0]
+        assert my_obj.sfe.called == ['list_drives', ('add_drives', [1, 2])]
+
+    @patch('time.sleep')
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_add_drives_wait_for_completion(self, mock_create_sf_connection, mock_sleep):
+        ''' only the async handle for the drives is polled, with an increasing delay '''
+        args = dict(self.ARGS)
+        args['wait_for_completion'] = True
+        set_module_args(args)
+        running = dict(status='running', details=dict(message='Syncing'))
+        complete = dict(status='complete', result=dict())
+        mock_create_sf_connection.return_value = MockSFConnection([running, running, complete])
+        my_obj = my_module()
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        assert exc.value.args[0]['changed']
+        assert exc.value.args[0]['drives'] == [
+            dict(drive_id=1, async_handle=ASYNC_HANDLE, status='complete', details=dict(message='Syncing')),
+            dict(drive_id=2, async_handle=ASYNC_HANDLE, status='complete', details=dict(message='Syncing')),
+        ]
+        assert my_obj.sfe.called.count('list_drives') == 1
+        assert my_obj.sfe.called.count(('get_async_result', ASYNC_HANDLE, True)) == 3
+        # the result is released once the handle is complete
+        assert my_obj.sfe.called[-1] == ('get_async_result', ASYNC_HANDLE, None)
+        assert [call[0][0] for call in mock_sleep.call_args_list] == [2, 4]
+
+    @patch('time.sleep')
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_remove_drive_wait_error(self, mock_create_sf_connection, mock_sleep):
+        ''' an error reported by the async handle fails the module '''
+        args = dict(self.ARGS)
+        args['state'] = 'absent'
+        args['wait_for_completion'] = True
+        set_module_args(args)
+        error = dict(status='complete', error=dict(message='xDriveRemovalFailed'))
+        mock_create_sf_connection.return_value = MockSFConnection([error])
+        my_obj = my_module()
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        assert exc.value.args[0]['msg'] == "Error - drive operation failed for drive: [3]: {'message': 'xDriveRemovalFailed'}"
+        assert exc.value.args[0]['drives'][0]['status'] == 'error'
+        assert not mock_sleep.called
+        assert my_obj.sfe.called[-2:] == [('get_async_result', ASYNC_HANDLE + 1, True), ('get_async_result', ASYNC_HANDLE + 1, None)]
+
+    @patch('time.time')
+    @patch('time.sleep')
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_add_drives_wait_timeout(self, mock_create_sf_connection, mock_sleep, mock_time):
+        ''' the module fails when the drives are still syncing after wait_timeout '''
+        args = dict(self.ARGS)
+        args['wait_for_completion'] = True
+        args['wait_timeout'] = 5
+        set_module_args(args)
+        mock_time.side_effect = [0, 0, 2, 6]
+        running = dict(status='running', details=dict(message='Syncing'))
+        mock_create_sf_connection.return_value = MockSFConnection([running, running, running])
+        my_obj = my_module()
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        assert exc.value.args[0]['msg'] == 'Error - drive operation still running after 5 seconds for drives: [1, 2]'
+        # a running handle is not released
+        assert ('get_async_result', ASYNC_HANDLE, None) not in my_obj.sfe.called
+        assert [call[0][0] for call in mock_sleep.call_args_list] == [2, 3]
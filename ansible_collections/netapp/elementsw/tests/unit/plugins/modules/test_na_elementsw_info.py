@@ -77,6 +77,7 @@ class MockSFConnection(object):
         self.nodes = [NODE_ID1, NODE_ID2, NODE_ID3]
         self._port = 442
         self.called = list()
+        self.kwargs = dict()
         if force_error and where == 'cx':
             raise netapp_utils.solidfire.common.ApiConnectionError('testme')
 
@@ -84,17 +85,21 @@ class MockSFConnection(object):
         name = inspect.stack()[1][3]    # caller function name
         print('%s: , args: %s, kwargs: %s' % (name, args, kwargs))
         self.called.append(name)
+        self.kwargs[name] = kwargs
 
     def list_accounts(self, *args, **kwargs):  # pylint: disable=unused-argument
         ''' build account list: account.username, account.account_id '''
-        self.record(repr(args), repr(kwargs))
+        self.record(repr(args), kwargs)
+        if self.force_error and self.where == 'list_accounts_exception':
+            raise netapp_utils.solidfire.common.ApiServerError('ListAccounts', {})
         accounts = list()
-        accounts.append({'username': 'user1'})
+        accounts.append({'username': 'user1', 'account_id': 1, 'status': 'active'})
+        accounts.append({'username': 'user2', 'account_id': 2, 'status': 'active'})
         account_list = self.Bunch(accounts=accounts)
         return account_list
 
     def get_config(self, *args, **kwargs):  # pylint: disable=unused-argument
-        self.record(repr(args), repr(kwargs))
+        self.record(repr(args), kwargs)
         if self.force_error and self.where == 'get_config_exception':
             raise ConnectionError
         if self.nodes is not None:
@@ -326,3 +331,64 @@ class TestMyModule(unittest.TestCase):
         print(exc.value.args[0])
         msg = 'Failed to connect for hostname:442'
         assert msg in exc.value.args[0]['msg']
+
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_info_filter_multiple_keys(self, mock_create_sf_connection):
+        ''' filter on several keys - all keys must match '''
+        args = dict(self.ARGS)  # deep copy as other tests can modify args
+        args['gather_subsets'] = ['cluster_accounts']
+        args['filter'] = dict(status='active', username='user2')
+        set_module_args(args)
+        mock_create_sf_connection.return_value = MockSFConnection()
+        my_obj = my_module()
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        assert exc.value.args[0]['info']['cluster_accounts']['accounts'] == [{'username': 'user2', 'account_id': 2, 'status': 'active'}]
+        assert my_obj.sfe_cluster.kwargs['list_accounts'] == dict()
+
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_info_filter_native_account_id(self, mock_create_sf_connection):
+        ''' account_id is passed to ListAccounts, and the records are still filtered '''
+        args = dict(self.ARGS)  # deep copy as other tests can modify args
+        args['gather_subsets'] = ['cluster_accounts']
+        args['filter'] = dict(account_id=2)
+        set_module_args(args)
+        mock_create_sf_connection.return_value = MockSFConnection()
+        my_obj = my_module()
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        assert my_obj.sfe_cluster.kwargs['list_accounts'] == dict(start_account_id=2, limit=1)
+        assert [account['username'] for account in exc.value.args[0]['info']['cluster_accounts']['accounts']] == ['user2']
+
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_info_parallelism(self, mock_create_sf_connection):
+        ''' cluster and node subsets are collected concurrently, with the same output '''
+        args = dict(self.ARGS)  # deep copy as other tests can modify args
+        args['parallelism'] = 4
+        set_module_args(args)
+        mock_create_sf_connection.return_value = MockSFConnection()
+        my_obj = my_module()
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        assert sorted(exc.value.args[0]['info']) == ['cluster_accounts', 'node_config']
+        assert exc.value.args[0]['info']['cluster_accounts']['accounts'][0]['username'] == 'user1'
+        assert exc.value.args[0]['info']['node_config']['config']['cluster']['cluster'] == 'cl_name'
+        assert sorted(my_obj.sfe_node.called) == ['get_config', 'list_accounts']
+
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_info_parallelism_error(self, mock_create_sf_connection):
+        ''' a failure in a worker thread is reported by the module '''
+        args = dict(self.ARGS)  # deep copy as other tests can modify args
+        args['parallelism'] = 2
+        args['fail_on_error'] = True
+        set_module_args(args)
+        mock_create_sf_connection.return_value = MockSFConnection(force_error=True, where='list_accounts_exception')
+        my_obj = my_module()
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        msg = 'Error for subset: cluster_accounts'
+        assert msg in exc.value.args[0]['msg']
@@ -0,0 +1,233 @@
+''' unit test for Ansible module: na_elementsw_volume_pair.py '''
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import pytest
+
+from ansible_collections.netapp.elementsw.tests.unit.compat import unittest
+from ansible_collections.netapp.elementsw.tests.unit.compat.mock import patch
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+import ansible_collections.netapp.elementsw.plugins.module_utils.netapp as netapp_utils
+
+if not netapp_utils.has_sf_sdk():
+    pytestmark = pytest.mark.skip('skipping as missing required SolidFire Python SDK')
+
+from ansible_collections.netapp.elementsw.plugins.modules.na_elementsw_volume_pair \
+    import ElementSWVolumePair as my_module  # module under test
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)  # pylint: disable=protected-access
+
+
+class AnsibleExitJson(Exception):
+    """Exception class to be raised by module.exit_json and caught by the test case"""
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+
+def exit_json(*args, **kwargs):  # pylint: disable=unused-argument
+    """function to patch over exit_json; package return data into an exception"""
+    if 'changed' not in kwargs:
+        kwargs['changed'] = False
+    raise AnsibleExitJson(kwargs)
+
+
+def fail_json(*args, **kwargs):  # pylint: disable=unused-argument
+    """function to patch over fail_json; package return data into an exception"""
+    kwargs['failed'] = True
+    raise AnsibleFailJson(kwargs)
+
+
+class MockSFConnection(object):
+    ''' mock connection to ElementSW host, with volumes vol_0 to vol_9 in account acct '''
+
+    class Bunch(object):  # pylint: disable=too-few-public-methods
+        ''' create object with arbitrary attributes '''
+        def __init__(self, **kw):
+            ''' called with (k1=v1, k2=v2), creates obj.k1, obj.k2 with values v1, v2 '''
+            setattr(self, '__dict__', kw)
+
+    def __init__(self, base_id, paired=None, force_error=False, where=None):
+        ''' save arguments '''
+        self.base_id = base_id
+        # volume ID: remote volume ID
+        self.paired = dict(paired or dict())
+        self.force_error = force_error
+        self.where = where
+        self.called = list()
+
+    def get_account_by_name(self, username):
+        self.called.append('get_account_by_name')
+        if username != 'acct':
+            raise netapp_utils.solidfire.common.ApiServerError('GetAccountByName', {})
+        return self.Bunch(account=self.Bunch(account_id=1))
+
+    def list_volumes_for_account(self, account_id):  # pylint: disable=unused-argument
+        self.called.append('list_volumes_for_account')
+        volumes = [self.Bunch(name='vol_%d' % index, volume_id=self.base_id + index, delete_time='') for index in range(10)]
+        return self.Bunch(volumes=volumes)
+
+    def list_volumes(self, volume_ids, is_paired):
+        self.called.append('list_volumes')
+        assert is_paired
+        volumes = [self.Bunch(volume_id=volume_id, volume_pairs=[self.Bunch(remote_volume_id=self.paired[volume_id])])
+                   for volume_id in volume_ids if volume_id in self.paired]
+        return self.Bunch(volumes=volumes)
+
+    def start_volume_pairing(self, volume_id, mode):
+        self.called.append(('start_volume_pairing', volume_id, mode))
+        if self.force_error and self.where == volume_id:
+            raise netapp_utils.solidfire.common.ApiServerError('StartVolumePairing', {})
+        return self.Bunch(volume_pairing_key='key_%d' % volume_id)
+
+    def complete_volume_pairing(self, volume_pairing_key, volume_id):
+        self.called.append(('complete_volume_pairing', volume_pairing_key, volume_id))
+        if self.force_error and self.where == volume_id:
+            raise netapp_utils.solidfire.common.ApiServerError('CompleteVolumePairing', {})
+
+    def remove_volume_pair(self, volume_id):
+        self.called.append(('remove_volume_pair', volume_id))
+
+
+class TestMyModule(unittest.TestCase):
+    ''' a group of related Unit Tests '''
+
+    ARGS = {
+        'hostname': 'hostname',
+        'username': 'username',
+        'password': 'password',
+        'dest_mvip': 'dest_mvip',
+    }
+
+    def setUp(self):
+        self.mock_module_helper = patch.multiple(basic.AnsibleModule,
+                                                 exit_json=exit_json,
+                                                 fail_json=fail_json)
+        self.mock_module_helper.start()
+        self.addCleanup(self.mock_module_helper.stop)
+
+    @staticmethod
+    def volume_pairs(count, dest_volume='vol_%d'):
+        return [dict(src_volume='vol_%d' % index, src_account='acct', dest_volume=dest_volume % index, dest_account='acct')
+                for index in range(count)]
+
+    def test_module_fail_when_pair_options_and_volume_pairs(self):
+        ''' volume_pairs cannot be used with src_volume '''
+        args = dict(self.ARGS)
+        args.update(src_volume='vol_0', src_account='acct', dest_volume='vol_0', dest_account='acct', volume_pairs=self.volume_pairs(1))
+        set_module_args(args)
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_module()
+        print('Info: %s' % exc.value.args[0]['msg'])
+        assert 'mutually exclusive' in exc.value.args[0]['msg']
+
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_create_volume_pairs(self, mock_create_sf_connection):
+        ''' unpaired volumes are paired, paired state is read once per cluster '''
+        args = dict(self.ARGS)
+        args['volume_pairs'] = self.volume_pairs(4)
+        args['volume_pairs'][3]['mode'] = 'sync'
+        set_module_args(args)
+        src = MockSFConnection(100, paired={100: 200})
+        dest = MockSFConnection(200, paired={200: 100})
+        mock_create_sf_connection.side_effect = [src, dest]
+        my_obj = my_module()
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        assert exc.value.args[0]['changed']
+        results = exc.value.args[0]['volume_pairs']
+        assert [result['action'] for result in results] == [None, 'create', 'create', 'create']
+        assert [(result['src_volume_id'], result['dest_volume_id']) for result in results] == [(100, 200), (101, 201), (102, 202), (103, 203)]
+        for cluster in (src, dest):
+            assert cluster.called.count('get_account_by_name') == 1
+            assert cluster.called.count('list_volumes_for_account') == 1
+            assert cluster.called.count('list_volumes') == 1
+        assert sorted(call for call in src.called if isinstance(call, tuple)) == [
+            ('start_volume_pairing', 101, 'async'), ('start_volume_pairing', 102, 'async'), ('start_volume_pairing', 103, 'sync')]
+        assert sorted(call for call in dest.called if isinstance(call, tuple)) == [
+            ('complete_volume_pairing', 'key_101', 201), ('complete_volume_pairing', 'key_102', 202), ('complete_volume_pairing', 'key_103', 203)]
+
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_delete_volume_pairs_check_mode(self, mock_create_sf_connection):
+        ''' only paired volumes are reported, no change in check mode '''
+        args = dict(self.ARGS)
+        args['volume_pairs'] = self.volume_pairs(2)
+        args['state'] = 'absent'
+        args['_ansible_check_mode'] = True
+        set_module_args(args)
+        src = MockSFConnection(100, paired={101: 201})
+        dest = MockSFConnection(200, paired={201: 101})
+        mock_create_sf_connection.side_effect = [src, dest]
+        my_obj = my_module()
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        assert exc.value.args[0]['changed']
+        assert [result['action'] for result in exc.value.args[0]['volume_pairs']] == [None, 'delete']
+        assert not [call for call in src.called + dest.called if isinstance(call, tuple)]
+
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_volume_pairs_not_resolved(self, mock_create_sf_connection):
+        ''' no pairing is started when a volume or account is not found '''
+        args = dict(self.ARGS)
+        args['volume_pairs'] = self.volume_pairs(3, dest_volume='dest_%d')
+        args['volume_pairs'][0]['dest_volume'] = 'vol_0'
+        args['volume_pairs'][2]['src_account'] = 'unknown'
+        set_module_args(args)
+        src = MockSFConnection(100)
+        dest = MockSFConnection(200)
+        mock_create_sf_connection.side_effect = [src, dest]
+        my_obj = my_module()
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        assert exc.value.args[0]['msg'].startswith('Error: 2 of 3 volume pairs cannot be resolved')
+        results = exc.value.args[0]['volume_pairs']
+        assert 'error' not in results[0]
+        assert results[1]['error'] == 'Error: destination volume dest_1 does not exist'
+        assert results[2]['error'] == 'Error: source account unknown does not exist, destination volume dest_2 does not exist'
+        assert 'list_volumes' not in src.called
+
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_volume_pairs_partial_failure(self, mock_create_sf_connection):
+        ''' a failure is reported for the pair, the other pairs are created '''
+        args = dict(self.ARGS)
+        args['volume_pairs'] = self.volume_pairs(3)
+        set_module_args(args)
+        src = MockSFConnection(100, force_error=True, where=101)
+        dest = MockSFConnection(200)
+        mock_create_sf_connection.side_effect = [src, dest]
+        my_obj = my_module()
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        assert exc.value.args[0]['msg'].startswith('Error: 1 of 3 volume pairs failed: Error pairing volume ids 101 and 201')
+        assert exc.value.args[0]['changed']
+        assert [result['changed'] for result in exc.value.args[0]['volume_pairs']] == [True, False, True]
+
+    @patch('ansible_collections.netapp.elementsw.plugins.module_utils.netapp.create_sf_connection')
+    def test_volume_pairs_half_done(self, mock_create_sf_connection):
+        ''' a pairing started on the source but not completed on the destination is reported as changed '''
+        args = dict(self.ARGS)
+        args['volume_pairs'] = self.volume_pairs(2)
+        set_module_args(args)
+        src = MockSFConnection(100)
+        dest = MockSFConnection(200, force_error=True, where=201)
+        mock_create_sf_connection.side_effect = [src, dest]
+        my_obj = my_module()
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.apply()
+        print(exc.value.args[0])
+        assert exc.value.args[0]['msg'].startswith('Error: 1 of 2 volume pairs failed: Error pairing volume ids 101 and 201')
+        results = exc.value.args[0]['volume_pairs']
+        assert 'pairing is half done, source volume id 101 was updated but destination volume id 201 was not' in results[1]['error']
+        assert [result['changed'] for result in results] == [True, True]
@@ -35,11 +35,24 @@ from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
 import base64
+from collections import deque
+import errno
+import gzip
+import hashlib
+import json
 import os
+import re
+import shutil
+import socket
+import tempfile
+import threading
 import ssl
 import time
+import traceback
 from ansible.module_utils.basic import missing_required_lib
 from ansible.module_utils._text import to_native
+from ansible.module_utils.six import binary_type, text_type
+from ansible.module_utils.six.moves import http_client
 
 try:
     from ansible.module_utils.ansible_release import __version__ as ansible_version
@@ -56,6 +69,7 @@ except ImportError:
 
 try:
     import requests
+    import urllib3
     HAS_REQUESTS = True
 except ImportError:
     HAS_REQUESTS = False
@@ -94,7 +108,10 @@ ERROR_MSG = dict(
 )
 
 try:
-    from solidfire.factory import ElementFactory
+    from solidfire import Element
+    from solidfire.factory import min_sdk_version
+    import solidfire.common
+    from requests.auth import HTTPBasicAuth
     HAS_SF_SDK = True
 except ImportError:
     HAS_SF_SDK = False
@@ -137,12 +154,27 @@ def get_feature(module, feature_name):
         otherwise, use our default
     '''
     default_flags = dict(
+        cache_dir=None,                         # directory for on-disk cache, defaults to ~/.ansible/netapp/ontap_cache
+        cache_ttl=3600,                         # in seconds, cached entries older than this are ignored
         check_required_params_for_none=True,
         classic_basic_authorization=False,      # use ZAPI wrapper to send Authorization header
+        debug_log_max_entries=100,              # number of REST debug records kept in memory, 0 to disable debug logging, None for no limit
+        debug_log_max_size=1024,                # REST debug records longer than this are truncated, None for no limit
+        cserver_cache=False,                    # cache the admin vserver name on disk
         deprecation_warning=True,
+        ems_log_in_check_mode=True,             # when False, do not send EMS events in check mode
+        ems_spool_interval=0,                   # in seconds, when > 0 spool EMS events and send at most one event per interval
+        invalidate_cache=False,                 # discard cached entries for this cluster, eg after an upgrade
+        perf_stats=False,                       # add a perf section to the module result, with timings and payload sizes per API
+        perf_stats_file=None,                   # append one JSON line per ZAPI or REST call to this file
+        rest_capability_cache=False,            # cache REST availability and ONTAP version on disk
+        rest_keep_alive=True,                   # reuse a requests session, and its connection pool, for all REST calls
+        rest_pool_maxsize=10,                   # maximum number of connections kept alive in the REST connection pool
         sanitize_xml=True,
         sanitize_code_points=[8],               # unicode values, 8 is backspace
-        show_modified=True
+        sf_api_version=None,                    # Element API version for ElementSW connections, skips the GetAPI request
+        show_modified=True,
+        zapi_keep_alive=False,                  # use a persistent HTTP/1.1 connection for ZAPI calls
     )
 
     if module.params['feature_flags'] is not None and feature_name in module.params['feature_flags']:
@@ -152,17 +184,307 @@ def get_feature(module, feature_name):
     module.fail_json(msg="Internal error: unexpected feature flag: %s" % feature_name)
 
 
+class OntapCache(object):
+    ''' on-disk cache, with one file per cluster and user
+        entries are shared by all modules running on the same host, and expire after cache_ttl seconds
+        the cache is best effort: any error reading or writing the file is ignored
+    '''
+    def __init__(self, module):
+        self.module = module
+        cache_dir = get_feature(module, 'cache_dir')
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser('~'), '.ansible', 'netapp', 'ontap_cache')
+        try:
+            self.ttl = int(get_feature(module, 'cache_ttl'))
+        except (TypeError, ValueError):
+            module.fail_json(msg="Error: expected int type for feature flag: cache_ttl, got: %s" % get_feature(module, 'cache_ttl'))
+        self.cache_dir = cache_dir
+        self.path = os.path.join(cache_dir, '%s.json' % self.fingerprint())
+        if has_feature(module, 'invalidate_cache'):
+            self.invalidate()
+
+    def fingerprint(self):
+        ''' hash of connection parameters, the password is not included so that it cannot be brute-forced from the file name '''
+        keys = ('hostname', 'http_port', 'username', 'cert_filepath', 'key_filepath')
+        identity = '\n'.join(str(self.module.params.get(key)) for key in keys)
+        return hashlib.sha256(identity.encode()).hexdigest()
+
+    def _read(self):
+        try:
+            with open(self.path, 'r') as cache_file:
+                entries = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return dict()
+        return entries if isinstance(entries, dict) else dict()
+
+    def get(self, name, expire=True):
+        ''' return cached value, or None if not found or expired '''
+        entry = self._read().get(name)
+        if not isinstance(entry, dict) or 'value' not in entry:
+            return None
+        if not expire:
+            return entry['value']
+        try:
+            age = time.time() - float(entry.get('timestamp'))
+        except (TypeError, ValueError):
+            return None
+        if age < 0 or age > self.ttl:
+            return None
+        return entry['value']
+
+    def set(self, name, value):
+        ''' update or add entry, file is replaced atomically as other modules may be reading it '''
+        entries = self._read()
+        entries[name] = dict(timestamp=time.time(), value=value)
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir, 0o700)
+            fdesc, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fdesc, 'w') as cache_file:
+                json.dump(entries, cache_file)
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError):
+            pass
+
+    def invalidate(self):
+        try:
+            os.remove(self.path)
+        except (IOError, OSError):
+            pass
+
+
+class DebugLog(object):
+    ''' log of (status_code, message) records, for debug purposes
+        when max_entries is set, the oldest records are discarded when it is reached
+        when max_size is set, messages are truncated to max_size
+        a message can be a callable, which is only called when the record is read
+    '''
+    def __init__(self, max_entries=None, max_size=None):
+        self.records = deque(maxlen=max_entries)
+        self.max_entries = max_entries
+        self.max_size = max_size
+
+    def append(self, record):
+        if self.max_entries == 0:
+            return
+        status_code, message = record
+        if not callable(message):
+            # truncate early, so that large responses are not kept in memory
+            message = self.truncate(message)
+        self.records.append((status_code, message))
+
+    def truncate(self, message):
+        if self.max_size is not None and isinstance(message, (binary_type, text_type)) and len(message) > self.max_size:
+            suffix = '... (%d bytes truncated)' % (len(message) - self.max_size)
+            return message[:self.max_size] + (suffix.encode() if isinstance(message, binary_type) else suffix)
+        return message
+
+    def format(self, record):
+        status_code, message = record
+        if callable(message):
+            message = self.truncate(message())
+        return status_code, message
+
+    def __getitem__(self, index):
+        return self.format(self.records[index])
+
+    def __iter__(self):
+        for record in list(self.records):
+            yield self.format(record)
+
+    def __len__(self):
+        return len(self.records)
+
+
+# connect time for REST calls, measured by TimedHTTPSConnection in the thread issuing the request
+_perf_thread_data = threading.local()
+UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
+
+
+class OntapPerfRecorder(object):
+    ''' record the latency and payload sizes of each ZAPI and REST call
+        with the perf_stats feature flag, a perf section summarizing the calls per API is added to the module result
+        with the perf_stats_file feature flag, one JSON line per call is appended to a file
+        latency is split into connect, time to first byte (ttfb), and body, when the transport allows it
+    '''
+    def __init__(self, module, report, filepath):
+        self.module = module
+        self.report = report
+        self.filepath = filepath
+        self.calls = list()
+        self.pages = dict()
+        self.lock = threading.Lock()
+        self.start = time.time()
+        self.file_error = None
+
+    def install(self):
+        ''' add the perf section to the module result, on success and on failure '''
+        for name in ('exit_json', 'fail_json'):
+            setattr(self.module, name, self.add_perf_to_result(getattr(self.module, name)))
+
+    def add_perf_to_result(self, exit_method):
+        def wrapper(*args, **kwargs):
+            if self.report and 'perf' not in kwargs:
+                kwargs['perf'] = self.summary()
+            return exit_method(*args, **kwargs)
+        return wrapper
+
+    def next_page(self, key, continuation):
+        ''' a continuation request is the next page of the previous request with the same key '''
+        with self.lock:
+            page = self.pages.get(key, 0) + 1 if continuation else 1
+            self.pages[key] = page
+        return page
+
+    def record(self, transport, api, method, status, total, request_bytes=0, response_bytes=0,
+               connect=None, ttfb=None, body=None, retries=0, page=1):
+        call = dict(transport=transport, api=UUID_RE.sub('{uuid}', api), method=method, status=status, page=page, retries=retries,
+                    total=round(total, 4), request_bytes=request_bytes, response_bytes=response_bytes)
+        for key, value in (('connect', connect), ('ttfb', ttfb), ('body', body)):
+            call[key] = None if value is None else round(value, 4)
+        with self.lock:
+            self.calls.append(call)
+            if self.filepath is not None:
+                self.write_call(call)
+
+    def write_call(self, call):
+        ''' best effort, a warning is reported once if the file cannot be written '''
+        line = dict(timestamp=time.time(), module=getattr(self.module, '_name', None), hostname=self.module.params.get('hostname'))
+        line.update(call)
+        try:
+            with open(self.filepath, 'a') as perf_file:
+                perf_file.write(json.dumps(line) + '\n')
+        except (IOError, OSError) as exc:
+            if self.file_error is None:
+                self.file_error = str(exc)
+                self.module.warn('Unable to write perf stats to %s: %s' % (self.filepath, self.file_error))
+
+    def summary(self):
+        ''' totals, and totals per API, times in seconds '''
+        with self.lock:
+            calls = list(self.calls)
+        apis = dict()
+        for call in calls:
+            key = '%s %s' % (call['method'], call['api']) if call['transport'] == 'rest' else call['api']
+            totals = apis.setdefault(key, dict(calls=0, pages=0, retries=0, total=0.0, connect=0.0, ttfb=0.0, body=0.0,
+                                               request_bytes=0, response_bytes=0))
+            totals['calls'] += 1
+            totals['pages'] = max(totals['pages'], call['page'])
+            for field in ('retries', 'total', 'connect', 'ttfb', 'body', 'request_bytes', 'response_bytes'):
+                totals[field] += call[field] or 0
+        for totals in apis.values():
+            for field in ('total', 'connect', 'ttfb', 'body'):
+                totals[field] = round(totals[field], 4)
+        return dict(
+            calls=len(calls),
+            wall_time=round(time.time() - self.start, 4),
+            time_on_wire=round(sum(call['total'] for call in calls), 4),
+            request_bytes=sum(call['request_bytes'] for call in calls),
+            response_bytes=sum(call['response_bytes'] for call in calls),
+            apis=apis,
+        )
+
+
+def get_perf_recorder(module):
+    ''' return the recorder for this module, created on first use, or None if perf stats are not enabled '''
+    if module is None:
+        return None
+    recorder = getattr(module, 'netapp_perf_recorder', None)
+    if recorder is None:
+        report = has_feature(module, 'perf_stats')
+        filepath = get_feature(module, 'perf_stats_file')
+        if not report and filepath is None:
+            return None
+        recorder = OntapPerfRecorder(module, report, filepath)
+        recorder.install()
+        module.netapp_perf_recorder = recorder
+    return recorder
+
+
+if HAS_REQUESTS:
+    class TimedHTTPSConnection(urllib3.connection.HTTPSConnection):
+        ''' record the time spent in connect, including the TLS handshake '''
+        def connect(self):
+            start = time.time()
+            try:
+                super(TimedHTTPSConnection, self).connect()
+            finally:
+                _perf_thread_data.connect = getattr(_perf_thread_data, 'connect', 0.0) + time.time() - start
+
+    class TimedHTTPSConnectionPool(urllib3.connectionpool.HTTPSConnectionPool):
+        ConnectionCls = TimedHTTPSConnection
+
+
+# one HTTP session per ElementSW endpoint, shared by all the connections in this process
+SF_SESSIONS = dict()
+# API version per ElementSW endpoint, as reported by the first connection in this process
+# with the rest_capability_cache feature flag, it is also kept in the on-disk cache
+SF_API_VERSIONS = dict()
+
+
+if HAS_SF_SDK:
+    class SessionDispatcher(solidfire.common.CurlDispatcher):
+        ''' same as CurlDispatcher, but connections are kept alive, and reused by all the dispatchers for the same target '''
+        def __init__(self, target, api_version, username, password, verify_ssl=False):
+            endpoint = 'https://%s/json-rpc/%s' % (target, float(api_version))
+            super(SessionDispatcher, self).__init__(endpoint, username, password, verify_ssl)
+            if target not in SF_SESSIONS:
+                SF_SESSIONS[target] = requests.Session()
+            self.session = SF_SESSIONS[target]
+
+        def post(self, data):
+            if self._username is None or self._password is None:
+                raise ValueError("Username or Password is not set")
+            resp = self.session.post(self._endpoint, data=data, verify=self._verify_ssl, timeout=(self._connect_timeout, self._timeout),
+                                     auth=HTTPBasicAuth(self._username, self._password))
+            if resp.text == '':
+                return {"code": resp.status_code, "name": resp.reason, "message": ""}
+            return resp.text
+
+
+def create_element(target, username, password, api_version, timeout=30):
+    ''' create an Element object, using a shared session
+        when the API version is not known, the target is asked for its current version, and the version is cached
+    '''
+    if api_version is None:
+        api_version = SF_API_VERSIONS.get(target)
+    if api_version is None:
+        element = Element(target, username, password, min_sdk_version, dispatcher=SessionDispatcher(target, min_sdk_version, username, password))
+        element.timeout(timeout)
+        api_version = element.get_api().current_version
+        SF_API_VERSIONS[target] = api_version
+    element = Element(target, username, password, api_version, dispatcher=SessionDispatcher(target, api_version, username, password))
+    element.timeout(timeout)
+    return element
+
+
 def create_sf_connection(module, port=None):
     hostname = module.params['hostname']
     username = module.params['username']
     password = module.params['password']
+    # same default as ElementFactory.create
+    target = hostname if port is None or port == 443 else '%s:%s' % (hostname, port)
 
     if HAS_SF_SDK and hostname and username and password:
+        api_version = get_feature(module, 'sf_api_version')
+        if api_version is not None:
+            try:
+                if float(api_version) < min_sdk_version:
+                    module.fail_json(msg="Error: sf_api_version %s is lower than the minimum version supported by the SDK: %s" % (api_version, min_sdk_version))
+            except (TypeError, ValueError):
+                module.fail_json(msg="Error: sf_api_version is expected to be a number, eg 10.1, got: %s" % api_version)
+        # with rest_capability_cache, the version reported by the target is kept on disk, and shared across tasks
+        cache = OntapCache(module) if api_version is None and has_feature(module, 'rest_capability_cache') else None
+        cache_key = 'sf_api_version:%s' % target
+        if cache is not None:
+            api_version = cache.get(cache_key)
         try:
-            return_val = ElementFactory.create(hostname, username, password, port=port)
-            return return_val
+            return_val = create_element(target, username, password, api_version)
         except Exception:
             raise Exception("Unable to create SF connection")
+        if cache is not None and api_version is None and target in SF_API_VERSIONS:
+            cache.set(cache_key, SF_API_VERSIONS[target])
+        return return_val
     else:
         module.fail_json(msg="the python SolidFire SDK module is required")
 
@@ -273,8 +595,42 @@ def is_zapi_write_access_error(message):
     return False
 
 
+def spool_ems_event(module, source, event):
+    ''' add event to the spool for this cluster
+        return None if the event was spooled, or a description of all spooled events if they need to be sent now
+        the spool is best effort, concurrent tasks may lose a count
+    '''
+    try:
+        interval = int(get_feature(module, 'ems_spool_interval'))
+    except (TypeError, ValueError):
+        module.fail_json(msg="Error: expected int type for feature flag: ems_spool_interval, got: %s" % get_feature(module, 'ems_spool_interval'))
+    if interval <= 0:
+        return event
+    cache = OntapCache(module)
+    spool = cache.get('ems_spool', expire=False)
+    if not isinstance(spool, dict):
+        spool = dict()
+    events = spool.get('events') or dict()
+    events[source] = events.get(source, 0) + 1
+    last_flush = spool.get('last_flush', 0)
+    now = time.time()
+    if 0 <= now - last_flush < interval:
+        cache.set('ems_spool', dict(last_flush=last_flush, events=events))
+        return None
+    cache.set('ems_spool', dict(last_flush=now, events=dict()))
+    return '%s - events since last report: %s' % (event, ', '.join('%s: %d' % (key, events[key]) for key in sorted(events)))
+
+
 def ems_log_event(source, server, name="Ansible", ident="12345", version=COLLECTION_VERSION,
                   category="Information", event="setup", autosupport="false"):
+    module = getattr(server, 'module', None)
+    if module is not None:
+        # OntapZAPICx, feature flags are available
+        if module.check_mode and not has_feature(module, 'ems_log_in_check_mode'):
+            return
+        event = spool_ems_event(module, source, event)
+        if event is None:
+            return
     ems_log = zapi.NaElement('ems-autosupport-log')
     # Host name invoking the API.
     ems_log.add_new_child("computer-name", name)
@@ -326,6 +682,50 @@ def get_cserver_zapi(server):
     return None
 
 
+def zapi_get_iter_pages(server, call, max_records=None, query=None, desired_attributes=None, children=None, enable_tunneling=True):
+    ''' generator yielding the results of a get-iter ZAPI, one page at a time
+        the next-tag from a page is used to request the following page, so only one page is kept in memory
+        query and desired_attributes are wrapped in query and desired-attributes elements,
+        they can be a NaElement, or a dict as used by translate_struct
+        children is a dict of additional elements to add to each request
+    '''
+    tag = None
+    while True:
+        api_call = zapi.NaElement(call)
+        if children:
+            for key, value in children.items():
+                api_call.add_new_child(key, value)
+        if max_records is not None:
+            api_call.add_new_child('max-records', str(max_records))
+        for name, value in (('query', query), ('desired-attributes', desired_attributes)):
+            if value is None:
+                continue
+            element = zapi.NaElement(name)
+            if isinstance(value, zapi.NaElement):
+                element.add_child_elem(value)
+            else:
+                element.translate_struct(value)
+            api_call.add_child_elem(element)
+        if tag is not None:
+            api_call.add_new_child('tag', tag, True)
+        result = server.invoke_successfully(api_call, enable_tunneling=enable_tunneling)
+        yield result
+        tag = result.get_child_content('next-tag')
+        if not tag:
+            break
+
+
+def zapi_get_iter(server, call, attributes_list_tag='attributes-list', **kwargs):
+    ''' generator yielding the records returned by a get-iter ZAPI, one at a time, fetching a page when needed
+        kwargs are passed to zapi_get_iter_pages
+    '''
+    for result in zapi_get_iter_pages(server, call, **kwargs):
+        records = result.get_child_by_name(attributes_list_tag)
+        if records is not None:
+            for record in records.get_children():
+                yield record
+
+
 def classify_zapi_exception(error):
     ''' return type of error '''
     try:
@@ -346,6 +746,19 @@ def classify_zapi_exception(error):
 
 
 def get_cserver(connection, is_rest=False):
+    module = getattr(connection, 'module', None)
+    if module is not None and has_feature(module, 'cserver_cache'):
+        cache = OntapCache(module)
+        cserver = cache.get('cserver')
+        if cserver is None:
+            cserver = get_cserver_no_cache(connection, is_rest)
+            if cserver is not None:
+                cache.set('cserver', cserver)
+        return cserver
+    return get_cserver_no_cache(connection, is_rest)
+
+
+def get_cserver_no_cache(connection, is_rest=False):
     if not is_rest:
         return get_cserver_zapi(connection)
 
@@ -366,12 +779,172 @@ def get_cserver(connection, is_rest=False):
     return None
 
 
+class InfoStreamWriter(object):
+    ''' stream info records to a JSON lines file, gzip compressed when the file name ends with .gz
+        the records for a subset are written as one section: a contiguous range of lines, or a gzip member
+        a spooled section is written to a temporary file, and appended when closed, so that sections can be written concurrently
+    '''
+    def __init__(self, module, path):
+        self.path = path
+        self.compress = path.endswith('.gz')
+        self.lock = threading.Lock()
+        try:
+            self.fd = open(path, 'wb')
+        except (IOError, OSError) as exc:
+            module.fail_json(msg='Error opening output_file %s: %s' % (path, to_native(exc)))
+
+    def open_section(self, spool=False):
+        return InfoStreamSection(self, spool)
+
+    def close(self):
+        self.fd.close()
+
+
+class InfoStreamSection(object):
+    ''' records for a subset, see InfoStreamWriter '''
+    def __init__(self, writer, spool):
+        self.writer = writer
+        self.spool = spool
+        self.raw = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(writer.path))) if spool else writer.fd
+        self.offset = self.raw.tell()
+        self.stream = gzip.GzipFile(filename='', mode='wb', fileobj=self.raw) if writer.compress else self.raw
+        self.num_records = 0
+
+    def write(self, record):
+        self.stream.write(json.dumps(record).encode() + b'\n')
+        self.num_records += 1
+
+    def close(self):
+        ''' return a manifest for the section, with its offset and length in bytes '''
+        if self.writer.compress:
+            # writes the gzip trailer, but does not close raw
+            self.stream.close()
+        if self.spool:
+            with self.writer.lock:
+                self.offset = self.writer.fd.tell()
+                self.raw.seek(0)
+                shutil.copyfileobj(self.raw, self.writer.fd)
+                length = self.writer.fd.tell() - self.offset
+            self.raw.close()
+        else:
+            length = self.raw.tell() - self.offset
+        return dict(output_file=self.writer.path, offset=self.offset, length=length, num_records=self.num_records)
+
+
+class JobPoller(object):
+    ''' wait between polls with an exponential backoff, from sub-second intervals up to max_interval
+        elapsed time is the larger of the wall clock time and the time spent sleeping
+        timeout is in seconds, None to wait forever
+    '''
+    def __init__(self, timeout, max_interval=30, initial_interval=0.5, backoff=2):
+        self.timeout = timeout
+        self.max_interval = max_interval
+        self.interval = min(initial_interval, max_interval)
+        self.backoff = backoff
+        self.start = time.time()
+        self.slept = 0
+        self.polls = 1
+
+    def elapsed(self):
+        return max(self.slept, time.time() - self.start)
+
+    def timed_out(self):
+        return self.timeout is not None and self.elapsed() >= self.timeout
+
+    def sleep(self):
+        ''' sleep until the next poll, the last sleep is shortened to expire with the timeout
+            return False without sleeping if the timeout is reached
+        '''
+        delay = self.interval
+        if self.timeout is not None:
+            remaining = self.timeout - self.elapsed()
+            if remaining <= 0:
+                return False
+            delay = min(delay, remaining)
+        time.sleep(delay)
+        self.slept += delay
+        self.polls += 1
+        self.interval = min(self.interval * self.backoff, self.max_interval)
+        return True
+
+    def report(self):
+        return '%d poll(s) in %.1f seconds' % (self.polls, self.elapsed())
+
+
+def zapi_get_job(module, server, jobid):
+    ''' return a dict with job-progress, job-state and job-completion, or None if the job is not found '''
+    job_get = zapi.NaElement('job-get')
+    job_get.add_new_child('job-id', str(jobid))
+    try:
+        result = server.invoke_successfully(job_get, enable_tunneling=True)
+    except zapi.NaApiError as error:
+        if to_native(error.code) == "15661":
+            # Not found
+            return None
+        module.fail_json(msg='Error fetching job info: %s' % to_native(error),
+                         exception=traceback.format_exc())
+    job_info = result.get_child_by_name('attributes').get_child_by_name('job-info')
+    results = {
+        'job-progress': job_info['job-progress'],
+        'job-state': job_info['job-state']
+    }
+    if job_info.get_child_by_name('job-completion') is not None:
+        results['job-completion'] = job_info['job-completion']
+    else:
+        results['job-completion'] = None
+    return results
+
+
+def zapi_wait_on_job(module, server, jobid, timeout, max_interval=30):
+    ''' poll a ZAPI job until it completes, using a JobPoller
+        if the job is not found, look for it on the admin vserver, as jobs are owned by the cluster vserver when running as cluster admin
+        return None on success, or an error message
+    '''
+    poller = JobPoller(timeout, max_interval=max_interval)
+    job_server = server
+    while True:
+        results = zapi_get_job(module, job_server, jobid)
+        if results is None and job_server == server:
+            cserver = get_cserver(server)
+            job_server = setup_na_ontap_zapi(module=module, vserver=cserver)
+            continue
+        if results is None:
+            return 'cannot locate job with id: %d' % int(jobid)
+        if results['job-state'] not in ('queued', 'running', 'success', 'failure'):
+            module.fail_json(msg='Unexpected job status in: %s' % repr(results))
+        if results['job-state'] not in ('queued', 'running') or not poller.sleep():
+            break
+
+    if results['job-state'] == 'success':
+        return None
+    if results['job-state'] in ('queued', 'running'):
+        return 'job completion exceeded expected timer of: %s seconds, after %s' % (timeout, poller.report())
+    if results['job-completion'] is not None:
+        return results['job-completion']
+    return results['job-progress']
+
+
+class ResumableHTTPSConnection(http_client.HTTPSConnection):
+    ''' HTTPSConnection that can resume a previous TLS session when reconnecting
+        set tls_session to the session of a previous connection to use an abbreviated handshake
+    '''
+    tls_session = None
+
+    def connect(self):
+        if self.tls_session is None:
+            return http_client.HTTPSConnection.connect(self)
+        http_client.HTTPConnection.connect(self)
+        server_hostname = self._tunnel_host or self.host
+        self.sock = self._context.wrap_socket(self.sock, server_hostname=server_hostname, session=self.tls_session)
+
+
 if HAS_NETAPP_LIB:
     class OntapZAPICx(zapi.NaServer):
         ''' override zapi NaServer class to:
         - enable SSL certificate authentication
         - ignore invalid XML characters in ONTAP output (when using CLI module)
         - add Authorization header when using basic authentication
+        - optionally, keep the HTTP connection alive across calls, and resume the TLS session on reconnect
         '''
         def __init__(self, hostname=None, server_type=zapi.NaServer.SERVER_TYPE_FILER,
                      transport_type=zapi.NaServer.TRANSPORT_TYPE_HTTP,
@@ -392,8 +965,16 @@ if HAS_NETAPP_LIB:
             if auth_method == 'speedy_basic_auth':
                 auth = '%s:%s' % (username, password)
                 self.base64_creds = base64.b64encode(auth.encode()).decode()
-
-        def _create_certificate_auth_handler(self):
+            # a persistent connection requires the credentials to be sent proactively, as there is no challenge handler
+            self.keep_alive = module is not None and has_feature(module, 'zapi_keep_alive') and \
+                (self.base64_creds is not None or style == zapi.NaServer.STYLE_CERTIFICATE)
+            self.connection = None
+            self.connection_reused = False
+            self.tls_session = None
+            self.perf = get_perf_recorder(module)
+            self.perf_timing = None
+
+        def _create_ssl_context(self, load_cert_chain):
             try:
                 context = ssl.create_default_context()
             except AttributeError as exc:
@@ -403,16 +984,157 @@ if HAS_NETAPP_LIB:
             if not self.validate_certs:
                 context.check_hostname = False
                 context.verify_mode = ssl.CERT_NONE
-            try:
-                context.load_cert_chain(self.cert_filepath, keyfile=self.key_filepath)
-            except IOError as exc:      # python 2.7 does not have FileNotFoundError
-                msg = 'Cannot load SSL certificate, check files exist.'
-                msg += '  More info: %s' % repr(exc)
-                self.module.fail_json(msg=msg)
+            if load_cert_chain:
+                try:
+                    context.load_cert_chain(self.cert_filepath, keyfile=self.key_filepath)
+                except IOError as exc:      # python 2.7 does not have FileNotFoundError
+                    msg = 'Cannot load SSL certificate, check files exist.'
+                    msg += '  More info: %s' % repr(exc)
+                    self.module.fail_json(msg=msg)
+            return context
+
+        def _create_certificate_auth_handler(self):
+            context = self._create_ssl_context(load_cert_chain=True)
             return zapi.urllib.request.HTTPSHandler(context=context)
 
+        def _build_opener(self):
+            super(OntapZAPICx, self)._build_opener()
+            if self.perf is not None:
+                self._opener.add_handler(ZAPITimingHandler(self))
+
+        def perf_mark(self, event, value=None):
+            ''' record time or value for the call in progress, when perf stats are enabled '''
+            if self.perf_timing is not None:
+                self.perf_timing[event] = time.time() if value is None else value
+
+        def _get_connection(self):
+            ''' return the current connection, or open a new one '''
+            if self.connection is None:
+                kwargs = dict()
+                if hasattr(self, '_timeout'):
+                    kwargs['timeout'] = self._timeout
+                if self._protocol == zapi.NaServer.TRANSPORT_TYPE_HTTPS:
+                    load_cert_chain = self._auth_style == zapi.NaServer.STYLE_CERTIFICATE
+                    context = self._create_ssl_context(load_cert_chain)
+                    self.connection = ResumableHTTPSConnection(self._host, int(self._port), context=context, **kwargs)
+                    if getattr(ssl, 'SSLSession', None) is not None:
+                        # python 3.6 or later
+                        self.connection.tls_session = self.tls_session
+                else:
+                    self.connection = http_client.HTTPConnection(self._host, int(self._port), **kwargs)
+                self.connection_reused = False
+            return self.connection
+
+        def _close_connection(self):
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+        @staticmethod
+        def _is_closed_by_server(exc):
+            ''' the server closed an idle connection, before receiving the request or without processing it
+                a timeout is excluded, as the request may have been received
+            '''
+            if isinstance(exc, socket.timeout):
+                return False
+            if isinstance(exc, http_client.BadStatusLine):
+                # includes RemoteDisconnected with python 3
+                return True
+            # ConnectionResetError and BrokenPipeError are not defined in python 2.7, check errno
+            return isinstance(exc, socket.error) and getattr(exc, 'errno', None) in (errno.ECONNRESET, errno.EPIPE)
+
+        @staticmethod
+        def _api_error(exc):
+            ''' report the same errors as netapp-lib '''
+            if isinstance(exc, socket.error) and getattr(exc, 'errno', None) == errno.ECONNREFUSED:
+                return zapi.NaApiError('Unable to connect', (exc,))
+            if isinstance(exc, (http_client.HTTPException, socket.error)):
+                return zapi.NaApiError('URL error', repr(exc))
+            return zapi.NaApiError('Unexpected error', repr(exc))
+
+        def _send_keep_alive_request(self, request):
+            ''' send request on the persistent connection, and return the raw response
+                if the server closed an idle connection before sending a response, reconnect once and resend
+                there is no retry on a timeout, or once the response headers are received, as the request may have been processed
+            '''
+            headers = dict(request.header_items())
+            retries = 0
+            while True:
+                connection = self._get_connection()
+                reused = self.connection_reused
+                try:
+                    if self.perf_timing is not None and connection.sock is None:
+                        connection.connect()
+                        self.perf_mark('connect', time.time() - self.perf_timing['start'])
+                    connection.request('POST', request.selector, body=request.data, headers=headers)
+                    response = connection.getresponse()
+                except Exception as exc:
+                    self._close_connection()
+                    if reused and self._is_closed_by_server(exc):
+                        retries += 1
+                        self.perf_mark('retries', retries)
+                        continue
+                    raise self._api_error(exc)
+                break
+            self.perf_mark('headers')
+            try:
+                response_xml = response.read()
+            except Exception as exc:
+                self._close_connection()
+                raise self._api_error(exc)
+            self.connection_reused = True
+            if connection.sock is not None:
+                self.tls_session = getattr(connection.sock, 'session', None)
+            if response.will_close:
+                self._close_connection()
+            if not 200 <= response.status < 300:
+                raise zapi.NaApiError(response.status, response.reason)
+            return response_xml
+
+        def invoke_elem(self, na_element, enable_tunneling=False):
+            ''' record latency and payload sizes if perf stats are enabled '''
+            if self.perf is None:
+                return self._invoke_elem(na_element, enable_tunneling)
+            self.perf_timing = dict(start=time.time(), retries=0, request_bytes=0, response_bytes=0)
+            status = 'passed'
+            try:
+                result = self._invoke_elem(na_element, enable_tunneling)
+                if result is not None and result.has_attr('status'):
+                    status = result.get_attr('status')
+                return result
+            except zapi.NaApiError as exc:
+                status = str(exc.code)
+                raise
+            finally:
+                self.record_perf(na_element, status)
+
+        def record_perf(self, na_element, status):
+            timing, self.perf_timing = self.perf_timing, None
+            end = time.time()
+            connect = timing.get('connect')
+            ttfb = body = None
+            if 'headers' in timing:
+                ttfb = timing['headers'] - timing['start'] - (connect or 0)
+                body = timing.get('parse', end) - timing['headers']
+            api = na_element.get_name()
+            continuation = na_element.get_child_by_name('tag') is not None
+            self.perf.record('zapi', api, 'POST', status, end - timing['start'], timing['request_bytes'], timing['response_bytes'],
+                             connect, ttfb, body, timing['retries'], self.perf.next_page(api, continuation))
+
+        def _invoke_elem(self, na_element, enable_tunneling=False):
+            ''' use a persistent connection if enabled, otherwise defer to netapp-lib '''
+            if not self.keep_alive:
+                return super(OntapZAPICx, self).invoke_elem(na_element, enable_tunneling=enable_tunneling)
+            if not na_element or not isinstance(na_element, zapi.NaElement):
+                raise ValueError('NaElement must be supplied to invoke API')
+            request, dummy = self._create_request(na_element, enable_tunneling=enable_tunneling)
+            response_xml = self._send_keep_alive_request(request)
+            return self._get_result(response_xml)
+
         def _parse_response(self, response):
             ''' handling XML parsing exception '''
+            self.perf_mark('parse')
+            self.perf_mark('response_bytes', len(response or b''))
             try:
                 return super(OntapZAPICx, self)._parse_response(response)
             except zapi.etree.XMLSyntaxError as exc:
@@ -448,8 +1170,20 @@ if HAS_NETAPP_LIB:
             request, netapp_element = super(OntapZAPICx, self)._create_request(na_element, enable_tunneling=enable_tunneling)
             if self.base64_creds is not None:
                 request.add_header("Authorization", "Basic %s" % self.base64_creds)
+            self.perf_mark('request_bytes', len(request.data or b''))
             return request, netapp_element
 
+    class ZAPITimingHandler(zapi.urllib.request.BaseHandler):
+        ''' record the time the response headers are received, before the body is read '''
+        def __init__(self, server):
+            self.server = server
+
+        def http_response(self, request, response):
+            self.server.perf_mark('headers')
+            return response
+
+        https_response = http_response
+
 
 class OntapRestAPI(object):
     ''' wrapper to send requests to ONTAP REST APIs '''
@@ -477,7 +1211,10 @@ class OntapRestAPI(object):
             valid=False
         )
         self.errors = list()
-        self.debug_logs = list()
+        self.debug_logs = self.create_debug_log()
+        self.session = None
+        self.cache = None
+        self.perf = get_perf_recorder(module)
         self.auth_method = set_auth_method(self.module, self.username, self.password, self.cert_filepath, self.key_filepath)
         self.check_required_library()
 
@@ -500,6 +1237,42 @@ class OntapRestAPI(object):
         if not HAS_REQUESTS:
             self.module.fail_json(msg=missing_required_lib('requests'))
 
+    def create_debug_log(self):
+        limits = dict()
+        for name in ('max_entries', 'max_size'):
+            flag = 'debug_log_%s' % name
+            if get_feature(self.module, flag) is None:
+                continue
+            try:
+                limits[name] = int(get_feature(self.module, flag))
+            except (TypeError, ValueError):
+                self.module.fail_json(msg="Error: expected int type for feature flag: %s, got: %s" % (flag, get_feature(self.module, flag)))
+        return DebugLog(**limits)
+
+    def get_cache(self):
+        ''' return the on-disk cache if enabled, None otherwise '''
+        if self.cache is None and has_feature(self.module, 'rest_capability_cache'):
+            self.cache = OntapCache(self.module)
+        return self.cache
+
+    def get_session(self):
+        ''' create a session on first use, and reuse it for the lifetime of the module
+            the session keeps connections alive in a pool, avoiding a TCP and TLS handshake for each request
+        '''
+        if self.session is None:
+            pool_maxsize = get_feature(self.module, 'rest_pool_maxsize')
+            try:
+                pool_maxsize = int(pool_maxsize)
+            except (TypeError, ValueError):
+                self.module.fail_json(msg="Error: expected int type for feature flag: rest_pool_maxsize, got: %s" % pool_maxsize)
+            self.session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+            if self.perf is not None:
+                # measure connect time, including the TLS handshake
+                adapter.poolmanager.pool_classes_by_scheme = dict(adapter.poolmanager.pool_classes_by_scheme, https=TimedHTTPSConnectionPool)
+            self.session.mount('https://', adapter)
+        return self.session
+
     def send_request(self, method, api, params, json=None, accept=None,
                      vserver_name=None, vserver_uuid=None):
         ''' send http request and process reponse, including error conditions '''
@@ -510,6 +1283,7 @@ class OntapRestAPI(object):
         json_error = None
         error_details = None
         headers = None
+        response = None
         if accept is not None or vserver_name is not None or vserver_uuid is not None:
             headers = dict()
             # accept is used to turn on/off HAL linking
@@ -540,11 +1314,18 @@ class OntapRestAPI(object):
         else:
             raise KeyError(self.auth_method)
 
-        self.log_debug('sending', repr(dict(method=method, url=url, verify=self.verify, params=params,
-                                            timeout=self.timeout, json=json, headers=headers, **kwargs)))
+        # formatted only if the debug log is read
+        self.log_debug('sending', lambda: repr(dict(method=method, url=url, verify=self.verify, params=params,
+                                                    timeout=self.timeout, json=json, headers=headers, **kwargs)))
+        if has_feature(self.module, 'rest_keep_alive'):
+            request_method = self.get_session().request
+        else:
+            request_method = requests.request
+        start = time.time()
+        _perf_thread_data.connect = 0.0
         try:
-            response = requests.request(method, url, verify=self.verify, params=params,
-                                        timeout=self.timeout, json=json, headers=headers, **kwargs)
+            response = request_method(method, url, verify=self.verify, params=params,
+                                      timeout=self.timeout, json=json, headers=headers, **kwargs)
             content = response.content  # for debug purposes
             status_code = response.status_code
             # If the response was successful, no Exception will be raised
@@ -566,12 +1347,37 @@ class OntapRestAPI(object):
             self.log_error(status_code, 'Endpoint error: %d: %s' % (status_code, json_error))
             error_details = json_error
         self.log_debug(status_code, content)
+        if self.perf is not None:
+            self.record_perf(method, api, params, status_code, response, time.time() - start)
         if not json_dict and method == 'OPTIONS':
             # OPTIONS provides the list of supported verbs
             json_dict['Allow'] = response.headers['Allow']
         return status_code, json_dict, error_details
 
+    def record_perf(self, method, api, params, status_code, response, total):
+        ''' connect time is only available with a persistent session, otherwise it is included in ttfb '''
+        connect = _perf_thread_data.connect if self.session is not None else None
+        ttfb = body = None
+        request_bytes = response_bytes = 0
+        if response is not None:
+            # elapsed is measured until the headers are received
+            elapsed = response.elapsed.total_seconds()
+            ttfb = elapsed - (connect or 0)
+            body = total - elapsed
+            request_bytes = len(response.request.body or b'')
+            response_bytes = len(response.content or b'')
+        path, dummy, query = api.partition('?')
+        # next links start with /
+        path = path.strip('/')
+        # a next link carries start.* parameters
+        continuation = 'start.' in query or any(key.startswith('start.') for key in params or [])
+        self.perf.record('rest', path, method, status_code, total, request_bytes, response_bytes,
+                         connect, ttfb, body, 0, self.perf.next_page(method + path, continuation))
+
     def wait_on_job(self, job, timeout=600, increment=60):
+        ''' poll a REST job until it completes, starting with sub-second intervals, backing off up to increment seconds
+            return the job message and error
+        '''
         try:
             url = job['_links']['self']['href'].split('api/')[1]
         except Exception as err:
@@ -588,20 +1394,23 @@ class OntapRestAPI(object):
         keep_running = True
         error = None
         message = None
-        runtime = 0
-        retries = 0
-        max_retries = 3
+        poller = JobPoller(timeout, max_interval=increment)
+        # transient errors are retried every <increment> seconds, for up to 3 * <increment> seconds
+        # this budget is independent of the poll backoff, so a short controller hiccup does not fail a long job
+        error_retry_budget = 3 * increment
+        error_retry_time = 0
         while keep_running:
-            # Will run every every <increment> seconds for <timeout> seconds
+            # Will poll with an increasing interval, up to <increment> seconds, for <timeout> seconds
             job_json, job_error = self.get(url, None)
             if job_error:
                 error = job_error
-                retries += 1
-                if retries > max_retries:
+                if error_retry_time >= error_retry_budget:
                     self.log_error(0, 'Job error: Reach max retries.')
                     break
+                time.sleep(increment)
+                error_retry_time += increment
             else:
-                retries = 0
+                error_retry_time = 0
                 # a job looks like this
                 # {
                 #   "uuid": "cca3d070-58c6-11ea-8c0c-005056826c14",
@@ -622,17 +1431,15 @@ class OntapRestAPI(object):
                 if job_json['state'] == 'failure':
                     # if the job as failed, return message as error
                     return None, message
-                if job_json['state'] != 'running':
+                if job_json['state'] not in ('queued', 'running'):
                     keep_running = False
-                else:
+                elif poller.timed_out():
                     # Would like to post a message to user (not sure how)
-                    if runtime >= timeout:
-                        keep_running = False
-                        if job_json['state'] != 'success':
-                            self.log_error(0, 'Timeout error: Process still running')
-            if keep_running:
-                time.sleep(increment)
-                runtime += increment
+                    keep_running = False
+                    self.log_error(0, 'Timeout error: Process still running after %s' % poller.report())
+                elif not poller.sleep():
+                    keep_running = False
+        self.log_debug(0, 'Job %s: %s' % (url, poller.report()))
         return message, error
 
     def get(self, api, params=None):
@@ -691,6 +1498,15 @@ class OntapRestAPI(object):
         if self.use_rest == 'never' or used_unsupported_rest_properties:
             # force ZAPI if requested or if some parameter requires it
             return False, None
+        cache = self.get_cache()
+        if cache is not None:
+            capability = cache.get('rest_capability')
+            if isinstance(capability, dict):
+                self.set_version(capability.get('message'))
+                self.is_rest_error = capability.get('error')
+                if not capability.get('use_rest'):
+                    self.log_error(capability.get('status_code'), '%s (cached)' % self.is_rest_error)
+                return bool(capability.get('use_rest')), None
         # using GET rather than HEAD because the error messages are different
         method = 'GET'
         api = 'cluster'
@@ -698,6 +1514,10 @@ class OntapRestAPI(object):
         status_code, message, error = self.send_request(method, api, params=params)
         self.set_version(message)
         self.is_rest_error = str(error) if error else None
+        if cache is not None and status_code in (200, 404):
+            # only cache a definite answer: REST is available, or the REST API is not found as ONTAP does not support it
+            # a transient error, like a 401 or 403 during a password rotation, is not cached
+            cache.set('rest_capability', dict(use_rest=status_code == 200, status_code=status_code, message=message, error=self.is_rest_error))
         if status_code == 200:
             return True, None
         self.log_error(status_code, str(error))
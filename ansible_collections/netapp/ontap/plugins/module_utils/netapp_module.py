@@ -31,7 +31,7 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
-from copy import deepcopy
+from collections import Counter
 import re
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 
@@ -217,39 +217,65 @@ class NetAppModule(object):
     def compare_lists(current, desired, get_list_diff):
         ''' compares two lists and return a list of elements that are either the desired elements or elements that are
             modified from the current state depending on the get_list_diff flag
+            Lists are compared as multisets: order does not matter, but duplicates do.
             :param: current: current item attribute in ONTAP
             :param: desired: attributes from playbook
             :param: get_list_diff: specifies whether to have a diff of desired list w.r.t current list for an attribute
             :return: list of attributes to be modified
             :rtype: list
         '''
-        current_copy = deepcopy(current)
-        desired_copy = deepcopy(desired)
+        try:
+            desired_diff_list, changed = NetAppModule.compare_hashable_lists(current, desired)
+        except TypeError:
+            # some items are not hashable, eg dicts or lists
+            desired_diff_list, changed = NetAppModule.compare_unhashable_lists(current, desired)
 
+        if changed:
+            # there are changes
+            if get_list_diff:
+                return desired_diff_list
+            else:
+                return desired
+        else:
+            return None
+
+    @staticmethod
+    def compare_hashable_lists(current, desired):
+        ''' linear multiset comparison, counting occurrences of each item in current
+            :return: list of items in desired and not in current, and whether the lists differ
+            :raises: TypeError if an item is not hashable
+        '''
+        current_counts = Counter(current)
         # get what in desired and not in current
         desired_diff_list = list()
         for item in desired:
-            if item in current_copy:
-                current_copy.remove(item)
+            if current_counts[item] > 0:
+                current_counts[item] -= 1
             else:
                 desired_diff_list.append(item)
+        # anything left in current is not in desired
+        changed = bool(desired_diff_list) or any(count > 0 for count in current_counts.values())
+        return desired_diff_list, changed
 
-        # get what in current but not in desired
-        current_diff_list = list()
-        for item in current:
-            if item in desired_copy:
-                desired_copy.remove(item)
-            else:
-                current_diff_list.append(item)
+    @staticmethod
+    def compare_unhashable_lists(current, desired):
+        ''' quadratic multiset comparison, for items that cannot be hashed
+            :return: list of items in desired and not in current, and whether the lists differ
+        '''
+        # remove() only changes the list, not the items, a shallow copy is enough
+        current_copy = list(current)
 
-        if desired_diff_list or current_diff_list:
-            # there are changes
-            if get_list_diff:
-                return desired_diff_list
+        # get what in desired and not in current
+        desired_diff_list = list()
+        for item in desired:
+            if item in current_copy:
+                current_copy.remove(item)
             else:
-                return desired
-        else:
-            return None
+                desired_diff_list.append(item)
+
+        # anything left in current is not in desired
+        changed = bool(desired_diff_list) or bool(current_copy)
+        return desired_diff_list, changed
 
     def get_modified_attributes(self, current, desired, get_list_diff=False):
         ''' takes two dicts of attributes and return a dict of attributes that are
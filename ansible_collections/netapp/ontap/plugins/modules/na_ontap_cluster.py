@@ -377,13 +377,13 @@ class NetAppONTAPCluster(object):
         cluster_wait = netapp_utils.zapi.NaElement('cluster-create-join-progress-get')
         is_complete = False
         status = ''
-        wait = False    # do not wait on the first call
+        poller = None   # do not wait on the first call
 
         while not is_complete and status not in ('failed', 'success'):
-            if wait:
-                time.sleep(10)
+            if poller is not None:
+                poller.sleep()
             else:
-                wait = True
+                poller = netapp_utils.JobPoller(None, max_interval=10)
             try:
                 result = self.server.invoke_successfully(cluster_wait, enable_tunneling=True)
             except netapp_utils.zapi.NaApiError as error:
@@ -419,13 +419,13 @@ class NetAppONTAPCluster(object):
 
         is_complete = None
         failure_msg = None
-        wait = False    # do not wait on the first call
+        poller = None   # do not wait on the first call
 
         while is_complete != 'success' and is_complete != 'failure':
-            if wait:
-                time.sleep(10)
+            if poller is not None:
+                poller.sleep()
             else:
-                wait = True
+                poller = netapp_utils.JobPoller(None, max_interval=10)
             try:
                 result = self.server.invoke_successfully(cluster_node_status, enable_tunneling=True)
             except netapp_utils.zapi.NaApiError as error:
@@ -62,6 +62,19 @@ options:
     required: true
     type: str
 
+  parallelism:
+    description:
+    - Maximum number of requests to add or remove initiators in flight at any time.
+    - With ZAPI, each initiator is added or removed with its own request, and each worker uses its own connection.
+    - With REST, all initiators are added with a single request, and initiators are removed with one request each.
+    type: int
+    default: 1
+    version_added: '21.1.0'
+
+notes:
+  - The current initiators are read once, and only the missing (or present if state is absent) initiators are changed.
+  - REST is only used if use_rest is always, ZAPI is used if use_rest is auto or never.
+
 '''
 
 EXAMPLES = '''
@@ -87,19 +100,35 @@ EXAMPLES = '''
 '''
 
 RETURN = '''
+added_count:
+  description: Number of initiators added to the igroup, or that would be added in check mode.
+  returned: always
+  type: int
+removed_count:
+  description: Number of initiators removed from the igroup, or that would be removed in check mode.
+  returned: always
+  type: int
 '''
 
+import threading
 import traceback
+from multiprocessing.pool import ThreadPool
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
+from ansible_collections.netapp.ontap.plugins.module_utils.netapp import OntapRestAPI
+import ansible_collections.netapp.ontap.plugins.module_utils.rest_response_helpers as rrh
 
 
 HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
 
 
+class ModifyError(Exception):
+    '''Raised in a worker thread instead of calling fail_json, the main thread reports the failure'''
+
+
 class NetAppOntapIgroupInitiator(object):
 
     def __init__(self):
@@ -111,6 +140,7 @@ class NetAppOntapIgroupInitiator(object):
             initiator_group=dict(required=True, type='str'),
             force_remove=dict(required=False, type='bool', default=False),
             vserver=dict(required=True, type='str'),
+            parallelism=dict(required=False, type='int', default=1),
         ))
 
         self.module = AnsibleModule(
@@ -120,17 +150,35 @@ class NetAppOntapIgroupInitiator(object):
 
         self.na_helper = NetAppModule()
         self.parameters = self.na_helper.set_parameters(self.module.params)
-
-        if HAS_NETAPP_LIB is False:
-            self.module.fail_json(msg="the python NetApp-Lib module is required")
-        else:
-            self.server = netapp_utils.setup_na_ontap_zapi(module=self.module, vserver=self.parameters['vserver'])
+        if self.parameters['parallelism'] < 1:
+            self.module.fail_json(msg="Error: parallelism must be at least 1, got: %d" % self.parameters['parallelism'])
+        # in a worker thread, thread_data.server is the connection for this thread
+        self.thread_data = threading.local()
+        # igroup uuid, with REST
+        self.uuid = None
+
+        self.rest_api = OntapRestAPI(self.module)
+        # ZAPI is kept with auto, REST is only used when requested
+        self.use_rest = self.rest_api.use_rest == 'always' and self.rest_api.is_rest()
+        if not self.use_rest:
+            if HAS_NETAPP_LIB is False:
+                self.module.fail_json(msg="the python NetApp-Lib module is required")
+            else:
+                self.server = netapp_utils.setup_na_ontap_zapi(module=self.module, vserver=self.parameters['vserver'])
+
+    def fail_json(self, **kwargs):
+        '''report a failure, a worker thread defers to the main thread'''
+        if getattr(self.thread_data, 'worker', False):
+            raise ModifyError(kwargs)
+        self.module.fail_json(**kwargs)
 
     def get_initiators(self):
         """
         Get the existing list of initiators from an igroup
         :rtype: list() or None
         """
+        if self.use_rest:
+            return self.get_initiators_rest()
         igroup_info = netapp_utils.zapi.NaElement('igroup-get-iter')
         attributes = dict(query={'initiator-group-info': {'initiator-group-name': self.parameters['initiator_group'],
                                                           'vserver': self.parameters['vserver']}})
@@ -150,6 +198,24 @@ class NetAppOntapIgroupInitiator(object):
                 current = [initiator['initiator-name'] for initiator in igroup_info['initiators'].get_children()]
         return current
 
+    def get_initiators_rest(self):
+        """
+        Get the existing list of initiators from an igroup, and record the igroup uuid
+        :rtype: list()
+        """
+        api = 'protocols/san/igroups'
+        query = {'name': self.parameters['initiator_group'],
+                 'svm.name': self.parameters['vserver'],
+                 'fields': 'uuid,initiators'}
+        response, error = self.rest_api.get(api, query)
+        record, error = rrh.check_for_0_or_1_records(api, response, error, query)
+        if error:
+            self.module.fail_json(msg='Error fetching igroup info %s: %s' % (self.parameters['initiator_group'], error))
+        if record is None:
+            return []
+        self.uuid = record['uuid']
+        return [initiator['name'] for initiator in record.get('initiators', [])]
+
     def modify_initiator(self, initiator_name, zapi):
         """
         Add or remove an initiator to/from an igroup
@@ -160,33 +226,103 @@ class NetAppOntapIgroupInitiator(object):
         initiator_modify = netapp_utils.zapi.NaElement.create_node_with_children(zapi, **options)
 
         try:
-            self.server.invoke_successfully(initiator_modify, enable_tunneling=True)
+            getattr(self.thread_data, 'server', self.server).invoke_successfully(initiator_modify, enable_tunneling=True)
         except netapp_utils.zapi.NaApiError as error:
-            self.module.fail_json(msg='Error modifying igroup initiator %s: %s' % (initiator_name,
-                                                                                   to_native(error)),
-                                  exception=traceback.format_exc())
+            self.fail_json(msg='Error modifying igroup initiator %s: %s' % (initiator_name,
+                                                                            to_native(error)),
+                           exception=traceback.format_exc())
+
+    def add_initiators_rest(self, initiators):
+        """
+        Add all the initiators to the igroup with a single request
+        """
+        if self.uuid is None:
+            self.module.fail_json(msg='Error modifying igroup initiators: igroup %s not found' % self.parameters['initiator_group'])
+        api = 'protocols/san/igroups/%s/initiators' % self.uuid
+        body = {'records': [{'name': initiator} for initiator in initiators]}
+        dummy, error = self.rest_api.post(api, body)
+        if error:
+            self.module.fail_json(msg='Error modifying igroup initiators %s: %s' % (', '.join(initiators), error))
+
+    def remove_initiator_rest(self, initiator_name):
+        """
+        Remove an initiator from the igroup
+        """
+        api = 'protocols/san/igroups/%s/initiators/%s' % (self.uuid, initiator_name)
+        params = {'allow_delete_while_mapped': True} if self.parameters['force_remove'] else None
+        dummy, error = self.rest_api.delete(api, params=params)
+        if error:
+            self.fail_json(msg='Error modifying igroup initiator %s: %s' % (initiator_name, error))
+
+    def init_worker(self):
+        '''errors are reported by the main thread, with ZAPI each worker thread uses its own connection'''
+        self.thread_data.worker = True
+        if not self.use_rest:
+            self.thread_data.server = netapp_utils.setup_na_ontap_zapi(module=self.module, vserver=self.parameters['vserver'])
+
+    def run_in_worker(self, args):
+        '''run in a worker thread, returns a failure if any'''
+        method, initiator = args
+        try:
+            method(*initiator)
+        except ModifyError as exc:
+            return exc.args[0]
+        return None
+
+    def run_all(self, method, calls):
+        '''call method for each tuple of arguments in calls, using up to parallelism worker threads
+           the first failure, in the order of calls, is reported
+        '''
+        if self.parameters['parallelism'] == 1 or len(calls) == 1:
+            for args in calls:
+                method(*args)
+            return
+        pool = ThreadPool(processes=min(self.parameters['parallelism'], len(calls)), initializer=self.init_worker)
+        try:
+            failures = pool.map(self.run_in_worker, [(method, args) for args in calls])
+        finally:
+            pool.close()
+            pool.join()
+        for failure in failures:
+            if failure is not None:
+                self.module.fail_json(**failure)
+
+    def add_initiators(self, initiators):
+        if self.use_rest:
+            self.add_initiators_rest(initiators)
+        else:
+            self.run_all(self.modify_initiator, [(initiator, 'igroup-add') for initiator in initiators])
+
+    def remove_initiators(self, initiators):
+        if self.use_rest:
+            self.run_all(self.remove_initiator_rest, [(initiator,) for initiator in initiators])
+        else:
+            self.run_all(self.modify_initiator, [(initiator, 'igroup-remove') for initiator in initiators])
 
     def autosupport_log(self):
         netapp_utils.ems_log_event("na_ontap_igroup_initiator", self.server)
 
     def apply(self):
-        self.autosupport_log()
-        initiators = self.get_initiators()
+        if not self.use_rest:
+            self.autosupport_log()
+        current = set(self.get_initiators())
+        to_add, to_remove, seen = list(), list(), set()
         for initiator in self.parameters['names']:
-            present = None
             initiator = self.na_helper.sanitize_wwn(initiator)
-            if initiator in initiators:
-                present = True
-            cd_action = self.na_helper.get_cd_action(present, self.parameters)
-            if self.na_helper.changed:
-                if self.module.check_mode:
-                    pass
-                else:
-                    if cd_action == 'create':
-                        self.modify_initiator(initiator, 'igroup-add')
-                    elif cd_action == 'delete':
-                        self.modify_initiator(initiator, 'igroup-remove')
-        self.module.exit_json(changed=self.na_helper.changed)
+            if initiator in seen:
+                continue
+            seen.add(initiator)
+            if self.parameters['state'] == 'present' and initiator not in current:
+                to_add.append(initiator)
+            elif self.parameters['state'] == 'absent' and initiator in current:
+                to_remove.append(initiator)
+        self.na_helper.changed = bool(to_add or to_remove)
+        if self.na_helper.changed and not self.module.check_mode:
+            if to_add:
+                self.add_initiators(to_add)
+            if to_remove:
+                self.remove_initiators(to_remove)
+        self.module.exit_json(changed=self.na_helper.changed, added_count=len(to_add), removed_count=len(to_remove))
 
 
 def main():
@@ -151,6 +151,25 @@ options:
                 This parameter controls internal behavior of this module.
         default: 1024
         version_added: '20.2.0'
+    parallelism:
+        type: int
+        description:
+            - Number of subsets to collect concurrently, each worker using its own connection to ONTAP.
+            - Subsets that depend on another subset, eg net_ifgrp_info on net_port_info, are collected after it.
+            - The output does not depend on the number of workers.
+        default: 1
+        version_added: '21.1.0'
+    output_file:
+        description:
+            - Path to a file, on the host running the module, where records are written as they are read, one JSON line per record.
+            - The file is gzip compressed if the name ends with .gz.
+            - For each subset read with a get-iter ZAPI, ontap_info only reports the number of records, and the offset and
+              length in bytes of the subset records in the file.  Other subsets are reported in ontap_info as usual.
+            - Each line is a dictionary with a single item, the record key and the record.  For subsets without a key, each line is a record.
+            - With gzip compression, the records for each subset form a gzip member, that can be decompressed on its own.
+            - Mutually exclusive with summary.
+        type: path
+        version_added: '21.1.0'
     summary:
         description:
             - Boolean flag to control return all attributes of the module info or only the names.
@@ -187,8 +206,20 @@ options:
         - Only a single subset can be called at a time if this option is set.
         - It is the caller responsibity to make sure key attributes are present in the right position.
         - The module will error out if any key attribute is missing.
+        - Mutually exclusive with fields.
         type: dict
         version_added: '20.6.0'
+    fields:
+        description:
+        - Attributes to return for each subset, as a dictionary with subset names as keys, and lists of attributes as values.
+        - An attribute is a path of ZAPI tags below the subset record, separated by dots, eg volume-id-attributes.name for volume_info.
+        - A path can use I(_) in place of I(-), as in the returned keys.  A path to a container returns all its attributes.
+        - Key attributes are always requested, as they are used to index the records.
+        - Each list is translated into a desired-attributes element for the subset ZAPI, reducing the size of the response.
+        - Subsets that are not listed return all their attributes.
+        - Mutually exclusive with desired_attributes.
+        type: dict
+        version_added: '21.1.0'
     query:
         description:
         - Advanced feature requiring to understand ZAPI internals.
@@ -310,6 +341,28 @@ EXAMPLES = '''
     register: ontap
 - debug: var=ontap
 
+- name: run ontap info module for volumes and LUNs, requesting specific fields for each subset
+  na_ontap_info:
+    # <<: *login
+    gather_subset:
+      - volume_info
+      - lun_info
+    fields:
+      volume_info:
+        - volume-id-attributes.containing-aggregate-name
+        - volume-space-attributes.size
+      lun_info:
+        - size
+        - mapped
+  register: ontap
+
+- name: run ontap info module for snapshots, writing records to a compressed file
+  na_ontap_info:
+    # <<: *login
+    gather_subset: snapshot_info
+    output_file: /tmp/ontap_snapshots.jsonl.gz
+  register: ontap
+
 - name: run ontap info to get offline volumes with dp in the name
   na_ontap_info:
     # <<: *cert_login
@@ -378,26 +431,19 @@ ontap_info:
     }'
 '''
 
-import copy
+import itertools
+import threading
 import traceback
+from multiprocessing.pool import ThreadPool
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 
+HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
 
-try:
-    import xmltodict
-    HAS_XMLTODICT = True
-except ImportError:
-    HAS_XMLTODICT = False
-
-try:
-    import json
-    HAS_JSON = True
-except ImportError:
-    HAS_JSON = False
 
-HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
+class SubsetError(Exception):
+    '''Raised in a worker thread instead of calling fail_json, the main thread reports the failure'''
 
 
 class NetAppONTAPGatherInfo(object):
@@ -405,12 +451,19 @@ class NetAppONTAPGatherInfo(object):
 
     def __init__(self, module, max_records):
         self.module = module
+        # in a worker thread, thread_data.server is the connection for this thread
+        self.thread_data = threading.local()
+        self.main_server = None
+        self.parallelism = module.params.get('parallelism') or 1
         self.max_records = str(max_records)
         volume_move_target_aggr_info = module.params.get('volume_move_target_aggr_info', dict())
         if volume_move_target_aggr_info is None:
             volume_move_target_aggr_info = dict()
         self.netapp_info = dict()
         self.desired_attributes = module.params['desired_attributes']
+        self.fields = module.params.get('fields')
+        self.output_file = module.params.get('output_file')
+        self.writer = None
         self.query = module.params['query']
         self.translate_keys = not module.params['use_native_zapi_tags']
         self.warnings = list()  # warnings will be added to the info results, if any
@@ -510,6 +563,8 @@ class NetAppONTAPGatherInfo(object):
                     'query': {'max-records': self.max_records},
                 },
                 'min_version': '0',
+                # key fields are not at the top of the record
+                'key_paths': ('volume-id-attributes.name', 'volume-id-attributes.owning-vserver-name'),
             },
             'license_info': {
                 'method': self.get_generic_get_iter,
@@ -661,6 +716,7 @@ class NetAppONTAPGatherInfo(object):
                 'method': self.get_ifgrp_info,
                 'kwargs': {},
                 'min_version': '0',
+                'depends_on': ['net_port_info'],
             },
             'ontap_system_version': {
                 'method': self.get_generic_get_iter,
@@ -1367,6 +1423,21 @@ class NetAppONTAPGatherInfo(object):
             # use vserver tunneling if vserver is present (not None)
             self.server = netapp_utils.setup_na_ontap_zapi(module=self.module, vserver=module.params['vserver'])
 
+    @property
+    def server(self):
+        '''connection for the current thread'''
+        return getattr(self.thread_data, 'server', self.main_server)
+
+    @server.setter
+    def server(self, server):
+        self.main_server = server
+
+    def fail_json(self, **kwargs):
+        '''report a failure, a worker thread defers to the main thread'''
+        if getattr(self.thread_data, 'server', None) is not None:
+            raise SubsetError(kwargs)
+        self.module.fail_json(**kwargs)
+
     def ontapi(self):
         '''Method to get ontapi version'''
 
@@ -1377,73 +1448,52 @@ class NetAppONTAPGatherInfo(object):
             ontapi_version = results.get_child_content('minor-version')
             return ontapi_version if ontapi_version is not None else '0'
         except netapp_utils.zapi.NaApiError as error:
-            self.module.fail_json(msg="Error calling API %s: %s" %
-                                  (api, to_native(error)), exception=traceback.format_exc())
-
-    def call_api(self, call, attributes_list_tag='attributes-list', query=None, fail_on_error=True):
-        '''Main method to run an API call'''
-
-        api_call = netapp_utils.zapi.NaElement(call)
-        initial_result = None
-        result = None
-
-        if query:
-            for key, val in query.items():
-                # Can val be nested?
-                api_call.add_new_child(key, val)
-
-        if self.desired_attributes is not None:
-            api_call.translate_struct(self.desired_attributes)
-        if self.query is not None:
-            api_call.translate_struct(self.query)
+            self.fail_json(msg="Error calling API %s: %s" %
+                           (api, to_native(error)), exception=traceback.format_exc())
+
+    def call_api(self, call, attributes_list_tag='attributes-list', query=None, fail_on_error=True, desired_attributes=None):
+        '''Main method to run an API call
+           returns an iterator over the API results, one page at a time, and an error message
+           the first page is fetched right away, so that an error on the first call is reported here
+           desired_attributes, when set for this subset, takes precedence over the desired_attributes option
+        '''
+        if desired_attributes is None and self.desired_attributes is not None:
+            desired_attributes = self.desired_attributes.get('desired-attributes')
+        zapi_query = self.query.get('query') if self.query is not None else None
+        pages = netapp_utils.zapi_get_iter_pages(self.server, call, children=query,
+                                                 desired_attributes=desired_attributes, query=zapi_query)
         try:
-            initial_result = self.server.invoke_successfully(api_call, enable_tunneling=True)
-            next_tag = initial_result.get_child_by_name('next-tag')
-            result = copy.copy(initial_result)
-
-            while next_tag:
-                next_tag_call = netapp_utils.zapi.NaElement(call)
-                if query:
-                    for key, val in query.items():
-                        next_tag_call.add_new_child(key, val)
-
-                next_tag_call.add_new_child("tag", next_tag.get_content(), True)
-                next_result = self.server.invoke_successfully(next_tag_call, enable_tunneling=True)
-
-                next_tag = next_result.get_child_by_name('next-tag')
-                if attributes_list_tag is None:
-                    self.module.fail_json(msg="Error calling API %s: %s" %
-                                          (api_call.to_string(), "'next-tag' is not expected for this API"))
-
-                result_attr = result.get_child_by_name(attributes_list_tag)
-                new_records = next_result.get_child_by_name(attributes_list_tag)
-                if new_records:
-                    for record in new_records.get_children():
-                        result_attr.add_child_elem(record)
-
-            return result, None
-
+            first_page = next(pages)
         except netapp_utils.zapi.NaApiError as error:
-            if call in ['security-key-manager-key-get-iter']:
-                return result, None
-            kind, error_message = netapp_utils.classify_zapi_exception(error)
-            if kind == 'missing_vserver_api_error':
-                # for missing_vserver_api_error, the API is already in error_message
-                error_message = "Error invalid API.  %s" % error_message
-            else:
-                error_message = "Error calling API %s: %s" % (call, error_message)
-            if self.error_flags[kind] and fail_on_error:
-                self.module.fail_json(msg=error_message, exception=traceback.format_exc())
-            return None, error_message
+            return None, self.report_api_error(call, error, fail_on_error)
+        return itertools.chain([first_page], pages), None
+
+    def report_api_error(self, call, error, fail_on_error):
+        '''fail, or return an error message, or None if errors are ignored for this API'''
+        if call in ['security-key-manager-key-get-iter']:
+            return None
+        kind, error_message = netapp_utils.classify_zapi_exception(error)
+        if kind == 'missing_vserver_api_error':
+            # for missing_vserver_api_error, the API is already in error_message
+            error_message = "Error invalid API.  %s" % error_message
+        else:
+            error_message = "Error calling API %s: %s" % (call, error_message)
+        if self.error_flags[kind] and fail_on_error:
+            self.fail_json(msg=error_message, exception=traceback.format_exc())
+        return error_message
 
     def get_ifgrp_info(self):
         '''Method to get network port ifgroups info'''
 
-        try:
-            net_port_info = self.netapp_info['net_port_info']
-        except KeyError:
-            net_port_info_calls = self.info_subsets['net_port_info']
-            net_port_info = net_port_info_calls['method'](**net_port_info_calls['kwargs'])
+        net_port_info = self.netapp_info.get('net_port_info')
+        net_port_info_calls = self.info_subsets['net_port_info']
+        # with output_file, the subset holds the manifest for the records in the file
+        # with fields, port_type may not be reported
+        if net_port_info is None or self.writer is not None or 'desired_attributes' in net_port_info_calls['kwargs']:
+            kwargs = dict(net_port_info_calls['kwargs'])
+            kwargs.pop('desired_attributes', None)
+            # get the records directly, as no section of output_file is active for this subset
+            net_port_info = net_port_info_calls['method'](**kwargs)
         interfaces = net_port_info.keys()
 
         ifgrps = []
@@ -1463,23 +1513,16 @@ class NetAppONTAPGatherInfo(object):
             net_ifgrp_info.update(tmp)
         return net_ifgrp_info
 
-    def get_generic_get_iter(self, call, attribute=None, key_fields=None, query=None, attributes_list_tag='attributes-list', fail_on_error=True):
+    def get_generic_get_iter(self, call, attribute=None, key_fields=None, query=None, attributes_list_tag='attributes-list', fail_on_error=True,
+                             desired_attributes=None):
         '''Method to run a generic get-iter call'''
 
-        generic_call, error = self.call_api(call, attributes_list_tag, query, fail_on_error=fail_on_error)
+        pages, error = self.call_api(call, attributes_list_tag, query, fail_on_error=fail_on_error, desired_attributes=desired_attributes)
 
         if error is not None:
             return {'error': error}
 
-        if generic_call is None:
-            return None
-
-        if attributes_list_tag is None:
-            attributes_list = generic_call
-        else:
-            attributes_list = generic_call.get_child_by_name(attributes_list_tag)
-
-        if attributes_list is None:
+        if pages is None:
             return None
 
         if key_fields is None:
@@ -1487,40 +1530,36 @@ class NetAppONTAPGatherInfo(object):
         else:
             out = {}
 
+        records_found = False
         iteration = 0
-        for child in attributes_list.get_children():
-            iteration += 1
-            dic = xmltodict.parse(child.to_string(), xml_attribs=False)
-
-            if attribute is not None:
-                dic = dic[attribute]
-
-            info = json.loads(json.dumps(dic))
-            if self.translate_keys:
-                info = convert_keys(info)
-            if isinstance(key_fields, str):
-                try:
-                    unique_key = _finditem(dic, key_fields)
-                except KeyError as exc:
-                    error_message = 'Error: key %s not found for %s, got: %s' % (str(exc), call, repr(info))
-                    if self.error_flags['key_error']:
-                        self.module.fail_json(msg=error_message, exception=traceback.format_exc())
-                    unique_key = 'Error_%d_key_not_found_%s' % (iteration, exc.args[0])
-            elif isinstance(key_fields, tuple):
-                try:
-                    unique_key = ':'.join([_finditem(dic, el) for el in key_fields])
-                except KeyError as exc:
-                    error_message = 'Error: key %s not found for %s, got: %s' % (str(exc), call, repr(info))
-                    if self.error_flags['key_error']:
-                        self.module.fail_json(msg=error_message, exception=traceback.format_exc())
-                    unique_key = 'Error_%d_key_not_found_%s' % (iteration, exc.args[0])
-            else:
-                unique_key = None
-            if unique_key is not None:
-                out = out.copy()
-                out.update({unique_key: info})
-            else:
-                out.append(info)
+        # with output_file, records are written as they are read
+        section = getattr(self.thread_data, 'section', None)
+        try:
+            for page in pages:
+                if attributes_list_tag is None:
+                    if page.get_child_by_name('next-tag') is not None:
+                        self.fail_json(msg="Error calling API %s: %s" % (call, "'next-tag' is not expected for this API"))
+                    attributes_list = page
+                else:
+                    attributes_list = page.get_child_by_name(attributes_list_tag)
+                if attributes_list is None:
+                    continue
+                records_found = True
+                for child in attributes_list.get_children():
+                    iteration += 1
+                    if section is None:
+                        out = self.add_record(out, child, call, attribute, key_fields, iteration)
+                    elif key_fields is None:
+                        section.write(self.add_record([], child, call, attribute, key_fields, iteration)[0])
+                    else:
+                        section.write(self.add_record({}, child, call, attribute, key_fields, iteration))
+        except netapp_utils.zapi.NaApiError as exc:
+            error = self.report_api_error(call, exc, fail_on_error)
+            if error is not None:
+                return {'error': error}
+
+        if not records_found:
+            return None
 
         if attributes_list_tag is None and key_fields is None:
             if len(out) == 1:
@@ -1544,6 +1583,40 @@ class NetAppONTAPGatherInfo(object):
 
         return out
 
+    def add_record(self, out, child, call, attribute, key_fields, iteration):
+        '''convert a record to a dict, and add it to out'''
+        info = zapi_to_dict(child, self.translate_keys)
+
+        if attribute is not None:
+            try:
+                info = info[attribute.replace('-', '_') if self.translate_keys else attribute]
+            except KeyError:
+                raise KeyError(attribute)
+
+        if isinstance(key_fields, str):
+            try:
+                unique_key = _finditem(info, key_fields, self.translate_keys)
+            except KeyError as exc:
+                error_message = 'Error: key %s not found for %s, got: %s' % (str(exc), call, repr(info))
+                if self.error_flags['key_error']:
+                    self.fail_json(msg=error_message, exception=traceback.format_exc())
+                unique_key = 'Error_%d_key_not_found_%s' % (iteration, exc.args[0])
+        elif isinstance(key_fields, tuple):
+            try:
+                unique_key = ':'.join([_finditem(info, el, self.translate_keys) for el in key_fields])
+            except KeyError as exc:
+                error_message = 'Error: key %s not found for %s, got: %s' % (str(exc), call, repr(info))
+                if self.error_flags['key_error']:
+                    self.fail_json(msg=error_message, exception=traceback.format_exc())
+                unique_key = 'Error_%d_key_not_found_%s' % (iteration, exc.args[0])
+        else:
+            unique_key = None
+        if unique_key is not None:
+            out[unique_key] = info
+        else:
+            out.append(info)
+        return out
+
     def send_ems_event(self):
         ''' use vserver if available, or cluster vserver '''
         if self.module.params['vserver']:
@@ -1580,15 +1653,75 @@ class NetAppONTAPGatherInfo(object):
                 if len(run_subset) > 1:
                     self.module.fail_json(msg="query option is only supported with a single subset")
                 self.sanitize_query()
-            for subset in run_subset:
-                call = self.info_subsets[subset]
-                self.netapp_info[subset] = call['method'](**call['kwargs'])
+            if self.fields is not None:
+                self.plan_fields(run_subset)
+            if self.output_file is not None:
+                self.writer = netapp_utils.InfoStreamWriter(self.module, self.output_file)
+            try:
+                if self.parallelism > 1 and len(run_subset) > 1:
+                    self.get_subsets_in_parallel(run_subset)
+                else:
+                    for subset in run_subset:
+                        self.netapp_info[subset] = self.collect_info(subset)
+            finally:
+                if self.writer is not None:
+                    self.writer.close()
 
         if self.warnings:
             self.netapp_info['module_warnings'] = self.warnings
 
         return self.netapp_info
 
+    def collect_info(self, subset, spool=False):
+        '''run the method for a subset
+           with output_file, records for a get-iter subset are written to a section of the file, and the section manifest is returned
+        '''
+        call = self.info_subsets[subset]
+        if self.writer is None or call['method'] != self.get_generic_get_iter or call['kwargs'].get('attributes_list_tag', '') is None:
+            return call['method'](**call['kwargs'])
+        self.thread_data.section = self.writer.open_section(spool)
+        try:
+            info = call['method'](**call['kwargs'])
+        finally:
+            manifest = self.thread_data.section.close()
+            self.thread_data.section = None
+        if info is None or 'error' in info:
+            return info
+        return manifest
+
+    def init_worker(self):
+        '''each worker thread uses its own connection'''
+        self.thread_data.server = netapp_utils.setup_na_ontap_zapi(module=self.module, vserver=self.module.params['vserver'])
+
+    def collect_subset(self, subset):
+        '''run in a worker thread, returns subset name, info, and failure if any'''
+        try:
+            return subset, self.collect_info(subset, spool=True), None
+        except SubsetError as exc:
+            return subset, None, exc.args[0]
+
+    def get_subsets_in_parallel(self, run_subset):
+        '''collect subsets using a pool of worker threads
+           subsets are scheduled in waves, a subset is only scheduled when the subsets it depends on are collected
+           results are recorded in sorted order, and the first failure in that order is reported
+        '''
+        pending = set(run_subset)
+        pool = ThreadPool(processes=min(self.parallelism, len(pending)), initializer=self.init_worker)
+        try:
+            while pending:
+                ready = sorted(subset for subset in pending
+                               if not pending.intersection(self.info_subsets[subset].get('depends_on', [])))
+                if not ready:
+                    self.module.fail_json(msg="Internal error: circular dependency between subsets: %s" % sorted(pending))
+                for subset, info, failure in pool.map(self.collect_subset, ready):
+                    if failure is not None:
+                        self.module.fail_json(**failure)
+                    self.netapp_info[subset] = info
+                pending.difference_update(ready)
+        finally:
+            pool.close()
+            pool.join()
+
     def get_subset(self, gather_subset, version):
         '''Method to get a single subset'''
 
@@ -1646,6 +1779,54 @@ class NetAppONTAPGatherInfo(object):
             self.desired_attributes = desired_attributes
         self.check_for___in_keys(self.desired_attributes)
 
+    def plan_fields(self, run_subset):
+        ''' translate the fields option into a desired-attributes element for each subset '''
+        not_gathered = sorted(set(self.fields).difference(run_subset))
+        if not_gathered:
+            self.module.fail_json(msg="Error: fields is set for subsets that are not gathered: %s" % ', '.join(not_gathered))
+        for subset in sorted(self.fields):
+            info_subset = self.info_subsets[subset]
+            record_tag = info_subset['kwargs'].get('attribute')
+            if info_subset['method'] != self.get_generic_get_iter or record_tag is None:
+                self.module.fail_json(msg="Error: fields is not supported for subset: %s" % subset)
+            paths = self.fields[subset]
+            if isinstance(paths, str):
+                paths = paths.split(',')
+            if not isinstance(paths, list) or not paths:
+                self.module.fail_json(msg="Error: expecting a list of attributes for subset %s in fields, got: %s" % (subset, repr(paths)))
+            key_paths = info_subset.get('key_paths', self.flatten_key_fields(info_subset['kwargs'].get('key_fields')))
+            info_subset['kwargs']['desired_attributes'] = {record_tag: self.paths_to_tree(record_tag, list(key_paths) + paths)}
+
+    @staticmethod
+    def flatten_key_fields(key_fields):
+        ''' key fields are a string, or a tuple of strings or of tuples of alternate strings '''
+        if key_fields is None:
+            return []
+        if isinstance(key_fields, str):
+            return [key_fields]
+        flat = list()
+        for key_field in key_fields:
+            flat.extend(NetAppONTAPGatherInfo.flatten_key_fields(key_field))
+        return flat
+
+    @staticmethod
+    def paths_to_tree(record_tag, paths):
+        ''' build a desired-attributes tree from dotted paths, a container is represented as None to request all its attributes '''
+        tree = dict()
+        for path in paths:
+            tags = [tag.strip().replace('_', '-') for tag in path.split('.')]
+            if len(tags) > 1 and tags[0] == record_tag:
+                tags = tags[1:]
+            node = tree
+            for tag in tags[:-1]:
+                if tag in node and node[tag] is None:
+                    # the whole container is already requested
+                    break
+                node = node.setdefault(tag, dict())
+            else:
+                node[tags[-1]] = None
+        return tree
+
     def sanitize_query(self):
         ''' add top 'query' if absent
             check for _ as more likely ZAPI does not take them
@@ -1702,17 +1883,18 @@ def __finditem(obj, key):
     return None
 
 
-def _finditem(obj, keys):
+def _finditem(obj, keys, translate_keys=False):
     ''' if keys is a string, use it as a key
         if keys is a tuple, stop on the first valid key
-        if no valid key is found, raise a KeyError '''
+        if no valid key is found, raise a KeyError
+        with translate_keys, obj uses underscores rather than hyphens, and keys are translated before the lookup '''
 
     value = None
     if isinstance(keys, str):
-        value = __finditem(obj, keys)
+        value = __finditem(obj, keys.replace('-', '_') if translate_keys else keys)
     elif isinstance(keys, tuple):
         for key in keys:
-            value = __finditem(obj, key)
+            value = __finditem(obj, key.replace('-', '_') if translate_keys else key)
             if value is not None:
                 break
     if value is not None:
@@ -1720,6 +1902,51 @@ def _finditem(obj, keys):
     raise KeyError(str(keys))
 
 
+def _element_to_value(element, translate_keys):
+    ''' same output as xmltodict.parse(xml_attribs=False), without serializing the element:
+        a leaf is its stripped text or None, repeated tags are collected in a list '''
+
+    value = None
+    for child in element.iterchildren():
+        tag = child.tag
+        if not isinstance(tag, str):
+            # comment or processing instruction
+            continue
+        if tag[0] == '{':
+            tag = tag.split('}', 1)[1]
+        if translate_keys:
+            tag = tag.replace('-', '_')
+        child_value = _element_to_value(child, translate_keys)
+        if value is None:
+            value = {}
+        if tag not in value:
+            value[tag] = child_value
+        elif isinstance(value[tag], list):
+            value[tag].append(child_value)
+        else:
+            value[tag] = [value[tag], child_value]
+    text = element.text.strip() if element.text else None
+    if value is None:
+        return text or None
+    if text:
+        value['#text'] = text
+    return value
+
+
+def zapi_to_dict(na_element, translate_keys=False):
+    ''' convert a NaElement to a dict in a single pass, keyed by the element name
+        with translate_keys, hyphens are converted to underscores, as with convert_keys '''
+
+    # walk the lxml tree directly, NaElement.get_children() creates a wrapper for every node
+    element = na_element._element   # pylint: disable=protected-access
+    tag = element.tag
+    if tag[0] == '{':
+        tag = tag.split('}', 1)[1]
+    if translate_keys:
+        tag = tag.replace('-', '_')
+    return {tag: _element_to_value(element, translate_keys)}
+
+
 def convert_keys(d_param):
     '''Method to convert hyphen to underscore'''
 
@@ -1753,22 +1980,20 @@ def main():
             )
         ),
         desired_attributes=dict(type='dict', required=False),
+        fields=dict(type='dict', required=False),
         use_native_zapi_tags=dict(type='bool', required=False, default=False),
         continue_on_error=dict(type='list', required=False, elements='str', default=['never']),
         query=dict(type='dict', required=False),
+        parallelism=dict(type='int', required=False, default=1),
+        output_file=dict(type='path', required=False),
     ))
 
     module = AnsibleModule(
         argument_spec=argument_spec,
+        mutually_exclusive=[('desired_attributes', 'fields'), ('output_file', 'summary')],
         supports_check_mode=True
     )
 
-    if not HAS_XMLTODICT:
-        module.fail_json(msg="xmltodict missing")
-
-    if not HAS_JSON:
-        module.fail_json(msg="json missing")
-
     state = module.params['state']
     gather_subset = module.params['gather_subset']
     summary = module.params['summary']
@@ -327,41 +327,28 @@ class NetAppOntapLUN(object):
             self.module.fail_json(msg="flexvol_name option is required when san_application_template is not present")
         return rest_api, rest_app
 
-    def get_luns(self, lun_path=None):
+    def get_luns(self, lun_path=None, name=None):
         """
         Return list of LUNs matching vserver and volume names.
+        If lun_path is present, only the LUN with this path is requested.
+        If name is present, only the LUNs with this name or path are requested, including LUNs in qtrees.
 
-        :return: list of LUNs in XML format.
-        :rtype: list
+        :return: iterator over LUNs in XML format, LUNs are fetched one page at a time.
+        :rtype: iterator
         """
-        luns = []
-        tag = None
         if lun_path is None and self.parameters.get('flexvol_name') is None:
-            return luns
+            return iter([])
 
         query_details = netapp_utils.zapi.NaElement('lun-info')
         query_details.add_new_child('vserver', self.parameters['vserver'])
         if lun_path is not None:
-            query_details.add_new_child('lun_path', lun_path)
+            query_details.add_new_child('path', lun_path)
         else:
             query_details.add_new_child('volume', self.parameters['flexvol_name'])
-        query = netapp_utils.zapi.NaElement('query')
-        query.add_child_elem(query_details)
-
-        while True:
-            lun_info = netapp_utils.zapi.NaElement('lun-get-iter')
-            lun_info.add_child_elem(query)
-            if tag:
-                lun_info.add_new_child('tag', tag, True)
-
-            result = self.server.invoke_successfully(lun_info, True)
-            if result.get_child_by_name('num-records') and int(result.get_child_content('num-records')) >= 1:
-                attr_list = result.get_child_by_name('attributes-list')
-                luns.extend(attr_list.get_children())
-            tag = result.get_child_content('next-tag')
-            if tag is None:
-                break
-        return luns
+            if name is not None:
+                # a name with a / can only match a full path
+                query_details.add_new_child('path', name if '/' in name else '*/%s' % name)
+        return netapp_utils.zapi_get_iter(self.server, 'lun-get-iter', query=query_details)
 
     def get_lun_details(self, lun):
         """
@@ -426,6 +413,7 @@ class NetAppOntapLUN(object):
                 if lun_path == path:
                     return lun
             else:
+                # a name with a / can only match a path, a name without a / can only match the last component
                 if name == path:
                     return lun
                 _rest, _splitter, found_name = path.rpartition('/')
@@ -440,7 +428,7 @@ class NetAppOntapLUN(object):
         :return: Details about the lun
         :rtype: dict
         """
-        luns = self.get_luns(lun_path)
+        luns = self.get_luns(lun_path, name)
         lun = self.find_lun(luns, name, lun_path)
         if lun is not None:
             return self.get_lun_details(lun)
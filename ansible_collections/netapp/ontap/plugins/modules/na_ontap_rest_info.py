@@ -119,6 +119,45 @@ options:
         - Allows for any rest option to be passed in
         type: dict
         version_added: '20.7.0'
+    parallelism:
+        type: int
+        description:
+            - Maximum number of REST requests in flight at any time.
+            - With a value greater than 1, subsets are collected concurrently, and the next page of records is requested
+              while the current page is being processed.
+            - Each request uses a connection from the session pool, see the C(rest_pool_maxsize) feature flag.
+        default: 1
+        version_added: '21.1.0'
+    incremental:
+        type: bool
+        description:
+            - When true, keep a local snapshot of the records for each subset, per cluster, and report the records that were added,
+              changed, or removed since the previous run in C(ontap_delta).
+            - Records are identified by their uuid, or their self link.  Subsets without either are returned in full, without a delta.
+            - For subsets with immutable records, like C(support/ems/events), only the records created since the previous run are
+              requested, using a server side filter.  For other subsets, all records are read and compared using a content hash.
+            - With a server side filter, C(ontap_info) only reports the records read in this run, and the snapshot only keeps the
+              records with the latest timestamp, so that it does not grow with the records that ONTAP already purged.
+              Otherwise C(ontap_info) reports all the records.
+            - The snapshot is discarded when C(fields) or C(parameters) change, and is not updated in check mode.
+        default: false
+        version_added: '21.1.0'
+    output_file:
+        type: path
+        description:
+            - Path to a file, on the host running the module, where records are written as they are read, one JSON line per record.
+            - The file is gzip compressed if the name ends with .gz.
+            - For each subset, ontap_info only reports the number of records, and the offset and length in bytes of the subset records
+              in the file.  Subsets without records, like C(cluster/software), are reported in ontap_info as usual.
+            - With gzip compression, the records for each subset form a gzip member, that can be decompressed on its own.
+            - Mutually exclusive with incremental.
+        version_added: '21.1.0'
+    snapshot_dir:
+        type: path
+        description:
+            - Directory for incremental snapshots, with one subdirectory per cluster and user.
+            - Defaults to ~/.ansible/netapp/rest_info_snapshots.
+        version_added: '21.1.0'
 '''
 
 EXAMPLES = '''
@@ -180,14 +219,135 @@ EXAMPLES = '''
       use_rest: Always
       gather_subset:
       - aggregate_info
+- name: run ONTAP gather facts for volumes and EMS events, reporting changes since the previous run
+  na_ontap_info_rest:
+      hostname: "1.2.3.4"
+      username: "testuser"
+      password: "test-password"
+      https: true
+      validate_certs: false
+      use_rest: Always
+      incremental: true
+      gather_subset:
+      - volume_info
+      - support/ems/events
+- name: run ONTAP gather facts for EMS events, writing records to a compressed file
+  na_ontap_info_rest:
+      hostname: "1.2.3.4"
+      username: "testuser"
+      password: "test-password"
+      https: true
+      validate_certs: false
+      use_rest: Always
+      output_file: /tmp/ems_events.jsonl.gz
+      gather_subset:
+      - support/ems/events
+'''
+
+RETURN = '''
+ontap_info:
+    description:
+        - Records for each subset, keyed by REST API.
+        - With output_file, the number of records, and the offset and length in bytes of the subset records in the file.
+    returned: always
+    type: dict
+ontap_delta:
+    description:
+        - With incremental, records added, changed, or removed since the previous run, for each subset.
+        - full_sync is true when there was no usable snapshot, and all records are reported as added.
+        - server_filter reports the query used to only read new records, if any.
+        - watermark reports the latest timestamp for subsets with a server side filter, the next run reads records from this time.
+    returned: when incremental is true
+    type: dict
+    sample: {
+        "storage/volumes": {
+            "added": [],
+            "changed": [{"uuid": "028baa66-41bd-11e9-81d5-00a0986138f7", "name": "vol1"}],
+            "removed": [],
+            "full_sync": false,
+            "server_filter": null
+        }
+    }
 '''
 
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 from ansible.module_utils.basic import AnsibleModule
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp import OntapRestAPI
 
 
+class SubsetError(Exception):
+    '''Raised in a worker thread instead of calling fail_json, the main thread reports the failure'''
+
+
+# records in these subsets never change once created, so only new records are read, filtering on a timestamp
+INCREMENTAL_FILTERS = {
+    'support/ems/events': 'time',
+}
+
+
+def record_key(record):
+    ''' uuid, or self link, or None if the record can't be identified '''
+    if record.get('uuid'):
+        return record['uuid']
+    return record.get('_links', dict()).get('self', dict()).get('href')
+
+
+def record_hash(record):
+    return hashlib.sha256(json.dumps(record, sort_keys=True).encode()).hexdigest()
+
+
+class SubsetSnapshot(object):
+    ''' records from the previous run, for a cluster and a subset
+        the file is replaced atomically, and any error reading it is treated as a missing snapshot
+    '''
+    def __init__(self, module, snapshot_dir, subset, signature):
+        identity = '\n'.join(str(module.params.get(key)) for key in ('hostname', 'http_port', 'username', 'cert_filepath'))
+        self.module = module
+        self.snapshot_dir = os.path.join(snapshot_dir, hashlib.sha256(identity.encode()).hexdigest())
+        self.path = os.path.join(self.snapshot_dir, '%s.json' % subset.replace('/', '_'))
+        self.signature = signature
+        # key: (hash, record), in the order records were read
+        self.records = OrderedDict()
+        self.watermark = None
+        self.valid = False
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as snapshot_file:
+                content = json.load(snapshot_file)
+            if content['signature'] != self.signature:
+                return
+            for key, digest, record in content['records']:
+                self.records[key] = (digest, record)
+            self.watermark = content.get('watermark')
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            self.records = OrderedDict()
+            self.watermark = None
+            return
+        self.valid = True
+
+    def save(self):
+        content = dict(signature=self.signature, watermark=self.watermark,
+                       records=[[key, digest, record] for key, (digest, record) in self.records.items()])
+        try:
+            if not os.path.isdir(self.snapshot_dir):
+                os.makedirs(self.snapshot_dir, 0o700)
+            fdesc, tmp_path = tempfile.mkstemp(dir=self.snapshot_dir, suffix='.tmp')
+            with os.fdopen(fdesc, 'w') as snapshot_file:
+                json.dump(content, snapshot_file)
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError) as exc:
+            self.module.warn('Error saving snapshot %s: %s' % (self.path, exc))
+
+
 class NetAppONTAPGatherInfo(object):
     '''Class with gather info methods'''
 
@@ -202,11 +362,16 @@ class NetAppONTAPGatherInfo(object):
             gather_subset=dict(default=['all'], type='list', elements='str', required=False),
             max_records=dict(type='int', default=1024, required=False),
             fields=dict(type='list', elements='str', required=False),
-            parameters=dict(type='dict', required=False)
+            parameters=dict(type='dict', required=False),
+            parallelism=dict(type='int', required=False, default=1),
+            incremental=dict(type='bool', required=False, default=False),
+            output_file=dict(type='path', required=False),
+            snapshot_dir=dict(type='path', required=False)
         ))
 
         self.module = AnsibleModule(
             argument_spec=self.argument_spec,
+            mutually_exclusive=[('incremental', 'output_file')],
             supports_check_mode=True
         )
 
@@ -214,9 +379,30 @@ class NetAppONTAPGatherInfo(object):
         self.na_helper = NetAppModule()
         self.parameters = self.na_helper.set_parameters(self.module.params)
         self.fields = list()
+        if self.parameters['parallelism'] < 1:
+            self.module.fail_json(msg="Error: parallelism must be at least 1, got: %d" % self.parameters['parallelism'])
+        # caps the number of REST requests in flight across all worker threads
+        self.request_slots = threading.BoundedSemaphore(self.parameters['parallelism'])
+        # set in worker threads, so that errors are reported by the main thread
+        self.thread_data = threading.local()
+        # when set, next pages are requested in the background
+        self.page_pool = None
+        # when set, records are written to output_file
+        self.writer = None
 
         self.rest_api = OntapRestAPI(self.module)
 
+    def fail_json(self, **kwargs):
+        '''report a failure, a worker thread defers to the main thread'''
+        if getattr(self.thread_data, 'worker', False):
+            raise SubsetError(kwargs)
+        self.module.fail_json(**kwargs)
+
+    def rest_get(self, api, data):
+        '''at most parallelism requests are in flight at any time'''
+        with self.request_slots:
+            return self.rest_api.get(api, data)
+
     def validate_ontap_version(self):
         """
             Method to validate the ONTAP version
@@ -247,13 +433,16 @@ class NetAppONTAPGatherInfo(object):
         if self.parameters.get('parameters'):
             for each in self.parameters['parameters']:
                 data[each] = self.parameters['parameters'][each]
+        # server side filter, for incremental mode
+        if gather_subset_info.get('query'):
+            data.update(gather_subset_info['query'])
 
-        gathered_ontap_info, error = self.rest_api.get(api, data)
+        gathered_ontap_info, error = self.rest_get(api, data)
 
         if error:
             # Fail the module if error occurs from REST APIs call
             if int(error.get('code', 0)) == 6:
-                self.module.fail_json(msg="%s user is not authorized to make %s api call" % (self.parameters.get('username'), api))
+                self.fail_json(msg="%s user is not authorized to make %s api call" % (self.parameters.get('username'), api))
             # if Aggr recommender can't make a recommendation it will fail with the following error code.
             # We don't want to fail
             elif int(error.get('code', 0)) == 19726344 and "No recommendation can be made for this cluster" in error.get('message'):
@@ -262,7 +451,7 @@ class NetAppONTAPGatherInfo(object):
             elif int(error.get('code', 0)) == 3:
                 return error.get('message')
             else:
-                self.module.fail_json(msg=error)
+                self.fail_json(msg=error)
         else:
             return gathered_ontap_info
 
@@ -275,7 +464,7 @@ class NetAppONTAPGatherInfo(object):
             return None
         message, error = self.rest_api.wait_on_job(post_return['job'], increment=5)
         if error:
-            self.module.fail_json(msg="%s" % error)
+            self.fail_json(msg="%s" % error)
 
     def get_next_records(self, api):
         """
@@ -285,13 +474,162 @@ class NetAppONTAPGatherInfo(object):
         """
 
         data = {}
-        gather_subset_info, error = self.rest_api.get(api, data)
+        gather_subset_info, error = self.rest_get(api, data)
 
         if error:
-            self.module.fail_json(msg=error)
+            self.fail_json(msg=error)
 
         return gather_subset_info
 
+    def request_next_page(self, subset_info):
+        """
+            Return None if there is no next page for subset_info
+            Otherwise return a function returning the next page
+            With a page pool, the page is fetched in the background while the caller merges the current page
+        """
+        next_link = subset_info['_links'].get('next')
+        if not next_link:
+            return None
+        next_api = next_link['href'].replace('/api', '')
+        if self.page_pool is not None:
+            return self.page_pool.apply_async(self.get_next_records, (next_api,)).get
+        gathered_subset_info = self.get_next_records(next_api)
+        return lambda: gathered_subset_info
+
+    def get_all_records(self, specified_subset):
+        """
+            Gather ONTAP information for the given subset, following next links to get all the records
+            With output_file, records are written as they are read, and the section manifest is returned
+        """
+        subset_info = self.get_subset_info(specified_subset)
+        if isinstance(subset_info, dict):
+            section = None
+            if self.writer is not None and subset_info.get('records') is not None:
+                section = self.writer.open_section(spool=self.parameters['parallelism'] > 1)
+                self.write_records(section, subset_info)
+            # Get all the set of records if next link found in subset_info for the specified subset
+            next_page = self.request_next_page(subset_info)
+            while next_page is not None:
+                gathered_subset_info = next_page()
+                next_page = self.request_next_page(gathered_subset_info)
+
+                # Update the subset info for the specified subset
+                subset_info['_links'] = gathered_subset_info['_links']
+                if section is not None:
+                    self.write_records(section, gathered_subset_info)
+                else:
+                    subset_info['records'].extend(gathered_subset_info['records'])
+
+            if section is not None:
+                return section.close()
+            # metrocluster doesn't have a records field, so we need to skip this
+            if subset_info.get('records') is not None:
+                # Getting total number of records
+                subset_info['num_records'] = len(subset_info['records'])
+        return subset_info
+
+    @staticmethod
+    def write_records(section, subset_info):
+        for record in subset_info['records']:
+            section.write(record)
+        # release the page
+        subset_info['records'] = list()
+
+    def init_worker(self):
+        '''errors in a worker thread are reported by the main thread'''
+        self.thread_data.worker = True
+
+    def collect_subset(self, args):
+        '''run in a worker thread, returns subset name, info, and failure if any'''
+        subset, specified_subset = args
+        try:
+            return subset, self.get_all_records(specified_subset), None
+        except SubsetError as exc:
+            return subset, None, exc.args[0]
+
+    def get_subsets_in_parallel(self, subsets):
+        """
+            Collect subsets using a pool of worker threads, and prefetch next pages using a second pool
+            Both pools share the request slots, so at most parallelism requests are in flight
+            subsets is a list of (subset, specified_subset) tuples, results are returned in the same order
+        """
+        subset_pool = ThreadPool(processes=min(self.parameters['parallelism'], len(subsets)), initializer=self.init_worker)
+        self.page_pool = ThreadPool(processes=self.parameters['parallelism'], initializer=self.init_worker)
+        try:
+            results = subset_pool.map(self.collect_subset, subsets)
+        finally:
+            for pool in (subset_pool, self.page_pool):
+                pool.close()
+                pool.join()
+            self.page_pool = None
+        result_message = dict()
+        for subset, info, failure in results:
+            if failure is not None:
+                self.module.fail_json(**failure)
+            result_message[subset] = info
+        return result_message
+
+    def load_snapshots(self, subsets):
+        """
+            With incremental, load the snapshot for each subset
+            and set a server side filter when records are immutable and the snapshot has a watermark
+        """
+        snapshot_dir = self.parameters.get('snapshot_dir')
+        if snapshot_dir is None:
+            snapshot_dir = os.path.join(os.path.expanduser('~'), '.ansible', 'netapp', 'rest_info_snapshots')
+        # a snapshot is only valid for the same selection of fields and records
+        signature = json.dumps(dict(fields=self.fields, parameters=self.parameters.get('parameters')), sort_keys=True)
+        snapshots = dict()
+        for subset, specified_subset in subsets:
+            snapshot = SubsetSnapshot(self.module, snapshot_dir, subset, signature)
+            snapshot.load()
+            filter_field = INCREMENTAL_FILTERS.get(subset)
+            if snapshot.watermark is not None and filter_field not in (self.parameters.get('parameters') or dict()):
+                specified_subset['query'] = {filter_field: '>=%s' % snapshot.watermark}
+            snapshots[subset] = snapshot
+        return snapshots
+
+    def apply_delta(self, subset, subset_info, snapshot, query):
+        """
+            Compare records with the snapshot, return the delta, or None if records can't be identified
+            With a server side filter, only new records were read, and only the records at the watermark are kept in the snapshot,
+            as they are read again by the next run
+            subset_info and snapshot are updated in place
+        """
+        if not isinstance(subset_info, dict) or not isinstance(subset_info.get('records'), list):
+            return None
+        current = OrderedDict()
+        for record in subset_info['records']:
+            key = record_key(record)
+            if key is None:
+                return None
+            current[key] = (record_hash(record), record)
+        previous = snapshot.records
+        delta = dict(added=list(), changed=list(), removed=list(), full_sync=not snapshot.valid, server_filter=query)
+        for key, (digest, record) in current.items():
+            if key not in previous:
+                delta['added'].append(record)
+            elif previous[key][0] != digest:
+                delta['changed'].append(record)
+        if query is None:
+            # all records were read
+            delta['removed'] = [record for key, (digest, record) in previous.items() if key not in current]
+        snapshot.records = current
+        filter_field = INCREMENTAL_FILTERS.get(subset)
+        if filter_field is not None:
+            timestamps = [record[filter_field] for digest, record in current.values() if record.get(filter_field)]
+            if not current and query is not None:
+                # no new record, keep the previous watermark and records
+                snapshot.records = previous
+            elif timestamps and len(timestamps) == len(current):
+                snapshot.watermark = max(timestamps)
+                snapshot.records = OrderedDict((key, value) for key, value in current.items() if value[1][filter_field] == snapshot.watermark)
+            else:
+                # without a timestamp in all records, the next run reads all records
+                snapshot.watermark = None
+            delta['watermark'] = snapshot.watermark
+        return delta
+
     def convert_subsets(self):
         """
         Convert an info to the REST API
@@ -576,33 +914,41 @@ class NetAppONTAPGatherInfo(object):
                 self.module.fail_json(msg="Error: fields: %s, only one subset will be allowed." % self.parameters.get('fields'))
         converted_subsets = self.convert_subsets()
 
+        subsets = list()
         for subset in converted_subsets:
             try:
                 # Verify whether the supported subset passed
-                specified_subset = get_ontap_subset_info[subset]
+                subsets.append((subset, get_ontap_subset_info[subset]))
             except KeyError:
                 self.module.fail_json(msg="Specified subset %s is not found, supported subsets are %s" %
                                       (subset, list(get_ontap_subset_info.keys())))
 
-            result_message[subset] = self.get_subset_info(specified_subset)
-
-            if result_message[subset] is not None:
-                if isinstance(result_message[subset], dict):
-                    while result_message[subset]['_links'].get('next'):
-                        # Get all the set of records if next link found in subset_info for the specified subset
-                        next_api = result_message[subset]['_links']['next']['href']
-                        gathered_subset_info = self.get_next_records(next_api.replace('/api', ''))
+        snapshots = self.load_snapshots(subsets) if self.parameters['incremental'] else None
 
-                        # Update the subset info for the specified subset
-                        result_message[subset]['_links'] = gathered_subset_info['_links']
-                        result_message[subset]['records'].extend(gathered_subset_info['records'])
-
-                    # metrocluster doesn't have a records field, so we need to skip this
-                    if result_message[subset].get('records') is not None:
-                        # Getting total number of records
-                        result_message[subset]['num_records'] = len(result_message[subset]['records'])
-
-        self.module.exit_json(changed='False', state=self.parameters['state'], ontap_info=result_message)
+        if self.parameters.get('output_file') is not None:
+            self.writer = netapp_utils.InfoStreamWriter(self.module, self.parameters['output_file'])
+        try:
+            if self.parameters['parallelism'] > 1:
+                result_message = self.get_subsets_in_parallel(subsets)
+            else:
+                for subset, specified_subset in subsets:
+                    result_message[subset] = self.get_all_records(specified_subset)
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+
+        results = dict()
+        if snapshots is not None:
+            results['ontap_delta'] = dict()
+            for subset, specified_subset in subsets:
+                delta = self.apply_delta(subset, result_message[subset], snapshots[subset], specified_subset.get('query'))
+                if delta is None:
+                    continue
+                results['ontap_delta'][subset] = delta
+                if not self.module.check_mode:
+                    snapshots[subset].save()
+
+        self.module.exit_json(changed='False', state=self.parameters['state'], ontap_info=result_message, **results)
 
 
 def main():
@@ -1752,73 +1752,11 @@ class NetAppOntapVolume(object):
                     return current['style_extended']
         return None
 
-    def get_job(self, jobid, server):
-        """
-        Get job details by id
-        """
-        job_get = netapp_utils.zapi.NaElement('job-get')
-        job_get.add_new_child('job-id', jobid)
-        try:
-            result = server.invoke_successfully(job_get, enable_tunneling=True)
-        except netapp_utils.zapi.NaApiError as error:
-            if to_native(error.code) == "15661":
-                # Not found
-                return None
-            self.module.fail_json(msg='Error fetching job info: %s' % to_native(error),
-                                  exception=traceback.format_exc())
-        job_info = result.get_child_by_name('attributes').get_child_by_name('job-info')
-        results = {
-            'job-progress': job_info['job-progress'],
-            'job-state': job_info['job-state']
-        }
-        if job_info.get_child_by_name('job-completion') is not None:
-            results['job-completion'] = job_info['job-completion']
-        else:
-            results['job-completion'] = None
-        return results
-
     def check_job_status(self, jobid):
         """
         Loop until job is complete
         """
-        server = self.server
-        sleep_time = 5
-        time_out = self.parameters['time_out']
-        results = self.get_job(jobid, server)
-        error = 'timeout'
-
-        while time_out > 0:
-            results = self.get_job(jobid, server)
-            # If running as cluster admin, the job is owned by cluster vserver
-            # rather than the target vserver.
-            if results is None and server == self.server:
-                results = netapp_utils.get_cserver(self.server)
-                server = netapp_utils.setup_na_ontap_zapi(module=self.module, vserver=results)
-                continue
-            if results is None:
-                error = 'cannot locate job with id: %d' % int(jobid)
-                break
-            if results['job-state'] in ('queued', 'running'):
-                time.sleep(sleep_time)
-                time_out -= sleep_time
-                continue
-            if results['job-state'] in ('success', 'failure'):
-                break
-            else:
-                self.module.fail_json(msg='Unexpected job status in: %s' % repr(results))
-
-        if results is not None:
-            if results['job-state'] == 'success':
-                error = None
-            elif results['job-state'] in ('queued', 'running'):
-                error = 'job completion exceeded expected timer of: %s seconds' % \
-                        self.parameters['time_out']
-            else:
-                if results['job-completion'] is not None:
-                    error = results['job-completion']
-                else:
-                    error = results['job-progress']
-        return error
+        return netapp_utils.zapi_wait_on_job(self.module, self.server, jobid, self.parameters['time_out'])
 
     def check_invoke_result(self, result, action):
         '''
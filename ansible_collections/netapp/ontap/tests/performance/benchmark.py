@@ -0,0 +1,136 @@
+# (c) 2021, NetApp, Inc
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' run ONTAP modules end to end against the offline simulator, and report wall time, calls and payload sizes
+
+    python tests/performance/benchmark.py --volumes 1000 --luns-per-volume 2 --latency 0.005
+    python tests/performance/benchmark.py --scenario info_volumes --repeat 3 --output results.jsonl
+
+    Run from the root of the collection, with ansible_collections in PYTHONPATH.
+'''
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import argparse
+import importlib
+import json
+import sys
+import time
+
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.netapp.ontap.tests.unit.compat.mock import patch
+from ansible_collections.netapp.ontap.tests.performance.ontap_simulator import OntapSimulator, SyntheticCluster
+
+# scenario name: (module, module arguments)
+SCENARIOS = dict(
+    volume_present=('na_ontap_volume', dict(name='vol00000', vserver='svm0', aggregate_name='aggr0', size=1, size_unit='gb',
+                                            use_rest='never')),
+    lun_present=('na_ontap_lun', dict(name='lun0', flexvol_name='vol00000', vserver='svm0', size=10, size_unit='mb',
+                                      use_rest='never')),
+    info_volumes=('na_ontap_info', dict(gather_subset=['volume_info'])),
+    info_volumes_fields=('na_ontap_info', dict(gather_subset=['volume_info'],
+                                               fields=dict(volume_info=['volume-space-attributes.size', 'volume-state-attributes.state']))),
+    info_volumes_luns=('na_ontap_info', dict(gather_subset=['volume_info', 'lun_info', 'snapshot_info'])),
+    rest_info_volumes=('na_ontap_rest_info', dict(gather_subset=['storage/volumes'], use_rest='always')),
+    rest_info_volumes_luns=('na_ontap_rest_info', dict(gather_subset=['storage/volumes', 'storage/luns'], fields=['*'],
+                                                       max_records=100, use_rest='always')),
+)
+
+
+class ModuleExit(Exception):
+    ''' raised by exit_json and fail_json, to stop the module without exiting python '''
+
+
+def exit_json(*args, **kwargs):  # pylint: disable=unused-argument
+    kwargs.setdefault('changed', False)
+    raise ModuleExit(kwargs)
+
+
+def fail_json(*args, **kwargs):  # pylint: disable=unused-argument
+    kwargs['failed'] = True
+    raise ModuleExit(kwargs)
+
+
+def run_module(simulator, module_name, module_args, feature_flags=None):
+    ''' run a module in process against the simulator
+        return the module result, and a report with wall time, calls and payload sizes
+    '''
+    module = importlib.import_module('ansible_collections.netapp.ontap.plugins.modules.%s' % module_name)
+    args = dict(hostname=simulator.host, http_port=simulator.port, username='admin', password='netapp1!',
+                https=True, validate_certs=False)
+    args.update(module_args)
+    if feature_flags:
+        args['feature_flags'] = feature_flags
+    basic._ANSIBLE_ARGS = to_bytes(json.dumps({'ANSIBLE_MODULE_ARGS': args}))  # pylint: disable=protected-access
+    simulator.stats.reset()
+    start = time.time()
+    with patch.multiple(basic.AnsibleModule, exit_json=exit_json, fail_json=fail_json):
+        try:
+            module.main()
+            result = dict(failed=True, msg='module did not call exit_json')
+        except ModuleExit as exc:
+            result = exc.args[0]
+    wall_time = time.time() - start
+    report = dict(module=module_name, wall_time=round(wall_time, 4), failed=bool(result.get('failed')))
+    if report['failed']:
+        report['msg'] = result.get('msg')
+    report.update(simulator.stats.summary())
+    return result, report
+
+
+def run_scenarios(cluster, scenarios, latency=0.0, repeat=1, feature_flags=None):
+    ''' yield a report for each run of each scenario '''
+    with OntapSimulator(cluster, latency=latency) as simulator:
+        for name in scenarios:
+            module_name, module_args = SCENARIOS[name]
+            for run in range(repeat):
+                dummy, report = run_module(simulator, module_name, module_args, feature_flags)
+                report.update(scenario=name, run=run, latency=latency)
+                yield report
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Benchmark ONTAP modules against an offline simulator.')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='scenario to run, default: all')
+    parser.add_argument('--volumes', type=int, default=100)
+    parser.add_argument('--luns-per-volume', type=int, default=1)
+    parser.add_argument('--snapshots-per-volume', type=int, default=1)
+    parser.add_argument('--svms', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to each request')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--feature-flag', action='append', default=[], metavar='NAME=VALUE',
+                        help='feature flag for all modules, VALUE is parsed as JSON')
+    parser.add_argument('--output', help='append one JSON line per run to this file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    feature_flags = dict()
+    for flag in args.feature_flag:
+        name, dummy, value = flag.partition('=')
+        feature_flags[name] = json.loads(value)
+    cluster = SyntheticCluster(volumes=args.volumes, luns_per_volume=args.luns_per_volume,
+                               snapshots_per_volume=args.snapshots_per_volume, svms=args.svms)
+    output = open(args.output, 'a') if args.output else None
+    print('%-24s %4s %10s %7s %6s %12s %12s %s' % ('scenario', 'run', 'wall_time', 'calls', 'conns', 'req_bytes', 'resp_bytes', 'status'))
+    failed = False
+    try:
+        for report in run_scenarios(cluster, args.scenario or sorted(SCENARIOS), args.latency, args.repeat, feature_flags):
+            failed = failed or report['failed']
+            print('%-24s %4d %10.4f %7d %6d %12d %12d %s' % (report['scenario'], report['run'], report['wall_time'], report['calls'],
+                                                              report['connections'], report['request_bytes'], report['response_bytes'],
+                                                              report.get('msg', 'ok')))
+            if output is not None:
+                report.update(volumes=args.volumes, luns_per_volume=args.luns_per_volume, feature_flags=feature_flags)
+                output.write(json.dumps(report) + '\n')
+    finally:
+        if output is not None:
+            output.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,634 @@
+# (c) 2021, NetApp, Inc
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' offline ONTAP simulator, speaking ZAPI and REST over HTTPS, for benchmarks
+
+    The simulator serves a synthetic cluster with a configurable number of SVMs, aggregates,
+    volumes, LUNs, LUN maps and snapshots.  It is read only: create, modify and delete requests
+    are acknowledged but do not change the cluster.
+
+    Every request is recorded with its API name, status, and request and response sizes,
+    and an optional latency is added to each request to model a remote cluster.
+'''
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import fnmatch
+import json
+import os
+import shutil
+import socket
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+import xml.etree.ElementTree as ET
+
+from ansible.module_utils.six.moves import BaseHTTPServer
+from ansible.module_utils.six.moves import socketserver
+from ansible.module_utils.six.moves.urllib.parse import parse_qs, urlencode, urlparse
+
+ZAPI_URL = '/servlets/netapp.servlets.admin.XMLrequest_filer'
+ZAPI_NS = 'http://www.netapp.com/filer/admin'
+ZAPI_MAX_RECORDS = 20
+REST_MAX_RECORDS = 10000
+ONTAP_VERSION = dict(full='NetApp Release 9.8P1: Simulated', generation=9, major=8, minor=0)
+# REST query parameters that are not record filters
+REST_RESERVED_PARAMS = ('fields', 'max_records', 'return_records', 'return_timeout', 'order_by', 'start.offset')
+
+
+def make_uuid(*names):
+    ''' stable uuid, so that records are identical from one run to the next '''
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, '.'.join(str(name) for name in names)))
+
+
+class SyntheticCluster(object):
+    ''' a cluster with svms, aggregates, volumes, LUNs, LUN maps and snapshots
+        records are kept in REST format, and translated to ZAPI format on demand
+    '''
+
+    def __init__(self, volumes=10, luns_per_volume=1, snapshots_per_volume=1, svms=1, aggregates=2, name='cluster1'):
+        self.name = name
+        self.uuid = make_uuid(name)
+        self.svms = [dict(name='svm%d' % index, uuid=make_uuid(name, 'svm', index), state='running', subtype='default')
+                     for index in range(svms)]
+        self.aggregates = [dict(name='aggr%d' % index, uuid=make_uuid(name, 'aggr', index), state='online',
+                                space=dict(block_storage=dict(size=10 * 1024 ** 4, available=5 * 1024 ** 4)))
+                           for index in range(aggregates)]
+        self.volumes = list()
+        self.luns = list()
+        self.lun_maps = list()
+        self.snapshots = list()
+        for index in range(volumes):
+            svm = self.svms[index % svms]
+            aggregate = self.aggregates[index % aggregates]
+            volume = dict(
+                name='vol%05d' % index,
+                uuid=make_uuid(name, 'volume', index),
+                svm=dict(name=svm['name'], uuid=svm['uuid']),
+                aggregates=[dict(name=aggregate['name'], uuid=aggregate['uuid'])],
+                size=1024 ** 3,
+                state='online',
+                type='rw',
+                style='flexvol',
+                comment='',
+                nas=dict(path='/vol%05d' % index, security_style='unix', unix_permissions=755, uid=0, gid=0,
+                         export_policy=dict(name='default')),
+                snapshot_policy=dict(name='default'),
+                space=dict(snapshot=dict(reserve_percent=5), used=1024 ** 2),
+            )
+            self.volumes.append(volume)
+            for lun_index in range(luns_per_volume):
+                lun = dict(
+                    name='/vol/%s/lun%d' % (volume['name'], lun_index),
+                    uuid=make_uuid(name, 'lun', index, lun_index),
+                    svm=volume['svm'],
+                    location=dict(logical_unit='lun%d' % lun_index, volume=dict(name=volume['name'], uuid=volume['uuid'])),
+                    os_type='linux',
+                    serial_number='%012X' % (index * luns_per_volume + lun_index),
+                    space=dict(size=10 * 1024 ** 2, guarantee=dict(requested=True)),
+                    status=dict(state='online', mapped=lun_index % 2 == 0),
+                )
+                self.luns.append(lun)
+                if lun['status']['mapped']:
+                    self.lun_maps.append(dict(
+                        svm=volume['svm'],
+                        lun=dict(name=lun['name'], uuid=lun['uuid']),
+                        igroup=dict(name='ig_%s' % svm['name'], uuid=make_uuid(name, 'igroup', svm['name'])),
+                        logical_unit_number=index % 4096,
+                    ))
+            for snap_index in range(snapshots_per_volume):
+                self.snapshots.append(dict(
+                    name='snap%d' % snap_index,
+                    uuid=make_uuid(name, 'snapshot', index, snap_index),
+                    volume=dict(name=volume['name'], uuid=volume['uuid']),
+                    svm=volume['svm'],
+                    create_time='2021-01-01T00:00:00+00:00',
+                ))
+        self._zapi_records = dict()
+
+    # ZAPI records, as nested dicts, indexed by get-iter API
+    def zapi_records(self, api):
+        ''' return the record tag and (vserver, record) pairs for a get-iter API, or None if unknown '''
+        if api not in self._zapi_records:
+            builders = {
+                'aggr-get-iter': ('aggr-attributes', self.aggregates, self.zapi_aggr),
+                'lun-get-iter': ('lun-info', self.luns, self.zapi_lun),
+                'lun-map-get-iter': ('lun-map-info', self.lun_maps, self.zapi_lun_map),
+                'snapshot-get-iter': ('snapshot-info', self.snapshots, self.zapi_snapshot),
+                'volume-get-iter': ('volume-attributes', self.volumes, self.zapi_volume),
+                'vserver-get-iter': ('vserver-info', [None] + self.svms, self.zapi_vserver),
+            }
+            if api not in builders:
+                return None
+            tag, records, builder = builders[api]
+            self._zapi_records[api] = (tag, [builder(record) for record in records])
+        return self._zapi_records[api]
+
+    @staticmethod
+    def zapi_aggr(aggr):
+        return None, {
+            'aggregate-name': aggr['name'],
+            'aggregate-uuid': aggr['uuid'],
+            'aggr-raid-attributes': {'state': aggr['state']},
+            'aggr-space-attributes': {'size-total': aggr['space']['block_storage']['size'],
+                                      'size-available': aggr['space']['block_storage']['available']},
+        }
+
+    @staticmethod
+    def zapi_volume(volume):
+        nas = volume['nas']
+        return volume['svm']['name'], {
+            'volume-id-attributes': {
+                'name': volume['name'],
+                'owning-vserver-name': volume['svm']['name'],
+                'vserver': volume['svm']['name'],
+                'containing-aggregate-name': volume['aggregates'][0]['name'],
+                'instance-uuid': volume['uuid'],
+                'junction-path': nas['path'],
+                'style-extended': volume['style'],
+                'type': volume['type'],
+            },
+            'volume-export-attributes': {'policy': nas['export_policy']['name']},
+            'volume-language-attributes': {'language-code': 'c.utf_8'},
+            'volume-performance-attributes': {'is-atime-update-enabled': True},
+            'volume-security-attributes': {
+                'style': nas['security_style'],
+                'volume-security-unix-attributes': {'permissions': nas['unix_permissions'], 'group-id': nas['gid'], 'user-id': nas['uid']},
+            },
+            'volume-snapshot-attributes': {'snapshot-policy': volume['snapshot_policy']['name'], 'snapdir-access-enabled': True},
+            'volume-snapshot-autodelete-attributes': {'commitment': 'try', 'is-autodelete-enabled': False},
+            'volume-space-attributes': {
+                'size': volume['size'],
+                'size-used': volume['space']['used'],
+                'percentage-snapshot-reserve': volume['space']['snapshot']['reserve_percent'],
+                'space-guarantee': 'none',
+                'space-slo': 'none',
+            },
+            'volume-state-attributes': {'state': volume['state'], 'is-nvfail-enabled': False},
+        }
+
+    @staticmethod
+    def zapi_lun(lun):
+        return lun['svm']['name'], {
+            'path': lun['name'],
+            'vserver': lun['svm']['name'],
+            'volume': lun['location']['volume']['name'],
+            'qtree': '',
+            'uuid': lun['uuid'],
+            'serial-number': lun['serial_number'],
+            'multiprotocol-type': lun['os_type'],
+            'size': lun['space']['size'],
+            'is-space-reservation-enabled': lun['space']['guarantee']['requested'],
+            'state': lun['status']['state'],
+            'online': lun['status']['state'] == 'online',
+            'mapped': lun['status']['mapped'],
+        }
+
+    @staticmethod
+    def zapi_lun_map(lun_map):
+        return lun_map['svm']['name'], {
+            'path': lun_map['lun']['name'],
+            'vserver': lun_map['svm']['name'],
+            'initiator-group': lun_map['igroup']['name'],
+            'initiator-group-uuid': lun_map['igroup']['uuid'],
+            'lun-id': lun_map['logical_unit_number'],
+        }
+
+    @staticmethod
+    def zapi_snapshot(snapshot):
+        return snapshot['svm']['name'], {
+            'name': snapshot['name'],
+            'volume': snapshot['volume']['name'],
+            'vserver': snapshot['svm']['name'],
+            'snapshot-instance-uuid': snapshot['uuid'],
+            'access-time': 1609459200,
+        }
+
+    def zapi_vserver(self, svm):
+        if svm is None:
+            # admin vserver
+            return None, {'vserver-name': self.name, 'vserver-type': 'admin', 'uuid': self.uuid, 'state': 'running'}
+        return None, {'vserver-name': svm['name'], 'vserver-type': 'data', 'uuid': svm['uuid'], 'state': svm['state']}
+
+    # REST records
+    def rest_records(self, api):
+        ''' return the list of records for a REST collection, or None if unknown '''
+        collections = {
+            'storage/aggregates': self.aggregates,
+            'storage/luns': self.luns,
+            'protocols/san/lun-maps': self.lun_maps,
+            'storage/volumes': self.volumes,
+            'svm/svms': self.svms,
+        }
+        if api in collections:
+            return collections[api]
+        parts = api.split('/')
+        if len(parts) == 4 and parts[:2] == ['storage', 'volumes'] and parts[3] == 'snapshots':
+            return [snapshot for snapshot in self.snapshots if snapshot['volume']['uuid'] == parts[2]]
+        if api == 'private/cli/vserver':
+            return [dict(vserver=self.name, type='admin')] + [dict(vserver=svm['name'], type='data') for svm in self.svms]
+        return None
+
+    def rest_cluster(self):
+        return dict(name=self.name, uuid=self.uuid, version=dict(ONTAP_VERSION))
+
+
+def match_value(value, pattern):
+    ''' ONTAP style query: alternatives separated by |, * as a wildcard '''
+    value = to_text(value)
+    return any(fnmatch.fnmatchcase(value, alternative) for alternative in pattern.split('|'))
+
+
+def to_text(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def local_name(tag):
+    ''' strip XML namespace '''
+    return tag.rpartition('}')[2]
+
+
+def element_leaves(element, path=()):
+    ''' yield (path, text) for each leaf in an ElementTree element '''
+    children = list(element)
+    if not children:
+        yield path, element.text or ''
+    for child in children:
+        for leaf in element_leaves(child, path + (local_name(child.tag),)):
+            yield leaf
+
+
+def element_to_tree(element):
+    ''' desired-attributes as a nested dict, leaves are None '''
+    children = list(element)
+    if not children:
+        return None
+    return dict((local_name(child.tag), element_to_tree(child)) for child in children)
+
+
+def get_path(record, path):
+    for key in path:
+        if not isinstance(record, dict) or key not in record:
+            return None
+        record = record[key]
+    return record
+
+
+def project(record, desired):
+    ''' keep only the desired attributes, as ONTAP does with desired-attributes '''
+    if desired is None or not isinstance(record, dict):
+        return record
+    return dict((key, project(record[key], sub_tree)) for key, sub_tree in desired.items() if key in record)
+
+
+def dict_to_xml(tag, value, out):
+    ''' serialize nested dicts, lists of dicts and scalars as ZAPI XML '''
+    if isinstance(value, dict):
+        out.append('<%s>' % tag)
+        for key, sub_value in value.items():
+            dict_to_xml(key, sub_value, out)
+        out.append('</%s>' % tag)
+    elif isinstance(value, list):
+        out.append('<%s>' % tag)
+        for item in value:
+            for key, sub_value in item.items():
+                dict_to_xml(key, sub_value, out)
+        out.append('</%s>' % tag)
+    else:
+        out.append('<%s>%s</%s>' % (tag, escape(to_text(value)), tag))
+
+
+def escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def zapi_response(results, status='passed', reason=None, errno=None):
+    out = ["<?xml version='1.0' encoding='UTF-8'?>",
+           "<netapp version='1.180' xmlns='%s'>" % ZAPI_NS]
+    attrs = "status='%s'" % status
+    if reason is not None:
+        attrs += " reason='%s' errno='%s'" % (escape(reason).replace("'", '&apos;'), errno)
+    out.append('<results %s>' % attrs)
+    for key, value in results.items():
+        dict_to_xml(key, value, out)
+    out.append('</results></netapp>')
+    return ''.join(out).encode('utf-8')
+
+
+class CallStats(object):
+    ''' thread safe record of the requests served by the simulator '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = list()
+        self.connections = 0
+
+    def reset(self):
+        with self.lock:
+            self.calls = list()
+            self.connections = 0
+
+    def add_connection(self):
+        with self.lock:
+            self.connections += 1
+
+    def add_call(self, **kwargs):
+        with self.lock:
+            self.calls.append(kwargs)
+
+    def summary(self):
+        ''' totals, and counts per API '''
+        with self.lock:
+            calls = list(self.calls)
+            connections = self.connections
+        apis = dict()
+        for call in calls:
+            api = apis.setdefault(call['api'], dict(calls=0, request_bytes=0, response_bytes=0, records=0))
+            for key in ('request_bytes', 'response_bytes', 'records'):
+                api[key] += call[key]
+            api['calls'] += 1
+        return dict(
+            calls=len(calls),
+            connections=connections,
+            request_bytes=sum(call['request_bytes'] for call in calls),
+            response_bytes=sum(call['response_bytes'] for call in calls),
+            records=sum(call['records'] for call in calls),
+            errors=sum(1 for call in calls if call['status'] >= 400),
+            apis=apis,
+        )
+
+
+class SimulatorHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    ''' dispatch ZAPI and REST requests to the synthetic cluster '''
+    protocol_version = 'HTTP/1.1'
+    server_version = 'OntapSimulator/1.0'
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        # headers and body are sent separately, do not let delayed ACKs add latency
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.simulator.stats.add_connection()
+
+    def log_message(self, format, *args):   # pylint: disable=redefined-builtin
+        ''' keep quiet '''
+
+    def do_GET(self):
+        self.dispatch()
+
+    def do_POST(self):
+        self.dispatch()
+
+    def do_PATCH(self):
+        self.dispatch()
+
+    def do_DELETE(self):
+        self.dispatch()
+
+    def dispatch(self):
+        simulator = self.server.simulator
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if simulator.latency:
+            time.sleep(simulator.latency)
+        if self.headers.get('Authorization') is None:
+            # legacy netapp-lib waits for a challenge before sending credentials
+            status, content_type, payload, api, records = 401, 'text/plain', b'Unauthorized', 'unauthorized', 0
+        elif self.path.startswith(ZAPI_URL) and self.command == 'POST':
+            status, content_type, payload, api, records = simulator.zapi(body)
+        elif self.path.startswith('/api/'):
+            status, content_type, payload, api, records = simulator.rest(self.command, self.path, body)
+        else:
+            status, content_type, payload, api, records = 404, 'text/plain', b'Not found', 'unknown', 0
+        # record the call before answering, so that it is counted by the time the client gets the response
+        simulator.stats.add_call(api=api, method=self.command, status=status, records=records,
+                                 request_bytes=len(body), response_bytes=len(payload))
+        self.send_response(status)
+        if status == 401:
+            self.send_header('WWW-Authenticate', 'Basic realm="simulator"')
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+def generate_certificate(directory):
+    ''' self signed certificate for localhost, using cryptography if present, or the openssl CLI '''
+    certfile = os.path.join(directory, 'cert.pem')
+    keyfile = os.path.join(directory, 'key.pem')
+    try:
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        from cryptography.x509.oid import NameOID
+    except ImportError:
+        with open(os.devnull, 'w') as devnull:
+            subprocess.check_call(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                                   '-subj', '/CN=localhost', '-keyout', keyfile, '-out', certfile],
+                                  stdout=devnull, stderr=devnull)
+        return certfile, keyfile
+    import datetime
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, u'localhost')])
+    now = datetime.datetime.utcnow()
+    cert = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key()) \
+        .serial_number(x509.random_serial_number()).not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1)) \
+        .sign(key, hashes.SHA256())
+    with open(keyfile, 'wb') as fd:
+        fd.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL, serialization.NoEncryption()))
+    with open(certfile, 'wb') as fd:
+        fd.write(cert.public_bytes(serialization.Encoding.PEM))
+    return certfile, keyfile
+
+
+class OntapSimulator(object):
+    ''' HTTPS server for ZAPI and REST requests, use as a context manager
+
+        with OntapSimulator(SyntheticCluster(volumes=1000), latency=0.005) as simulator:
+            # connect to simulator.host:simulator.port, with https and validate_certs set to false
+            print(simulator.stats.summary())
+    '''
+
+    def __init__(self, cluster=None, latency=0.0, host='127.0.0.1', port=0):
+        self.cluster = cluster if cluster is not None else SyntheticCluster()
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.stats = CallStats()
+        self.httpd = None
+        self.thread = None
+        self.cert_dir = None
+
+    def start(self):
+        self.cert_dir = tempfile.mkdtemp(prefix='ontap_simulator_')
+        certfile, keyfile = generate_certificate(self.cert_dir)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        self.httpd = ThreadingHTTPServer((self.host, self.port), SimulatorHandler)
+        self.httpd.socket = context.wrap_socket(self.httpd.socket, server_side=True)
+        self.httpd.simulator = self
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.thread.join()
+            self.httpd = None
+        if self.cert_dir is not None:
+            shutil.rmtree(self.cert_dir, ignore_errors=True)
+            self.cert_dir = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    # ZAPI
+    def zapi(self, body):
+        ''' return status, content type, payload, api name, record count '''
+        try:
+            root = ET.fromstring(body)
+            request = list(root)[0]
+        except (ET.ParseError, IndexError) as exc:
+            return 400, 'text/plain', str(exc).encode('utf-8'), 'zapi-parse-error', 0
+        api = local_name(request.tag)
+        vserver = root.get('vfiler')
+        results, records = self.zapi_invoke(api, request, vserver)
+        if isinstance(results, tuple):
+            reason, errno = results
+            return 200, 'text/xml', zapi_response(dict(), 'failed', reason, errno), api, 0
+        return 200, 'text/xml', zapi_response(results), api, records
+
+    def zapi_invoke(self, api, request, vserver):
+        ''' return results as a dict, or (reason, errno) on error, and a record count '''
+        if api.endswith('-get-iter'):
+            return self.zapi_get_iter(api, request, vserver)
+        if api == 'system-get-version':
+            return {'version': ONTAP_VERSION['full'], 'is-clustered': True,
+                    'version-tuple': {'system-version-tuple': {'generation': ONTAP_VERSION['generation'],
+                                                               'major': ONTAP_VERSION['major'],
+                                                               'minor': ONTAP_VERSION['minor']}}}, 0
+        if api == 'system-get-ontapi-version':
+            return {'major-version': 1, 'minor-version': 180}, 0
+        if api == 'lun-map-list-info':
+            path = request.findtext('{%s}path' % ZAPI_NS) or request.findtext('path')
+            igroups = [{'initiator-group-info': {'initiator-group-name': record['initiator-group'], 'lun-id': record['lun-id']}}
+                       for dummy, record in self.cluster.zapi_records('lun-map-get-iter')[1] if record['path'] == path]
+            return {'initiator-groups': igroups}, len(igroups)
+        # ems-autosupport-log, and create, modify or delete requests
+        return dict(), 0
+
+    def zapi_get_iter(self, api, request, vserver):
+        children = dict((local_name(child.tag), child) for child in request)
+        query = list()
+        if 'query' in children and len(children['query']):
+            query = list(element_leaves(list(children['query'])[0]))
+        desired = None
+        if 'desired-attributes' in children and len(children['desired-attributes']):
+            desired = element_to_tree(list(children['desired-attributes'])[0])
+        max_records = int(children['max-records'].text) if 'max-records' in children else ZAPI_MAX_RECORDS
+        offset = int(children['tag'].text) if 'tag' in children and children['tag'].text else 0
+
+        found = self.cluster.zapi_records(api)
+        if found is None:
+            return {'num-records': 0}, 0
+        tag, records = found
+        selected = [record for record_vserver, record in records
+                    if (vserver is None or record_vserver in (None, vserver))
+                    and all(get_path(record, path) is not None and match_value(get_path(record, path), pattern) for path, pattern in query)]
+        page = selected[offset:offset + max_records]
+        results = {'num-records': len(page)}
+        if page:
+            results['attributes-list'] = [{tag: project(record, desired)} for record in page]
+        if offset + max_records < len(selected):
+            results['next-tag'] = offset + max_records
+        return results, len(page)
+
+    # REST
+    def rest(self, method, path, body):
+        ''' return status, content type, payload, api name, record count '''
+        url = urlparse(path)
+        api = url.path[len('/api/'):].strip('/')
+        params = dict((key, ','.join(values)) for key, values in parse_qs(url.query).items())
+        status, response, records = self.rest_invoke(method, api, params, body)
+        return status, 'application/json', json.dumps(response).encode('utf-8'), '%s %s' % (method, self.rest_api_name(api)), records
+
+    def rest_api_name(self, api):
+        ''' replace uuids with a placeholder, so that calls are grouped by endpoint '''
+        return '/'.join('{uuid}' if len(part) == 36 and part.count('-') == 4 else part for part in api.split('/'))
+
+    def rest_invoke(self, method, api, params, body):
+        if api == 'cluster':
+            if method == 'GET':
+                return 200, self.cluster.rest_cluster(), 1
+            return 202, dict(job=dict(uuid=make_uuid('job'))), 0
+        if api.startswith('cluster/jobs/'):
+            return 200, dict(uuid=api.rpartition('/')[2], state='success', message='success'), 1
+        if method != 'GET':
+            if method == 'POST':
+                return 201, dict(num_records=1, records=[json.loads(body or b'{}')]), 1
+            return 200, dict(), 0
+        records = self.cluster.rest_records(api)
+        if records is None:
+            # maybe a single record, eg storage/volumes/{uuid}
+            collection, dummy, key = api.rpartition('/')
+            records = self.cluster.rest_records(collection)
+            matches = [record for record in records or [] if record.get('uuid') == key]
+            if not matches:
+                return 404, dict(error=dict(message='entry doesn\'t exist', code='4')), 0
+            return 200, self.rest_project(matches[0], params.get('fields')), 1
+        return self.rest_collection(api, records, params)
+
+    def rest_collection(self, api, records, params):
+        filters = [(key.split('.'), pattern) for key, pattern in params.items() if key not in REST_RESERVED_PARAMS]
+        selected = [record for record in records
+                    if all(get_path(record, path) is not None and match_value(get_path(record, path), pattern) for path, pattern in filters)]
+        max_records = int(params.get('max_records', REST_MAX_RECORDS))
+        offset = int(params.get('start.offset', 0))
+        page = selected[offset:offset + max_records]
+        response = dict(num_records=len(page))
+        if params.get('return_records', 'true') != 'false':
+            response['records'] = [self.rest_project(record, params.get('fields')) for record in page]
+        links = dict(self=dict(href='/api/%s?%s' % (api, urlencode(sorted(params.items())))))
+        if offset + max_records < len(selected):
+            next_params = dict(params)
+            next_params['start.offset'] = offset + max_records
+            links['next'] = dict(href='/api/%s?%s' % (api, urlencode(sorted(next_params.items()))))
+        response['_links'] = links
+        return 200, response, len(page)
+
+    @staticmethod
+    def rest_project(record, fields):
+        ''' keep the key fields, and the requested fields, * or ** for all fields '''
+        if fields is None:
+            fields = ''
+        fields = [field for field in fields.split(',') if field]
+        if '*' in fields or '**' in fields:
+            return record
+        projected = dict((key, record[key]) for key in ('uuid', 'name', 'vserver') if key in record)
+        for field in fields:
+            path = field.split('.')
+            value = get_path(record, path)
+            if value is None:
+                continue
+            target = projected
+            for key in path[:-1]:
+                target = target.setdefault(key, dict())
+            target[path[-1]] = value
+        return projected
+
@@ -0,0 +1,90 @@
+# (c) 2021, NetApp, Inc
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' smoke tests for the offline simulator and the benchmark harness, at a small scale '''
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import pytest
+
+import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
+from ansible_collections.netapp.ontap.tests.performance.benchmark import SCENARIOS, main, run_module
+from ansible_collections.netapp.ontap.tests.performance.ontap_simulator import OntapSimulator, SyntheticCluster
+
+if not netapp_utils.has_netapp_lib():
+    pytestmark = pytest.mark.skip('skipping as missing required netapp_lib')
+
+
+@pytest.fixture(scope='module')
+def simulator():
+    with OntapSimulator(SyntheticCluster(volumes=45, luns_per_volume=2, snapshots_per_volume=1, svms=2)) as simulator:
+        yield simulator
+
+
+def test_zapi_get_iter_pages(simulator):
+    ''' na_ontap_info reads all volumes, one page at a time '''
+    result, report = run_module(simulator, 'na_ontap_info', dict(gather_subset=['volume_info'], max_records=20))
+    assert not report['failed'], report
+    assert len(result['ontap_info']['volume_info']) == 45
+    assert report['apis']['volume-get-iter']['calls'] == 3
+    assert report['apis']['volume-get-iter']['records'] == 45
+
+
+def test_zapi_query(simulator):
+    ''' na_ontap_lun finds the LUN with a path query, and is idempotent '''
+    result, report = run_module(simulator, *SCENARIOS['lun_present'])
+    assert not report['failed'], report
+    assert not result['changed']
+    assert report['apis']['lun-get-iter']['records'] == 1
+
+
+def test_zapi_idempotent_volume(simulator):
+    result, report = run_module(simulator, *SCENARIOS['volume_present'])
+    assert not report['failed'], report
+    assert not result['changed']
+
+
+def test_rest_pages_and_fields(simulator):
+    ''' na_ontap_rest_info follows next links, and fields are projected '''
+    args = dict(gather_subset=['storage/luns'], fields=['svm.name', 'space.size'], max_records=40, use_rest='always')
+    result, report = run_module(simulator, 'na_ontap_rest_info', args)
+    assert not report['failed'], report
+    luns = result['ontap_info']['storage/luns']
+    assert luns['num_records'] == 90
+    assert set(luns['records'][0]) == set(['uuid', 'name', 'svm', 'space'])
+    assert report['apis']['GET storage/luns']['calls'] == 3
+
+
+def test_rest_filter_and_errors(simulator):
+    status, response, records = simulator.rest_invoke('GET', 'storage/volumes', {'svm.name': 'svm1', 'name': 'vol0000*'}, b'')
+    assert status == 200
+    assert [record['name'] for record in response['records']] == ['vol00001', 'vol00003', 'vol00005', 'vol00007', 'vol00009']
+    assert records == 5
+    status, response, records = simulator.rest_invoke('GET', 'storage/volumes/unknown', {}, b'')
+    assert status == 404
+    assert 'error' in response
+
+
+def test_latency_and_stats(simulator):
+    ''' latency is added to each request, and connections are counted '''
+    simulator.latency = 0.05
+    try:
+        dummy, report = run_module(simulator, *SCENARIOS['volume_present'])
+    finally:
+        simulator.latency = 0.0
+    assert report['wall_time'] >= 0.05 * report['calls']
+    assert report['connections'] >= 1
+    assert report['response_bytes'] > 0
+
+
+def test_main(tmpdir, capsys):
+    output = str(tmpdir.join('results.jsonl'))
+    assert main(['--volumes', '5', '--scenario', 'info_volumes', '--scenario', 'rest_info_volumes', '--repeat', '2', '--output', output]) == 0
+    with open(output) as fd:
+        reports = [json.loads(line) for line in fd]
+    assert [(report['scenario'], report['run']) for report in reports] == [('info_volumes', 0), ('info_volumes', 1),
+                                                                           ('rest_info_volumes', 0), ('rest_info_volumes', 1)]
+    assert all(report['calls'] > 0 for report in reports)
+    assert 'rest_info_volumes' in capsys.readouterr().out
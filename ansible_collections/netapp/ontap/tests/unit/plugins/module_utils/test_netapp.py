@@ -5,8 +5,13 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import datetime
+import errno
+import gzip
+import io
 import json
 import os.path
+import socket
 import tempfile
 
 import pytest
@@ -14,6 +19,7 @@ import pytest
 from ansible.module_utils.ansible_release import __version__ as ansible_version
 from ansible.module_utils import basic
 from ansible.module_utils._text import to_bytes
+from ansible.module_utils.six.moves import http_client
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp import COLLECTION_VERSION
 from ansible_collections.netapp.ontap.tests.unit.compat.mock import patch
 
@@ -100,6 +106,222 @@ def test_get_cserver():
     assert cserver == svm_name
 
 
+def create_connection_with_module(feature_flags, kind=None, parm1=None, check_mode=False):
+    server = MockONTAPConnection(kind, parm1)
+    server.module = create_module(mock_args(feature_flags))
+    server.module.check_mode = check_mode
+    server.count = 0
+    invoke_successfully = server.invoke_successfully
+
+    def count_and_invoke(xml, enable_tunneling):
+        server.count += 1
+        return invoke_successfully(xml, enable_tunneling)
+
+    server.invoke_successfully = count_and_invoke
+    return server
+
+
+def test_ems_log_event_skipped_in_check_mode():
+    ''' no EMS event in check mode, when disabled with ems_log_in_check_mode '''
+    server = create_connection_with_module(dict(ems_log_in_check_mode=False), check_mode=True)
+    netapp_utils.ems_log_event('unittest', server)
+    assert server.count == 0
+    server = create_connection_with_module(dict(), check_mode=True)
+    netapp_utils.ems_log_event('unittest', server)
+    assert server.count == 1
+
+
+def test_ems_log_event_spooled():
+    ''' only one event is sent per interval, with a count of spooled events '''
+    flags = dict(ems_spool_interval=3600, cache_dir=tempfile.mkdtemp())
+    server = create_connection_with_module(flags)
+    netapp_utils.ems_log_event('unittest', server)
+    assert server.count == 1
+    netapp_utils.ems_log_event('unittest', server)
+    netapp_utils.ems_log_event('unittest_2', server)
+    assert server.count == 1
+    # force a flush, by pretending the last one happened long ago
+    cache = netapp_utils.OntapCache(server.module)
+    spool = cache.get('ems_spool', expire=False)
+    assert spool['events'] == dict(unittest=1, unittest_2=1)
+    spool['last_flush'] -= 3600
+    cache.set('ems_spool', spool)
+    netapp_utils.ems_log_event('unittest_3', server)
+    assert server.count == 2
+    assert server.xml_in.get_child_content('event-description') == 'setup - events since last report: unittest: 1, unittest_2: 1, unittest_3: 1'
+    assert cache.get('ems_spool', expire=False)['events'] == dict()
+
+
+def test_get_cserver_cached():
+    ''' cluster vserver name is only retrieved once '''
+    svm_name = 'svm1'
+    flags = dict(cserver_cache=True, cache_dir=tempfile.mkdtemp())
+    server = create_connection_with_module(flags, 'vserver', svm_name)
+    assert netapp_utils.get_cserver(server) == svm_name
+    assert netapp_utils.get_cserver(server) == svm_name
+    assert server.count == 1
+
+
+class MockPagedConnection(object):
+    ''' mock a get-iter ZAPI returning records in pages '''
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.xml_in = list()
+
+    def invoke_successfully(self, xml, enable_tunneling):  # pylint: disable=unused-argument
+        self.xml_in.append(xml)
+        index = len(self.xml_in) - 1
+        result = netapp_utils.zapi.NaElement('results')
+        attributes = netapp_utils.zapi.NaElement('attributes-list')
+        for name in self.pages[index]:
+            attributes.add_node_with_children('volume-attributes', **{'name': name})
+        result.add_child_elem(attributes)
+        if index + 1 < len(self.pages):
+            result.add_new_child('next-tag', 'tag_%d' % (index + 1))
+        return result
+
+
+def test_zapi_get_iter_pages():
+    ''' records are yielded page by page, next-tag is used for the next call '''
+    server = MockPagedConnection([['vol1', 'vol2'], ['vol3'], ['vol4']])
+    records = netapp_utils.zapi_get_iter(server, 'volume-get-iter', max_records=2,
+                                         query={'volume-attributes': {'name': 'vol*'}},
+                                         desired_attributes={'volume-attributes': {'name': None}})
+    assert next(records).get_child_content('name') == 'vol1'
+    # only the first page was requested so far
+    assert len(server.xml_in) == 1
+    assert [record.get_child_content('name') for record in records] == ['vol2', 'vol3', 'vol4']
+    assert len(server.xml_in) == 3
+    first, second = server.xml_in[0], server.xml_in[1]
+    assert first.get_child_content('tag') is None
+    assert second.get_child_content('tag') == 'tag_1'
+    for api_call in server.xml_in:
+        assert api_call.get_child_content('max-records') == '2'
+        assert api_call.get_child_by_name('query').get_child_by_name('volume-attributes').get_child_content('name') == 'vol*'
+        assert api_call.get_child_by_name('desired-attributes') is not None
+
+
+def test_zapi_get_iter_no_records():
+    ''' no attributes-list, no records '''
+    server = MockPagedConnection([[]])
+    server.invoke_successfully = lambda xml, enable_tunneling: netapp_utils.zapi.NaElement('results')
+    assert list(netapp_utils.zapi_get_iter(server, 'volume-get-iter')) == []
+
+
+@patch('time.sleep')
+def test_job_poller_backoff(mock_sleep):
+    ''' intervals double up to the ceiling, and the last one is shortened to expire with the timeout '''
+    poller = netapp_utils.JobPoller(5, max_interval=2)
+    while poller.sleep():
+        pass
+    assert [args[0][0] for args in mock_sleep.call_args_list] == [0.5, 1, 2, 1.5]
+    assert poller.timed_out()
+    assert poller.report() == '5 poll(s) in 5.0 seconds'
+
+
+def job_response(state):
+    return (200, {'state': state, 'message': 'job is %s' % state}, None)
+
+
+@patch('time.sleep')
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_wait_on_job_backoff(mock_request, mock_sleep):
+    ''' a short job is polled at sub-second intervals rather than every increment '''
+    mock_request.side_effect = [job_response('queued'), job_response('running'), job_response('success')]
+    rest_api = create_restapi_object(mock_args())
+    job = {'_links': {'self': {'href': '/api/cluster/jobs/1234'}}}
+    message, error = rest_api.wait_on_job(job, increment=5)
+    assert (message, error) == ('job is success', None)
+    assert [args[0][0] for args in mock_sleep.call_args_list] == [0.5, 1]
+    assert rest_api.debug_logs[-1] == (0, 'Job cluster/jobs/1234: 3 poll(s) in 1.5 seconds')
+
+
+@patch('time.sleep')
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_wait_on_job_timeout(mock_request, mock_sleep):
+    ''' polling stops when the timeout is reached '''
+    mock_request.return_value = job_response('running')
+    rest_api = create_restapi_object(mock_args())
+    job = {'_links': {'self': {'href': '/api/cluster/jobs/1234'}}}
+    message, error = rest_api.wait_on_job(job, timeout=3, increment=60)
+    assert (message, error) == ('job is running', None)
+    assert sum(args[0][0] for args in mock_sleep.call_args_list) == 3
+    assert rest_api.errors == ['Timeout error: Process still running after 4 poll(s) in 3.0 seconds']
+
+
+@patch('time.sleep')
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_wait_on_job_error_retries(mock_request, mock_sleep):
+    ''' transient errors are retried every increment seconds, independently of the poll backoff '''
+    mock_request.side_effect = [job_response('running'), (500, None, 'hiccup'), (500, None, 'hiccup'), (500, None, 'hiccup'),
+                                job_response('running'), job_response('success')]
+    rest_api = create_restapi_object(mock_args())
+    job = {'_links': {'self': {'href': '/api/cluster/jobs/1234'}}}
+    message, error = rest_api.wait_on_job(job, increment=60)
+    assert message == 'job is success'
+    assert [args[0][0] for args in mock_sleep.call_args_list] == [0.5, 60, 60, 60, 1]
+    assert not rest_api.errors
+
+
+@patch('time.sleep')
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_wait_on_job_error_retry_budget(mock_request, mock_sleep):
+    ''' polling stops when errors persist for more than 3 * increment seconds '''
+    mock_request.return_value = (500, None, 'down')
+    rest_api = create_restapi_object(mock_args())
+    job = {'_links': {'self': {'href': '/api/cluster/jobs/1234'}}}
+    message, error = rest_api.wait_on_job(job, increment=60)
+    assert (message, error) == (None, 'down')
+    assert [args[0][0] for args in mock_sleep.call_args_list] == [60, 60, 60]
+    assert rest_api.errors == ['Job error: Reach max retries.']
+
+
+class MockJobConnection(object):
+    ''' mock job-get, returning states in sequence '''
+
+    def __init__(self, states):
+        self.states = list(states)
+
+    def invoke_successfully(self, xml, enable_tunneling):  # pylint: disable=unused-argument
+        assert xml.get_name() == 'job-get'
+        state = self.states.pop(0)
+        if state is None:
+            raise netapp_utils.zapi.NaApiError('15661', 'not found')
+        xml = netapp_utils.zapi.NaElement('xml')
+        xml.translate_struct({'attributes': {'job-info': {'job-state': state, 'job-progress': 'job is %s' % state}}})
+        return xml
+
+
+@patch('time.sleep')
+def test_zapi_wait_on_job(mock_sleep):
+    module = create_module(mock_args())
+    server = MockJobConnection(['queued', 'running', 'success'])
+    assert netapp_utils.zapi_wait_on_job(module, server, '1234', 60) is None
+    assert [args[0][0] for args in mock_sleep.call_args_list] == [0.5, 1]
+
+
+@patch('time.sleep')
+def test_zapi_wait_on_job_failure_and_timeout(mock_sleep):
+    module = create_module(mock_args())
+    assert netapp_utils.zapi_wait_on_job(module, MockJobConnection(['failure']), '1234', 60) == 'job is failure'
+    error = netapp_utils.zapi_wait_on_job(module, MockJobConnection(['running'] * 3), '1234', 1)
+    assert error == 'job completion exceeded expected timer of: 1 seconds, after 3 poll(s) in 1.0 seconds'
+
+
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.setup_na_ontap_zapi')
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.get_cserver')
+def test_zapi_wait_on_job_on_cserver(mock_get_cserver, mock_setup):
+    ''' when the job is not found, it is looked up on the admin vserver '''
+    module = create_module(mock_args())
+    mock_get_cserver.return_value = 'cserver'
+    mock_setup.return_value = MockJobConnection(['success'])
+    assert netapp_utils.zapi_wait_on_job(module, MockJobConnection([None]), 1234, 60) is None
+    mock_setup.assert_called_once_with(module=module, vserver='cserver')
+    mock_setup.return_value = MockJobConnection([None])
+    assert netapp_utils.zapi_wait_on_job(module, MockJobConnection([None]), 1234, 60) == 'cannot locate job with id: 1234'
+
+
 def mock_args(feature_flags=None):
     args = {
         'hostname': 'test',
@@ -243,6 +465,190 @@ def test_is_rest_false(mock_request):
     assert rest_api.debug_logs[0][1] == SRR['is_zapi'][2]    # error
 
 
+class MockResponse(object):
+    ''' mock a response from requests '''
+
+    def __init__(self, status_code=200, json_dict=None):
+        self.status_code = status_code
+        self.json_dict = json_dict if json_dict is not None else dict()
+        self.content = repr(self.json_dict)
+        self.headers = dict()
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.json_dict
+
+
+@patch('requests.request')
+@patch('requests.Session.request')
+def test_rest_session_is_reused(mock_session_request, mock_request):
+    ''' all requests go through a single session, and its connection pool '''
+    mock_session_request.return_value = MockResponse(json_dict={'records': []})
+    rest_api = create_restapi_object(mock_args())
+    rest_api.get('cluster')
+    session = rest_api.session
+    rest_api.get('storage/volumes')
+    assert session is not None
+    assert rest_api.session is session
+    assert mock_session_request.call_count == 2
+    mock_request.assert_not_called()
+    adapter = session.get_adapter('https://test/api/')
+    assert adapter._pool_maxsize == 10
+
+
+@patch('requests.Session.request')
+def test_rest_session_pool_maxsize(mock_session_request):
+    ''' pool size can be set with a feature flag '''
+    mock_session_request.return_value = MockResponse()
+    rest_api = create_restapi_object(mock_args(dict(rest_pool_maxsize=4)))
+    rest_api.get('cluster')
+    adapter = rest_api.session.get_adapter('https://test/api/')
+    assert adapter._pool_maxsize == 4
+
+
+def test_rest_session_pool_maxsize_invalid():
+    ''' pool size must be an int '''
+    rest_api = create_restapi_object(mock_args(dict(rest_pool_maxsize='many')))
+    with pytest.raises(AnsibleFailJson) as exc:
+        rest_api.get_session()
+    msg = 'Error: expected int type for feature flag: rest_pool_maxsize, got: many'
+    assert exc.value.args[0]['msg'] == msg
+
+
+@patch('requests.request')
+@patch('requests.Session.request')
+def test_rest_no_keep_alive(mock_session_request, mock_request):
+    ''' legacy behavior, a new connection for each request '''
+    mock_request.return_value = MockResponse()
+    rest_api = create_restapi_object(mock_args(dict(rest_keep_alive=False)))
+    rest_api.get('cluster')
+    rest_api.get('storage/volumes')
+    assert rest_api.session is None
+    assert mock_request.call_count == 2
+    mock_session_request.assert_not_called()
+
+
+def cache_args(cache_dir, **kwargs):
+    feature_flags = dict(rest_capability_cache=True, cache_dir=cache_dir)
+    feature_flags.update(kwargs)
+    return mock_args(feature_flags)
+
+
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_is_rest_cached(mock_request):
+    ''' second call reads REST availability and version from the cache '''
+    mock_request.side_effect = [
+        (200, {'version': {'full': 'NetApp Release 9.7', 'generation': 9, 'major': 7, 'minor': 0}}, None),
+        SRR['end_of_sequence'],
+    ]
+    cache_dir = tempfile.mkdtemp()
+    rest_api = create_restapi_object(cache_args(cache_dir))
+    assert rest_api.is_rest()
+    rest_api = create_restapi_object(cache_args(cache_dir))
+    assert rest_api.is_rest()
+    assert rest_api.ontap_version['major'] == 7
+    assert rest_api.ontap_version['valid']
+    assert mock_request.call_count == 1
+
+
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_is_rest_cached_zapi(mock_request):
+    ''' REST API not found is cached, the error is preserved and logged '''
+    mock_request.side_effect = [
+        (404, {}, 'Not Found'),
+        SRR['end_of_sequence'],
+    ]
+    cache_dir = tempfile.mkdtemp()
+    rest_api = create_restapi_object(cache_args(cache_dir))
+    assert not rest_api.is_rest()
+    rest_api = create_restapi_object(cache_args(cache_dir))
+    assert not rest_api.is_rest()
+    assert rest_api.is_rest_error == 'Not Found'
+    assert rest_api.errors == ['Not Found (cached)']
+    assert rest_api.debug_logs[-1] == (404, 'Not Found (cached)')
+    assert mock_request.call_count == 1
+
+
+@pytest.mark.parametrize('status_code', [400, 401, 403])
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_is_rest_not_cached_on_client_error(mock_request, status_code):
+    ''' a transient client error, eg during a password rotation, is not replayed '''
+    mock_request.side_effect = [
+        (status_code, {}, 'Unauthorized'),
+        SRR['is_rest'],
+    ]
+    cache_dir = tempfile.mkdtemp()
+    rest_api = create_restapi_object(cache_args(cache_dir))
+    assert not rest_api.is_rest()
+    rest_api = create_restapi_object(cache_args(cache_dir))
+    assert rest_api.is_rest()
+    assert mock_request.call_count == 2
+
+
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_is_rest_not_cached_on_other_success(mock_request):
+    ''' only a 200 is cached as REST available, another 2xx is not cached '''
+    mock_request.side_effect = [
+        (204, {}, None),
+        SRR['is_rest'],
+    ]
+    cache_dir = tempfile.mkdtemp()
+    assert not create_restapi_object(cache_args(cache_dir)).is_rest()
+    assert create_restapi_object(cache_args(cache_dir)).is_rest()
+    assert mock_request.call_count == 2
+
+
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_is_rest_not_cached_on_connection_error(mock_request):
+    ''' a connection error is not cached '''
+    mock_request.side_effect = [
+        (None, None, 'Connection error'),
+        SRR['is_rest'],
+    ]
+    cache_dir = tempfile.mkdtemp()
+    rest_api = create_restapi_object(cache_args(cache_dir))
+    assert not rest_api.is_rest()
+    rest_api = create_restapi_object(cache_args(cache_dir))
+    assert rest_api.is_rest()
+    assert mock_request.call_count == 2
+
+
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_is_rest_cache_expired_or_invalidated(mock_request):
+    ''' entries are ignored when expired, or when invalidate_cache is set '''
+    mock_request.side_effect = [
+        SRR['is_zapi'],
+        SRR['is_rest'],
+        SRR['is_rest'],
+    ]
+    cache_dir = tempfile.mkdtemp()
+    rest_api = create_restapi_object(cache_args(cache_dir))
+    assert not rest_api.is_rest()
+    rest_api = create_restapi_object(cache_args(cache_dir, cache_ttl=-1))
+    assert rest_api.is_rest()
+    rest_api = create_restapi_object(cache_args(cache_dir, invalidate_cache=True))
+    assert rest_api.is_rest()
+    assert mock_request.call_count == 3
+
+
+def test_cache_key_depends_on_user():
+    ''' the password is not part of the key, and a different user gets a different cache entry '''
+    cache_dir = tempfile.mkdtemp()
+    module = create_module(cache_args(cache_dir))
+    cache = netapp_utils.OntapCache(module)
+    cache.set('key', 'value')
+    assert cache.get('key') == 'value'
+    args = cache_args(cache_dir)
+    args['password'] = 'other_pass'
+    assert netapp_utils.OntapCache(create_module(args)).path == cache.path
+    args['username'] = 'other_user'
+    other_cache = netapp_utils.OntapCache(create_module(args))
+    assert other_cache.path != cache.path
+    assert other_cache.get('key') is None
+
+
 def test_has_feature_success_default():
     ''' existing feature_flag with default '''
     flag = 'deprecation_warning'
@@ -434,6 +840,182 @@ def test_zapi_parse_response_unsanitized():
     assert exc.value.msg.startswith(msg)
 
 
+class MockHTTPResponse(object):
+    ''' mock a response from http_client, body can be an exception raised when reading '''
+
+    def __init__(self, status=200, body=None, will_close=False):
+        self.status = status
+        self.reason = 'OK' if status == 200 else 'Error'
+        self.body = body
+        self.will_close = will_close
+
+    def read(self):
+        if isinstance(self.body, Exception):
+            raise self.body
+        return self.body
+
+
+class MockHTTPConnection(object):
+    ''' mock a persistent connection, responses are returned in order, exceptions are raised '''
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = list()
+        self.sock = None
+        self.closed = False
+
+    def connect(self):
+        self.sock = 'connected'
+
+    def request(self, method, url, body=None, headers=None):
+        self.requests.append((method, url, body, headers))
+
+    def getresponse(self):
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def close(self):
+        self.closed = True
+
+
+ZAPI_PASSED = b"<?xml version='1.0' encoding='UTF-8' ?>\n<netapp version='1.180' xmlns='http://www.netapp.com/filer/admin'>" +\
+    b"<results status='passed'><num-records>0</num-records></results></netapp>\n"
+
+
+def create_keep_alive_zapi_cx(connections):
+    args = mock_args(dict(zapi_keep_alive=True))
+    module = create_module(args)
+    zapi_cx = netapp_utils.setup_na_ontap_zapi(module)
+    assert zapi_cx.keep_alive
+
+    def get_connection():
+        if zapi_cx.connection is None:
+            zapi_cx.connection = connections.pop(0)
+            zapi_cx.connection_reused = False
+        return zapi_cx.connection
+
+    zapi_cx._get_connection = get_connection
+    return zapi_cx
+
+
+def test_zapi_cx_keep_alive_reuses_connection():
+    ''' two calls on the same connection, with the Authorization header '''
+    connection = MockHTTPConnection([MockHTTPResponse(body=ZAPI_PASSED), MockHTTPResponse(body=ZAPI_PASSED)])
+    zapi_cx = create_keep_alive_zapi_cx([connection])
+    zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('vserver-get-iter'), True)
+    result = zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('volume-get-iter'), True)
+    assert result.get_child_content('num-records') == '0'
+    assert len(connection.requests) == 2
+    method, url, body, headers = connection.requests[1]
+    assert method == 'POST'
+    assert url == '/servlets/netapp.servlets.admin.XMLrequest_filer'
+    assert b'volume-get-iter' in body
+    assert 'Authorization' in headers
+    assert not connection.closed
+
+
+def test_zapi_cx_keep_alive_reconnects_on_stale_connection():
+    ''' server closed an idle connection, request is sent again on a new connection '''
+    stale = MockHTTPConnection([MockHTTPResponse(body=ZAPI_PASSED), http_client.RemoteDisconnected('closed')])
+    fresh = MockHTTPConnection([MockHTTPResponse(body=ZAPI_PASSED)])
+    zapi_cx = create_keep_alive_zapi_cx([stale, fresh])
+    zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('vserver-get-iter'), True)
+    zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('volume-get-iter'), True)
+    assert stale.closed
+    assert len(fresh.requests) == 1
+    assert zapi_cx.connection is fresh
+
+
+def test_zapi_cx_keep_alive_reconnects_on_connection_reset():
+    ''' server reset an idle connection before sending a response, request is sent again on a new connection '''
+    stale = MockHTTPConnection([MockHTTPResponse(body=ZAPI_PASSED), socket.error(errno.ECONNRESET, 'reset')])
+    fresh = MockHTTPConnection([MockHTTPResponse(body=ZAPI_PASSED)])
+    zapi_cx = create_keep_alive_zapi_cx([stale, fresh])
+    zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('vserver-get-iter'), True)
+    zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('volume-get-iter'), True)
+    assert len(fresh.requests) == 1
+
+
+@pytest.mark.parametrize('error', [socket.timeout('timed out'), ConnectionAbortedError('aborted')])
+def test_zapi_cx_keep_alive_no_retry_on_reused_connection(error):
+    ''' the request may have been received, it is not sent again '''
+    stale = MockHTTPConnection([MockHTTPResponse(body=ZAPI_PASSED), error])
+    fresh = MockHTTPConnection([MockHTTPResponse(body=ZAPI_PASSED)])
+    zapi_cx = create_keep_alive_zapi_cx([stale, fresh])
+    zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('vserver-get-iter'), True)
+    with pytest.raises(netapp_utils.zapi.NaApiError) as exc:
+        zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('volume-create'), True)
+    assert exc.value.code == 'URL error'
+    assert stale.closed
+    assert not fresh.requests
+
+
+def test_zapi_cx_keep_alive_no_retry_after_headers():
+    ''' no retry when reading the response fails '''
+    stale = MockHTTPConnection([MockHTTPResponse(body=ZAPI_PASSED), MockHTTPResponse(body=ConnectionResetError('reset'))])
+    fresh = MockHTTPConnection([MockHTTPResponse(body=ZAPI_PASSED)])
+    zapi_cx = create_keep_alive_zapi_cx([stale, fresh])
+    zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('vserver-get-iter'), True)
+    with pytest.raises(netapp_utils.zapi.NaApiError) as exc:
+        zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('volume-create'), True)
+    assert exc.value.code == 'URL error'
+    assert not fresh.requests
+    assert zapi_cx.connection is None
+
+
+def test_zapi_cx_keep_alive_unexpected_error():
+    ''' other exceptions are reported as with netapp-lib '''
+    connection = MockHTTPConnection([ValueError('unexpected')])
+    zapi_cx = create_keep_alive_zapi_cx([connection])
+    with pytest.raises(netapp_utils.zapi.NaApiError) as exc:
+        zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('vserver-get-iter'), True)
+    assert exc.value.code == 'Unexpected error'
+    assert zapi_cx.connection is None
+
+
+def test_zapi_cx_keep_alive_connection_error():
+    ''' no retry on a new connection '''
+    connection = MockHTTPConnection([ConnectionRefusedError(errno.ECONNREFUSED, 'refused')])
+    zapi_cx = create_keep_alive_zapi_cx([connection])
+    with pytest.raises(netapp_utils.zapi.NaApiError) as exc:
+        zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('vserver-get-iter'), True)
+    assert exc.value.code == 'Unable to connect'
+    assert netapp_utils.is_zapi_connection_error(exc.value.message)
+    assert zapi_cx.connection is None
+
+
+def test_zapi_cx_keep_alive_http_error():
+    ''' HTTP errors are reported as NaApiError, as with netapp-lib '''
+    connection = MockHTTPConnection([MockHTTPResponse(status=401, will_close=True)])
+    zapi_cx = create_keep_alive_zapi_cx([connection])
+    with pytest.raises(netapp_utils.zapi.NaApiError) as exc:
+        zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('vserver-get-iter'), True)
+    assert exc.value.code == 401
+    assert connection.closed
+
+
+def test_zapi_cx_keep_alive_disabled_by_default():
+    ''' netapp-lib transport is used unless the feature is enabled '''
+    module = create_module(mock_args())
+    zapi_cx = netapp_utils.setup_na_ontap_zapi(module)
+    assert not zapi_cx.keep_alive
+
+
+def test_zapi_cx_keep_alive_https_connection():
+    ''' HTTPS uses a connection that can resume the TLS session '''
+    args = mock_args(dict(zapi_keep_alive=True))
+    args['https'] = True
+    args['validate_certs'] = False
+    module = create_module(args)
+    zapi_cx = netapp_utils.setup_na_ontap_zapi(module)
+    connection = zapi_cx._get_connection()
+    assert isinstance(connection, netapp_utils.ResumableHTTPSConnection)
+    assert connection.port == 443
+    assert zapi_cx._get_connection() is connection
+
+
 def test_zapi_cx_add_auth_header():
     ''' should add header '''
     args = mock_args()
@@ -466,3 +1048,293 @@ def test_zapi_cx_no_auth_header():
     assert not isinstance(zapi_cx, netapp_utils.OntapZAPICx)
     request, dummy = zapi_cx._create_request(netapp_utils.zapi.NaElement('dummy_tag'))
     assert "Authorization" not in [x[0] for x in request.header_items()]
+
+
+class MockTimedResponse(MockResponse):
+    ''' mock a response from requests, with elapsed time and request body '''
+
+    def __init__(self, json_dict=None, body=None):
+        super(MockTimedResponse, self).__init__(json_dict=json_dict)
+        self.elapsed = datetime.timedelta(seconds=0.5)
+        self.request = type('MockRequest', (object,), dict(body=body))()
+
+
+def test_perf_stats_disabled_by_default():
+    rest_api = create_restapi_object(mock_args())
+    assert rest_api.perf is None
+    zapi_cx = create_keep_alive_zapi_cx([])
+    assert zapi_cx.perf is None
+
+
+@patch('requests.Session.request')
+def test_perf_stats_rest(mock_session_request):
+    ''' calls are recorded, next links are counted as pages, and the summary is added to the module result '''
+    mock_session_request.return_value = MockTimedResponse(json_dict={'records': []}, body=b'{"name": "vol1"}')
+    rest_api = create_restapi_object(mock_args(dict(perf_stats=True)))
+    rest_api.get('storage/volumes', {'fields': 'name'})
+    rest_api.get('/storage/volumes?start.uuid=1234&fields=name')
+    rest_api.post('storage/volumes/d3e0ec93-1a8c-11eb-9f8f-005056b3a6e4/snapshots', {'name': 'vol1'})
+    summary = rest_api.perf.summary()
+    assert summary['calls'] == 3
+    assert summary['request_bytes'] == 3 * len(b'{"name": "vol1"}')
+    volumes = summary['apis']['GET storage/volumes']
+    assert volumes['calls'] == 2
+    assert volumes['pages'] == 2
+    assert volumes['ttfb'] == 1.0
+    assert 'POST storage/volumes/{uuid}/snapshots' in summary['apis']
+    call = rest_api.perf.calls[0]
+    assert call['connect'] == 0.0
+    assert call['status'] == 200
+
+    def exit_json(**kwargs):
+        return kwargs
+
+    # the summary is added when the module exits
+    rest_api.module.exit_json = rest_api.perf.add_perf_to_result(exit_json)
+    result = rest_api.module.exit_json(changed=False)
+    assert result['perf']['calls'] == 3
+
+
+def test_perf_stats_zapi_keep_alive():
+    ''' connect, ttfb and body are measured, and continuation requests are counted as pages '''
+    connection = MockHTTPConnection([MockHTTPResponse(body=ZAPI_PASSED), MockHTTPResponse(body=ZAPI_PASSED)])
+    args = mock_args(dict(zapi_keep_alive=True, perf_stats=True))
+    module = create_module(args)
+    zapi_cx = netapp_utils.setup_na_ontap_zapi(module)
+    zapi_cx._get_connection = lambda: connection
+    zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('volume-get-iter'), True)
+    next_page = netapp_utils.zapi.NaElement('volume-get-iter')
+    next_page.add_new_child('tag', 'next')
+    zapi_cx.invoke_successfully(next_page, True)
+    first, second = zapi_cx.perf.calls
+    assert first['connect'] is not None
+    assert first['ttfb'] is not None
+    assert first['body'] is not None
+    assert first['status'] == 'passed'
+    assert first['response_bytes'] == len(ZAPI_PASSED)
+    assert first['request_bytes'] > 0
+    assert (first['page'], second['page']) == (1, 2)
+    assert second['connect'] is None
+    assert zapi_cx.perf.summary()['apis']['volume-get-iter']['calls'] == 2
+
+
+def test_perf_stats_zapi_error():
+    ''' failed calls are recorded with the error code '''
+    connection = MockHTTPConnection([MockHTTPResponse(status=500, body=b'')])
+    args = mock_args(dict(zapi_keep_alive=True, perf_stats=True))
+    zapi_cx = netapp_utils.setup_na_ontap_zapi(create_module(args))
+    zapi_cx._get_connection = lambda: connection
+    with pytest.raises(netapp_utils.zapi.NaApiError):
+        zapi_cx.invoke_successfully(netapp_utils.zapi.NaElement('volume-get-iter'), True)
+    assert zapi_cx.perf.calls[0]['status'] == '500'
+
+
+@patch('requests.Session.request')
+def test_perf_stats_file(mock_session_request):
+    ''' one JSON line per call, the recorder is shared by all connections of a module '''
+    mock_session_request.return_value = MockTimedResponse()
+    perf_file = os.path.join(tempfile.mkdtemp(), 'perf.jsonl')
+    module = create_module(mock_args(dict(perf_stats_file=perf_file)))
+    rest_api = netapp_utils.OntapRestAPI(module)
+    rest_api.get('cluster')
+    assert netapp_utils.get_perf_recorder(module) is rest_api.perf
+    assert not rest_api.perf.report
+    with open(perf_file) as fd:
+        lines = [json.loads(line) for line in fd]
+    assert len(lines) == 1
+    assert lines[0]['api'] == 'cluster'
+    assert lines[0]['hostname'] == 'test'
+    assert lines[0]['transport'] == 'rest'
+
+
+@patch('requests.Session.request')
+def test_perf_stats_file_error(mock_session_request):
+    ''' a warning is reported once '''
+    mock_session_request.return_value = MockTimedResponse()
+    module = create_module(mock_args(dict(perf_stats_file='/non/existent/dir/perf.jsonl')))
+    warnings = list()
+    module.warn = warnings.append
+    rest_api = netapp_utils.OntapRestAPI(module)
+    rest_api.get('cluster')
+    rest_api.get('cluster')
+    assert len(warnings) == 1
+    assert 'Unable to write perf stats to /non/existent/dir/perf.jsonl' in warnings[0]
+
+
+def test_debug_log_is_bounded_and_truncated():
+    ''' oldest records are discarded, and long messages are truncated '''
+    rest_api = create_restapi_object(mock_args(dict(debug_log_max_entries=3, debug_log_max_size=10)))
+    for index in range(5):
+        rest_api.log_debug(200, 'record %d' % index)
+    rest_api.log_debug(200, b'x' * 25)
+    assert len(rest_api.debug_logs) == 3
+    assert list(rest_api.debug_logs) == [(200, 'record 3'), (200, 'record 4'), (200, b'x' * 10 + b'... (15 bytes truncated)')]
+
+
+def test_debug_log_is_bounded_by_default():
+    ''' without the feature flags, the last 100 records are kept, truncated to 1024 characters '''
+    rest_api = create_restapi_object(mock_args())
+    for index in range(150):
+        rest_api.log_debug(200, 'record %d' % index)
+    rest_api.log_debug(200, b'x' * 2000)
+    assert len(rest_api.debug_logs) == 100
+    assert rest_api.debug_logs[0] == (200, 'record 51')
+    assert rest_api.debug_logs[-1] == (200, b'x' * 1024 + b'... (976 bytes truncated)')
+
+
+def test_debug_log_no_limit():
+    ''' setting the feature flags to None keeps all records in full '''
+    rest_api = create_restapi_object(mock_args(dict(debug_log_max_entries=None, debug_log_max_size=None)))
+    for index in range(150):
+        rest_api.log_debug(200, 'record %d' % index)
+    rest_api.log_debug(200, b'x' * 2000)
+    assert len(rest_api.debug_logs) == 151
+    assert rest_api.debug_logs[-1] == (200, b'x' * 2000)
+
+
+def test_debug_log_truncates_text():
+    ''' text messages are truncated as text, including unicode on python 2 '''
+    debug_log = netapp_utils.DebugLog(max_size=3)
+    debug_log.append((200, u'\u00e9t\u00e9 ok'))
+    assert debug_log[0] == (200, u'\u00e9t\u00e9... (3 bytes truncated)')
+
+
+def test_debug_log_is_lazy():
+    ''' callables are only called when the log is read, and not at all when disabled '''
+    calls = list()
+
+    def message():
+        calls.append(1)
+        return 'sending'
+
+    rest_api = create_restapi_object(mock_args())
+    rest_api.log_debug('sending', message)
+    assert not calls
+    assert rest_api.debug_logs[0] == ('sending', 'sending')
+    assert len(calls) == 1
+    rest_api = create_restapi_object(mock_args(dict(debug_log_max_entries=0)))
+    rest_api.log_debug('sending', message)
+    rest_api.log_error(404, 'not found')
+    assert len(rest_api.debug_logs) == 0
+    assert rest_api.errors == ['not found']
+    assert len(calls) == 1
+
+
+@patch('requests.Session.request')
+def test_debug_log_send_request(mock_session_request):
+    ''' large responses are not kept in memory '''
+    mock_session_request.return_value = MockResponse(json_dict={'records': [{'name': 'x' * 2000}]})
+    rest_api = create_restapi_object(mock_args())
+    rest_api.get('storage/volumes')
+    status_code, message = rest_api.debug_logs[0]
+    assert status_code == 'sending'
+    assert "'url': 'https://test/api/storage/volumes'" in message
+    status_code, message = rest_api.debug_logs[1]
+    assert status_code == 200
+    assert len(message) < 1100
+
+
+def test_debug_log_invalid_feature_flag():
+    with pytest.raises(AnsibleFailJson) as exc:
+        create_restapi_object(mock_args(dict(debug_log_max_entries='all')))
+    assert exc.value.args[0]['msg'] == 'Error: expected int type for feature flag: debug_log_max_entries, got: all'
+
+
+@pytest.mark.parametrize('name', ['info.jsonl', 'info.jsonl.gz'])
+def test_info_stream_writer_sections(tmpdir, name):
+    ''' each section can be read on its own, using the offset and length from its manifest '''
+    path = str(tmpdir.join(name))
+    writer = netapp_utils.InfoStreamWriter(create_module(mock_args()), path)
+    direct = writer.open_section()
+    direct.write({'name': 'vol1'})
+    manifests = [direct.close()]
+    # spooled sections are appended when closed
+    first, second = writer.open_section(spool=True), writer.open_section(spool=True)
+    first.write({'name': 'lun1'})
+    second.write({'name': 'snap1'})
+    second.write({'name': 'snap2'})
+    manifests.extend([second.close(), first.close()])
+    writer.close()
+    assert [manifest['num_records'] for manifest in manifests] == [1, 2, 1]
+    with open(path, 'rb') as stream:
+        content = stream.read()
+    sections = list()
+    for manifest in manifests:
+        section = content[manifest['offset']:manifest['offset'] + manifest['length']]
+        if name.endswith('.gz'):
+            section = gzip.GzipFile(fileobj=io.BytesIO(section)).read()
+        sections.append([json.loads(line)['name'] for line in section.decode().splitlines()])
+    assert sections == [['vol1'], ['snap1', 'snap2'], ['lun1']]
+    assert sum(manifest['length'] for manifest in manifests) == len(content)
+
+
+def test_info_stream_writer_error(tmpdir):
+    module = create_module(mock_args())
+    module.fail_json = fail_json
+    with pytest.raises(AnsibleFailJson) as exc:
+        netapp_utils.InfoStreamWriter(module, str(tmpdir.join('missing', 'info.jsonl')))
+    assert exc.value.args[0]['msg'].startswith('Error opening output_file %s: ' % tmpdir.join('missing', 'info.jsonl'))
+
+
+@pytest.mark.skipif(not netapp_utils.has_sf_sdk(), reason='requires SolidFire Python SDK')
+@pytest.mark.parametrize('feature_flags, expected', [
+    (None, ['GetAPI', 'GetAPI', 'GetClusterInfo', 'GetClusterInfo']),
+    (dict(sf_api_version='11.0'), ['GetClusterInfo', 'GetClusterInfo']),
+])
+def test_create_sf_connection(feature_flags, expected):
+    ''' the API version is requested once per target, unless set with sf_api_version, and a session is shared per target '''
+    netapp_utils.SF_SESSIONS.clear()
+    netapp_utils.SF_API_VERSIONS.clear()
+    calls = list()
+
+    def post(session, url, data=None, **kwargs):   # pylint: disable=unused-argument
+        method = json.loads(data)['method']
+        calls.append((session, method))
+        result = dict(currentVersion='12.0', supportedVersions=['12.0']) if method == 'GetAPI' else dict(clusterInfo=dict(name='c1'))
+        response = MockResponse()
+        response.text = json.dumps(dict(id=1, result=result))
+        return response
+    module = create_module(mock_args(feature_flags))
+    with patch('requests.Session.post', autospec=True, side_effect=post):
+        connections = [netapp_utils.create_sf_connection(module), netapp_utils.create_sf_connection(module, port=442),
+                       netapp_utils.create_sf_connection(module)]
+        for connection in (connections[0], connections[2]):
+            connection.get_cluster_info()
+    assert [method for session, method in calls] == expected
+    assert calls[-1][0] is calls[-2][0]
+    assert connections[0].api_version == (11.0 if feature_flags else 12.0)
+
+
+@pytest.mark.skipif(not netapp_utils.has_sf_sdk(), reason='requires SolidFire Python SDK')
+def test_create_sf_connection_cached_version():
+    ''' with rest_capability_cache, the API version is kept on disk and reused by the next task '''
+    calls = list()
+
+    def post(session, url, data=None, **kwargs):   # pylint: disable=unused-argument
+        method = json.loads(data)['method']
+        calls.append(method)
+        response = MockResponse()
+        response.text = json.dumps(dict(id=1, result=dict(currentVersion='12.0', supportedVersions=['12.0'])))
+        return response
+    module = create_module(cache_args(tempfile.mkdtemp()))
+    with patch('requests.Session.post', autospec=True, side_effect=post):
+        for dummy in range(2):
+            # a new task starts with empty in-process caches
+            netapp_utils.SF_SESSIONS.clear()
+            netapp_utils.SF_API_VERSIONS.clear()
+            connection = netapp_utils.create_sf_connection(module)
+            assert connection.api_version == 12.0
+    assert calls == ['GetAPI']
+
+
+@pytest.mark.skipif(not netapp_utils.has_sf_sdk(), reason='requires SolidFire Python SDK')
+@pytest.mark.parametrize('version, error', [
+    ('abc', 'Error: sf_api_version is expected to be a number, eg 10.1, got: abc'),
+    ('1.0', 'Error: sf_api_version 1.0 is lower than the minimum version supported by the SDK: '),
+])
+def test_create_sf_connection_invalid_version(version, error):
+    module = create_module(mock_args(dict(sf_api_version=version)))
+    module.fail_json = fail_json
+    with pytest.raises(AnsibleFailJson) as exc:
+        netapp_utils.create_sf_connection(module)
+    assert exc.value.args[0]['msg'].startswith(error)
@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
 import sys
+import time
 
 import pytest
 
@@ -398,3 +399,55 @@ class TestMyModule(unittest.TestCase):
         expected = [[1, 3], dict(b=[7, 9], d=dict(v=10)), 5]
         result = my_obj.filter_out_none_entries(arg)
         assert expected == result
+
+    def test_compare_lists_hashable_matches_unhashable(self):
+        ''' both comparisons agree on diff and change, including duplicates '''
+        cases = [
+            ([], []),
+            (['a'], []),
+            ([], ['a']),
+            (['a', 'b', 'a'], ['a', 'a', 'b']),
+            (['a', 'b', 'a'], ['a', 'b', 'b']),
+            (['a', 'b'], ['a', 'b', 'b', 'c']),
+            ([1, 2, 3], [3, 2, 1.0]),
+            (['x', 'y', 'z'], ['z']),
+        ]
+        for current, desired in cases:
+            assert na_helper.compare_hashable_lists(current, desired) == na_helper.compare_unhashable_lists(current, desired)
+
+    def test_compare_lists_with_unhashable_items(self):
+        ''' dicts and lists fall back to the quadratic comparison '''
+        current = [dict(a=1), 'b', [1, 2]]
+        assert na_helper.compare_lists(current, ['b', [1, 2], dict(a=1)], True) is None
+        assert na_helper.compare_lists(current, ['b', dict(a=2)], True) == [dict(a=2)]
+        assert na_helper.compare_lists(current, ['b', dict(a=2)], False) == ['b', dict(a=2)]
+        assert na_helper.compare_lists(['b'], ['b', dict(a=2)], True) == [dict(a=2)]
+
+    def test_compare_lists_scaling(self):
+        ''' micro-benchmark: comparing 10k element lists is linear in the number of items '''
+        class Item(object):
+            ''' hashable item counting equality checks '''
+            eq_calls = 0
+
+            def __init__(self, value):
+                self.value = value
+
+            def __hash__(self):
+                return hash(self.value)
+
+            def __eq__(self, other):
+                Item.eq_calls += 1
+                return self.value == other.value
+
+        for size in (1000, 10000):
+            current = [Item('initiator_%d' % index) for index in range(size)]
+            desired = [Item('initiator_%d' % index) for index in range(size - 1, -1, -1)]
+            desired[-1] = Item('new_initiator')
+            Item.eq_calls = 0
+            start = time.time()
+            result = na_helper.compare_lists(current, desired, True)
+            elapsed = time.time() - start
+            print('compare_lists: %d items, %d equality checks, %.4f seconds' % (size, Item.eq_calls, elapsed))
+            assert [item.value for item in result] == ['new_initiator']
+            # a few checks per item for dict lookups, where the quadratic comparison needs about size * size / 2
+            assert Item.eq_calls <= 4 * size
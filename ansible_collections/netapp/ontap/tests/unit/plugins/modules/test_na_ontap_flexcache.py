@@ -525,7 +525,7 @@ class TestMyModule(unittest.TestCase):
                 with pytest.raises(AnsibleFailJson) as exc:
                     my_obj.apply()
             print('Create: ' + repr(exc.value))
-            msg = 'Error when creating flexcache: job completion exceeded expected timer of: %s seconds' \
+            msg = 'Error when creating flexcache: job completion exceeded expected timer of: %s seconds, after ' \
                 % args['time_out']
-            assert exc.value.args[0]['msg'] == msg
+            assert exc.value.args[0]['msg'].startswith(msg)
             mock_create.assert_called_with()
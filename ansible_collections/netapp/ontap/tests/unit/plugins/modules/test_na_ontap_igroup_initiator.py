@@ -20,6 +20,18 @@ from ansible_collections.netapp.ontap.plugins.modules.na_ontap_igroup_initiator
 if not netapp_utils.has_netapp_lib():
     pytestmark = pytest.mark.skip('skipping as missing required netapp_lib')
 
+# REST API canned responses when mocking send_request
+SRR = {
+    # common responses
+    'is_rest': (200, {}, None),
+    'empty_good': (200, {}, None),
+    'end_of_sequence': (500, None, "Unexpected call to send_request"),
+    'generic_error': (400, None, "Expected error"),
+    'igroup_record': (200, {'num_records': 1,
+                            'records': [{'uuid': 'a1b2c3',
+                                         'initiators': [{'name': 'init1'}, {'name': 'init2'}]}]}, None),
+}
+
 
 def set_module_args(args):
     """prepare arguments so that they will be picked up during module creation"""
@@ -111,7 +123,8 @@ class TestMyModule(unittest.TestCase):
             'initiator_group': 'test',
             'hostname': 'hostname',
             'username': 'username',
-            'password': 'password'
+            'password': 'password',
+            'use_rest': 'never'
         }
 
     def get_initiator_mock_object(self, kind=None):
@@ -216,3 +229,138 @@ class TestMyModule(unittest.TestCase):
         with pytest.raises(AnsibleFailJson) as exc:
             my_obj.modify_initiator(data['name'], 'igroup-add')
         assert 'Error modifying igroup initiator ' in exc.value.args[0]['msg']
+
+    def test_successful_add_batched_zapi(self):
+        ''' missing initiators are added in parallel, each worker with its own connection '''
+        data = self.mock_args()
+        data['names'] = ['init1', 'init3', 'init4', 'init3']
+        data['parallelism'] = 2
+        del data['name']
+        set_module_args(data)
+        obj = self.get_initiator_mock_object('initiator')
+        added = list()
+
+        class RecordingConnection(MockONTAPConnection):
+            def invoke_successfully(self, xml, enable_tunneling):
+                added.append(xml.get_child_content('initiator'))
+                return MockONTAPConnection.invoke_successfully(self, xml, enable_tunneling)
+
+        with patch.object(netapp_utils, 'setup_na_ontap_zapi', side_effect=lambda *args, **kwargs: RecordingConnection()) as mock_setup:
+            with pytest.raises(AnsibleExitJson) as exc:
+                obj.apply()
+        assert exc.value.args[0]['changed']
+        assert exc.value.args[0]['added_count'] == 2
+        assert exc.value.args[0]['removed_count'] == 0
+        assert sorted(added) == ['init3', 'init4']
+        assert mock_setup.call_count == 2
+
+    def test_successful_remove_check_mode(self):
+        ''' counts are reported in check mode '''
+        data = self.mock_args()
+        data['names'] = ['init1', 'init2', 'init3']
+        data['state'] = 'absent'
+        del data['name']
+        data['_ansible_check_mode'] = True
+        set_module_args(data)
+        obj = self.get_initiator_mock_object('initiator')
+        with pytest.raises(AnsibleExitJson) as exc:
+            obj.apply()
+        assert exc.value.args[0]['changed']
+        assert exc.value.args[0]['removed_count'] == 2
+        assert obj.server.xml_in.get_name() == 'igroup-get-iter'
+
+    def test_parallel_error(self):
+        data = self.mock_args()
+        data['names'] = ['init3', 'init4']
+        data['parallelism'] = 2
+        del data['name']
+        set_module_args(data)
+        obj = self.get_initiator_mock_object('initiator')
+        with patch.object(netapp_utils, 'setup_na_ontap_zapi', side_effect=lambda *args, **kwargs: MockONTAPConnection('initiator_fail')):
+            with pytest.raises(AnsibleFailJson) as exc:
+                obj.apply()
+        assert exc.value.args[0]['msg'] == 'Error modifying igroup initiator init3: NetApp API failed. Reason - TEST:This exception is from the unit test'
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_auto_uses_zapi(self, mock_request):
+        ''' with use_rest auto, ZAPI is used even if REST is available, with the same result as never '''
+        mock_request.side_effect = [
+            (200, {'version': {'generation': 9, 'major': 8, 'minor': 0, 'full': 'dummy'}}, None),
+            SRR['end_of_sequence']
+        ]
+        results = dict()
+        for use_rest in ('never', 'auto'):
+            data = self.mock_args()
+            data['names'] = ['init1', 'init3']
+            data['use_rest'] = use_rest
+            del data['name']
+            set_module_args(data)
+            obj = self.get_initiator_mock_object('initiator')
+            with pytest.raises(AnsibleExitJson) as exc:
+                obj.apply()
+            assert not obj.use_rest
+            assert obj.autosupport_log.called
+            results[use_rest] = exc.value.args[0]
+        assert results['auto'] == results['never']
+        assert results['auto']['added_count'] == 1
+        assert not mock_request.called
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_successful_add_rest(self, mock_request):
+        ''' all missing initiators are added with a single POST '''
+        data = self.mock_args()
+        data['names'] = ['init1', 'init3', 'init4']
+        data['use_rest'] = 'always'
+        del data['name']
+        set_module_args(data)
+        mock_request.side_effect = [
+            SRR['igroup_record'],
+            SRR['empty_good'],
+            SRR['end_of_sequence']
+        ]
+        with pytest.raises(AnsibleExitJson) as exc:
+            initiator().apply()
+        assert exc.value.args[0]['changed']
+        assert exc.value.args[0]['added_count'] == 2
+        assert mock_request.call_count == 2
+        args, kwargs = mock_request.call_args
+        assert args[:2] == ('POST', 'protocols/san/igroups/a1b2c3/initiators')
+        assert kwargs['json'] == {'records': [{'name': 'init3'}, {'name': 'init4'}]}
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_successful_remove_rest(self, mock_request):
+        data = self.mock_args()
+        data['names'] = ['init1', 'init2', 'init3']
+        data['use_rest'] = 'always'
+        data['state'] = 'absent'
+        data['force_remove'] = True
+        data['parallelism'] = 2
+        del data['name']
+        set_module_args(data)
+        mock_request.side_effect = [
+            SRR['igroup_record'],
+            SRR['empty_good'],
+            SRR['empty_good'],
+            SRR['end_of_sequence']
+        ]
+        with pytest.raises(AnsibleExitJson) as exc:
+            initiator().apply()
+        assert exc.value.args[0]['removed_count'] == 2
+        deletes = sorted(call[0][1] for call in mock_request.call_args_list if call[0][0] == 'DELETE')
+        assert deletes == ['protocols/san/igroups/a1b2c3/initiators/init1', 'protocols/san/igroups/a1b2c3/initiators/init2']
+        assert mock_request.call_args[0][2] == {'allow_delete_while_mapped': True}
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_add_rest_error(self, mock_request):
+        data = self.mock_args()
+        data['use_rest'] = 'always'
+        data['name'] = 'init3'
+        set_module_args(data)
+        mock_request.side_effect = [
+            SRR['igroup_record'],
+            SRR['generic_error'],
+            SRR['end_of_sequence']
+        ]
+        with pytest.raises(AnsibleFailJson) as exc:
+            initiator().apply()
+        assert exc.value.args[0]['msg'] == 'Error modifying igroup initiators init3: Expected error'
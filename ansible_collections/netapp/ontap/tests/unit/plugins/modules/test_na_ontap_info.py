@@ -5,9 +5,13 @@
 
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
+import gzip
 import json
+import os
 import pytest
+import shutil
 import sys
+import tempfile
 
 from ansible_collections.netapp.ontap.tests.unit.compat import unittest
 from ansible_collections.netapp.ontap.tests.unit.compat.mock import patch
@@ -21,6 +25,8 @@ from ansible_collections.netapp.ontap.plugins.modules.na_ontap_info \
     import NetAppONTAPGatherInfo as info_module  # module under test
 from ansible_collections.netapp.ontap.plugins.modules.na_ontap_info \
     import convert_keys as info_convert_keys     # function under test
+from ansible_collections.netapp.ontap.plugins.modules.na_ontap_info \
+    import zapi_to_dict as info_zapi_to_dict     # function under test
 
 if not netapp_utils.has_netapp_lib():
     pytestmark = pytest.mark.skip('skipping as missing required netapp_lib')
@@ -88,6 +94,16 @@ class MockONTAPConnection(object):
             xml = self.list_of_two()
         elif self.type == 'list_of_two_dups':
             xml = self.list_of_two_dups()
+        elif self.type == 'by_call':
+            xml = self.build_by_call(xml.get_name())
+        elif self.type == 'net_port_paged':
+            xml = self.build_net_port_info()
+            if self.xml_in.get_child_content('tag') is None:
+                xml.add_new_child('next-tag', 'next')
+            else:
+                # second page
+                net_port_info = xml.get_child_by_name('attributes-list').get_children()[1]
+                net_port_info.get_child_by_name('node').set_content('node_2')
         else:
             raise KeyError(self.type)
         self.xml_out = xml
@@ -123,6 +139,20 @@ class MockONTAPConnection(object):
         xml.add_child_elem(attributes_list)
         return xml
 
+    def build_by_call(self, call):
+        ''' build xml data based on the ZAPI name '''
+        if call == 'system-get-ontapi-version':
+            xml = netapp_utils.zapi.NaElement('results')
+            xml.add_new_child('minor-version', '170')
+            return xml
+        if call == 'net-port-get-iter':
+            return self.build_net_port_info('with_ifgrp')
+        if call == 'net-port-ifgrp-get':
+            return self.build_net_ifgrp_info()
+        if call == 'cluster-node-get-iter':
+            raise netapp_utils.zapi.NaApiError('test', 'error')
+        raise KeyError(call)
+
     @staticmethod
     def build_net_ifgrp_info():
         ''' build xml data for net-ifgrp-info '''
@@ -192,9 +222,12 @@ class TestMyModule(unittest.TestCase):
             vserver=dict(type='str', default=None, required=False),
             max_records=dict(type='int', default=1024, required=False),
             desired_attributes=dict(type='dict', required=False),
+            fields=dict(type='dict', required=False),
             use_native_zapi_tags=dict(type='bool', required=False, default=False),
             continue_on_error=dict(type='list', required=False, default=['never']),
             query=dict(type='dict', required=False),
+            parallelism=dict(type='int', required=False, default=1),
+            output_file=dict(type='path', required=False),
         ))
         module = basic.AnsibleModule(
             argument_spec=argument_spec,
@@ -242,6 +275,157 @@ class TestMyModule(unittest.TestCase):
         assert result.get('node_0:port_0')
         assert result.get('node_1:port_1')
 
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.ems_log_event')
+    def test_get_generic_get_iter_paged(self, mock_ems_log):
+        '''records from all pages are returned'''
+        set_module_args(self.mock_args())
+        obj = self.get_info_mock_object('net_port_paged')
+        result = obj.get_generic_get_iter(
+            'net-port-get-iter',
+            attribute='net-port-info',
+            key_fields=('node', 'port'),
+            query={'max-records': '2'}
+        )
+        assert sorted(result) == ['node_0:port_0', 'node_1:port_1', 'node_2:port_1']
+        assert obj.server.xml_in.get_child_content('tag') == 'next'
+        assert obj.server.xml_in.get_child_content('max-records') == '2'
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.ems_log_event')
+    def test_get_generic_get_iter_with_fields(self, mock_ems_log):
+        '''fields are sent as desired-attributes, with the key fields'''
+        args = self.mock_args()
+        args['fields'] = {'net_port_info': ['mtu', 'net-port-info.ifgrp_port']}
+        set_module_args(args)
+        obj = self.get_info_mock_object('net_port')
+        obj.plan_fields(['net_port_info'])
+        kwargs = obj.info_subsets['net_port_info']['kwargs']
+        assert kwargs['desired_attributes'] == {'net-port-info': {'node': None, 'port': None, 'mtu': None, 'ifgrp-port': None}}
+        result = obj.get_generic_get_iter(**kwargs)
+        assert result.get('node_0:port_0')
+        attributes = obj.server.xml_in.get_child_by_name('desired-attributes').get_child_by_name('net-port-info')
+        assert sorted(child.get_name() for child in attributes.get_children()) == ['ifgrp-port', 'mtu', 'node', 'port']
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.ems_log_event')
+    def test_get_generic_get_iter_to_output_file(self, mock_ems_log):
+        '''records are written to output_file, and the manifest is returned'''
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        args = self.mock_args()
+        args['output_file'] = os.path.join(output_dir, 'info.jsonl.gz')
+        set_module_args(args)
+        obj = self.get_info_mock_object('net_port')
+        obj.writer = netapp_utils.InfoStreamWriter(obj.module, obj.output_file)
+        manifest = obj.collect_info('net_port_info')
+        obj.writer.close()
+        assert manifest == dict(output_file=obj.output_file, offset=0, length=os.path.getsize(obj.output_file), num_records=2)
+        with gzip.open(obj.output_file, 'rb') as output:
+            records = [json.loads(line) for line in output.read().decode().splitlines()]
+        assert [list(record) for record in records] == [['node_0:port_0'], ['node_1:port_1']]
+        assert obj.thread_data.section is None
+
+    def test_plan_fields_nested(self):
+        '''nested paths are merged, and a container wins over its attributes'''
+        args = self.mock_args()
+        args['fields'] = {'volume_info': ['volume-space-attributes.size', 'volume_id_attributes', 'volume-space-attributes.size-used']}
+        set_module_args(args)
+        obj = self.get_info_mock_object()
+        obj.plan_fields(['volume_info', 'lun_info'])
+        assert obj.info_subsets['volume_info']['kwargs']['desired_attributes'] == {
+            'volume-attributes': {
+                'volume-id-attributes': None,
+                'volume-space-attributes': {'size': None, 'size-used': None}}}
+        assert 'desired_attributes' not in obj.info_subsets['lun_info']['kwargs']
+        assert obj.paths_to_tree('lun-info', ['a.b', 'a', 'a.c']) == {'a': None}
+
+    def test_plan_fields_errors(self):
+        '''fields for a subset that is not gathered or not supported are rejected'''
+        args = self.mock_args()
+        args['fields'] = {'volume_info': ['volume-space-attributes.size']}
+        set_module_args(args)
+        obj = self.get_info_mock_object()
+        with pytest.raises(AnsibleFailJson) as exc:
+            obj.plan_fields(['lun_info'])
+        assert exc.value.args[0]['msg'] == 'Error: fields is set for subsets that are not gathered: volume_info'
+        obj.fields = {'ontap_version': ['version']}
+        with pytest.raises(AnsibleFailJson) as exc:
+            obj.plan_fields(['ontap_version'])
+        assert exc.value.args[0]['msg'] == 'Error: fields is not supported for subset: ontap_version'
+        obj.fields = {'volume_info': []}
+        with pytest.raises(AnsibleFailJson) as exc:
+            obj.plan_fields(['volume_info'])
+        assert exc.value.args[0]['msg'] == 'Error: expecting a list of attributes for subset volume_info in fields, got: []'
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.setup_na_ontap_zapi')
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.ems_log_event')
+    def test_get_all_in_parallel(self, mock_ems_log, mock_setup):
+        '''subsets are collected by workers, net_ifgrp_info after net_port_info'''
+        args = self.mock_args()
+        args['parallelism'] = 2
+        set_module_args(args)
+        connections = list()
+        calls = list()
+
+        def new_connection(*args, **kwargs):
+            connection = MockONTAPConnection('by_call')
+            invoke = connection.invoke_successfully
+
+            def record_call(xml, enable_tunneling):
+                calls.append(xml.get_name())
+                return invoke(xml, enable_tunneling)
+            connection.invoke_successfully = record_call
+            connections.append(connection)
+            return connection
+
+        mock_setup.side_effect = new_connection
+        obj = self.get_info_mock_object('by_call')
+        obj.send_ems_event = lambda: None
+        del connections[:]
+        del calls[:]
+        result = obj.get_all(['net_port_info', 'net_ifgrp_info'])
+        assert sorted(result['net_port_info']) == ['node_0:port_0', 'node_1:port_1']
+        assert sorted(result['net_ifgrp_info']) == ['node_0:ifgrp_0', 'node_1:ifgrp_1']
+        # one connection per worker
+        assert len(connections) == 2
+        # ifgrp info was collected after port info, and did not query ports again
+        assert calls.count('net-port-get-iter') == 1
+        assert calls.index('net-port-get-iter') < calls.index('net-port-ifgrp-get')
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.setup_na_ontap_zapi')
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.ems_log_event')
+    def test_get_ifgrp_info_with_output_file(self, mock_ems_log, mock_setup):
+        '''port records are read again for net_ifgrp_info, as net_port_info only holds the manifest'''
+        for parallelism in (1, 2):
+            output_dir = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, output_dir)
+            args = self.mock_args()
+            args['output_file'] = os.path.join(output_dir, 'info.jsonl')
+            args['parallelism'] = parallelism
+            set_module_args(args)
+            mock_setup.side_effect = lambda *args, **kwargs: MockONTAPConnection('by_call')
+            obj = self.get_info_mock_object('by_call')
+            obj.send_ems_event = lambda: None
+            result = obj.get_all(['net_port_info', 'net_ifgrp_info'])
+            assert result['net_port_info']['num_records'] == 2
+            assert sorted(result['net_ifgrp_info']) == ['node_0:ifgrp_0', 'node_1:ifgrp_1']
+            with open(obj.output_file) as output:
+                records = [json.loads(line) for line in output.read().splitlines()]
+            # only the net_port_info records are written to the file
+            assert sorted(key for record in records for key in record) == ['node_0:port_0', 'node_1:port_1']
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.setup_na_ontap_zapi')
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.ems_log_event')
+    def test_get_all_in_parallel_error(self, mock_ems_log, mock_setup):
+        '''an error in a worker is reported by the main thread'''
+        args = self.mock_args()
+        args['parallelism'] = 4
+        set_module_args(args)
+        mock_setup.side_effect = lambda *args, **kwargs: MockONTAPConnection('by_call')
+        obj = self.get_info_mock_object('by_call')
+        obj.send_ems_event = lambda: None
+        with pytest.raises(AnsibleFailJson) as exc:
+            obj.get_all(['net_port_info', 'cluster_node_info'])
+        assert exc.value.args[0]['msg'] == 'Error calling API cluster-node-get-iter: NetApp API failed. Reason - test:error'
+
     @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_info.NetAppONTAPGatherInfo.get_all')
     def test_main(self, get_all):
         '''test main method.'''
@@ -493,6 +677,50 @@ class TestMyModule(unittest.TestCase):
             for akey in adict:
                 assert akey == self.d2us(key)
 
+    @staticmethod
+    def build_record():
+        from lxml import etree
+        xml = b'''<attributes-list xmlns="http://www.netapp.com/filer/admin">
+                     <snapshot-info>
+                       <name> snap-1 </name>
+                       <volume>vol-1</volume>
+                       <comment/>
+                       <snapshot-owners-list>
+                         <snapshot-owner><owner>owner-1</owner></snapshot-owner>
+                         <snapshot-owner><owner>owner-2</owner></snapshot-owner>
+                         <!-- not a record -->
+                       </snapshot-owners-list>
+                     </snapshot-info>
+                   </attributes-list>'''
+        return netapp_utils.zapi.NaElement(etree.XML(xml)).get_children()[0]
+
+    def test_zapi_to_dict(self):
+        ''' single pass conversion, repeated tags are collected in a list '''
+        expected = {'snapshot-info': {
+            'name': 'snap-1',
+            'volume': 'vol-1',
+            'comment': None,
+            'snapshot-owners-list': {'snapshot-owner': [{'owner': 'owner-1'}, {'owner': 'owner-2'}]}}}
+        assert info_zapi_to_dict(self.build_record()) == expected
+        assert info_zapi_to_dict(self.build_record(), translate_keys=True) == info_convert_keys(expected)
+
+    def test_zapi_to_dict_matches_xmltodict(self):
+        ''' same output as the former xmltodict and json round trip '''
+        xmltodict = pytest.importorskip('xmltodict')
+        record = self.build_record()
+        expected = json.loads(json.dumps(xmltodict.parse(record.to_string(), xml_attribs=False)))
+        assert info_zapi_to_dict(record) == expected
+
+    def test_add_record_with_translated_key_fields(self):
+        ''' key fields are looked up in the translated record, and records are added in place '''
+        set_module_args(self.mock_args())
+        obj = self.get_info_mock_object()
+        out = dict()
+        result = obj.add_record(out, self.build_record(), 'snapshot-get-iter', 'snapshot-info', ('volume', 'name'), 1)
+        assert result is out
+        assert list(out) == ['vol-1:snap-1']
+        assert out['vol-1:snap-1']['snapshot_owners_list']['snapshot_owner'][1] == {'owner': 'owner-2'}
+
     def test_set_error_flags_error_n(self):
         ''' Check set_error__flags return correct dict '''
         args = dict(self.mock_args())
@@ -175,3 +175,57 @@ class TestMyModule(unittest.TestCase):
             self.get_lun_mock_object('lun', 'other_lun_name').apply()
         msg = 'Error renaming lun: lun_from_name does not exist'
         assert msg == exc.value.args[0]['msg']
+
+    def test_get_luns_filters_on_name(self):
+        ''' the name is pushed to ONTAP as a path query '''
+        set_module_args(self.mock_args())
+        my_obj = self.get_lun_mock_object('lun', 'lun_name')
+        luns = list(my_obj.get_luns(name='lun_name'))
+        assert len(luns) == 1
+        query = my_obj.server.xml_in['query']['lun-info']
+        assert query['volume'] == 'vol_name'
+        assert query['path'] == '*/lun_name'
+        list(my_obj.get_luns(lun_path='/vol/vol_name/lun_name'))
+        query = my_obj.server.xml_in['query']['lun-info']
+        assert query['path'] == '/vol/vol_name/lun_name'
+        assert query.get_child_by_name('volume') is None
+
+    def test_find_lun(self):
+        ''' LUNs are matched on path or name, first record wins '''
+        set_module_args(self.mock_args())
+        my_obj = self.get_lun_mock_object()
+        luns = [netapp_utils.zapi.NaElement.create_node_with_children('lun-info', path='/what/ever/%s' % name)
+                for name in ('other', 'lun_name', 'q1/lun_name')]
+        assert my_obj.find_lun(luns, 'lun_name').get_child_content('path') == '/what/ever/lun_name'
+        assert my_obj.find_lun(luns, '/what/ever/q1/lun_name').get_child_content('path') == '/what/ever/q1/lun_name'
+        assert my_obj.find_lun(luns, 'lun_name', '/what/ever/q1/lun_name').get_child_content('path') == '/what/ever/q1/lun_name'
+        assert my_obj.find_lun(luns, 'unknown') is None
+
+    def test_find_lun_stops_at_first_match(self):
+        ''' records after the first match are not read '''
+        set_module_args(self.mock_args())
+        my_obj = self.get_lun_mock_object()
+        read = list()
+
+        def luns():
+            for name in ('other', 'lun_name', 'lun_name2'):
+                read.append(name)
+                yield netapp_utils.zapi.NaElement.create_node_with_children('lun-info', path='/what/ever/%s' % name)
+        assert my_obj.find_lun(luns(), 'lun_name', '/what/ever/lun_name').get_child_content('path') == '/what/ever/lun_name'
+        assert read == ['other', 'lun_name']
+
+    def test_get_lun_details_mapped(self):
+        ''' igroup and LUN id are read for a mapped LUN, last igroup wins '''
+        set_module_args(self.mock_args())
+        my_obj = self.get_lun_mock_object()
+        xml = netapp_utils.zapi.NaElement('xml')
+        xml.translate_struct({'initiator-groups': [
+            {'initiator-group-info': {'initiator-group-name': igroup, 'lun-id': lun_id}} for igroup, lun_id in (('ig1', '1'), ('ig2', '2'))]})
+        my_obj.server = MockONTAPConnection()
+        my_obj.server.invoke_successfully = Mock(return_value=xml)
+        lun = netapp_utils.zapi.NaElement.create_node_with_children('lun-info', path='/vol/v1/l1', mapped='true', size='10')
+        details = my_obj.get_lun_details(lun)
+        assert details['attached_to'] == 'ig2'
+        assert details['lun_id'] == '2'
+        assert my_obj.server.invoke_successfully.call_count == 1
+        assert my_obj.server.invoke_successfully.call_args[0][0]['path'] == '/vol/v1/l1'
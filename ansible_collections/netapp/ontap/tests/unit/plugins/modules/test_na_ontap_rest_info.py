@@ -5,7 +5,13 @@
 
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
+import copy
 import json
+import os
+import shutil
+import tempfile
+import threading
+import time
 import pytest
 
 from ansible.module_utils import basic
@@ -541,3 +547,186 @@ class TestMyModule(unittest.TestCase):
             my_obj.apply()
         print('Info: test_get_all_records_for_volume_info_to_check_next_api_call_functionality_pass: %s' % repr(exc.value.args))
         assert exc.value.args[0]['ontap_info']['storage/volumes']['num_records'] == total_records
+
+    def mock_send_request_by_api(self, in_flight):
+        ''' responses depend on the api, so that the order of concurrent calls does not matter
+            in_flight records the number of concurrent calls, and the maximum
+        '''
+        lock = threading.Lock()
+
+        def send_request(method, api, params, json=None, accept=None):  # pylint: disable=unused-argument,redefined-outer-name
+            with lock:
+                in_flight['current'] += 1
+                in_flight['max'] = max(in_flight['max'], in_flight['current'])
+            time.sleep(0.01)
+            if api == 'cluster':
+                response = SRR['validate_ontap_version_pass']
+            elif api == 'storage/volumes':
+                response = SRR['get_subset_info_with_next']
+            elif api == 'next_record_api':
+                response = SRR['get_next_record']
+            elif api == 'storage/luns':
+                response = (200, None, {'message': 'lun error', 'code': 4})
+            else:
+                response = SRR['get_subset_info']
+            with lock:
+                in_flight['current'] -= 1
+            return copy.deepcopy(response)
+        return send_request
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_get_subsets_in_parallel(self, mock_request):
+        args = self.set_args_get_all_records_for_volume_info_to_check_next_api_call_functionality_pass()
+        args['gather_subset'] = ['volume_info', 'aggregate_info', 'vserver_info', 'disk_info']
+        args['parallelism'] = 2
+        set_module_args(args)
+        my_obj = ontap_rest_info_module()
+        in_flight = dict(current=0, max=0)
+        mock_request.side_effect = self.mock_send_request_by_api(in_flight)
+
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        print('Info: test_get_subsets_in_parallel: %s' % repr(exc.value.args))
+        ontap_info = exc.value.args[0]['ontap_info']
+        assert set(ontap_info) == set(['storage/volumes', 'storage/aggregates', 'svm/svms', 'storage/disks'])
+        assert ontap_info['storage/volumes']['num_records'] == 5
+        assert ontap_info['storage/disks']['num_records'] == 3
+        assert in_flight['max'] <= 2
+        assert my_obj.page_pool is None
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_get_subsets_in_parallel_error(self, mock_request):
+        args = self.set_args_get_all_records_for_volume_info_to_check_next_api_call_functionality_pass()
+        args['gather_subset'] = ['volume_info', 'storage_luns_info']
+        args['parallelism'] = 4
+        set_module_args(args)
+        my_obj = ontap_rest_info_module()
+        in_flight = dict(current=0, max=0)
+        mock_request.side_effect = self.mock_send_request_by_api(in_flight)
+
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.apply()
+        print('Info: test_get_subsets_in_parallel_error: %s' % repr(exc.value.args))
+        assert exc.value.args[0]['msg'] == {'message': 'lun error', 'code': 4}
+
+    def test_parallelism_error(self):
+        args = self.set_args_run_ontap_gather_facts_for_vserver_info()
+        args['parallelism'] = 0
+        set_module_args(args)
+        with pytest.raises(AnsibleFailJson) as exc:
+            ontap_rest_info_module()
+        assert exc.value.args[0]['msg'] == 'Error: parallelism must be at least 1, got: 0'
+
+    def set_args_incremental(self, gather_subset):
+        snapshot_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, snapshot_dir)
+        args = self.set_default_args()
+        args.update(gather_subset=gather_subset, incremental=True, snapshot_dir=snapshot_dir)
+        self.snapshot_dir = snapshot_dir
+        return args
+
+    @staticmethod
+    def volumes(*names):
+        return (200, {'_links': {'self': {'href': 'dummy_href'}}, 'num_records': len(names),
+                      'records': [{'uuid': name[:4], 'name': name} for name in names]}, None)
+
+    def run_incremental(self, mock_request, responses):
+        mock_request.side_effect = [SRR['validate_ontap_version_pass']] + responses
+        with pytest.raises(AnsibleExitJson) as exc:
+            ontap_rest_info_module().apply()
+        return exc.value.args[0]
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_incremental_compares_hashes(self, mock_request):
+        set_module_args(self.set_args_incremental(['volume_info']))
+        result = self.run_incremental(mock_request, [self.volumes('vol1', 'vol2', 'vol3')])
+        delta = result['ontap_delta']['storage/volumes']
+        assert delta['full_sync']
+        assert [record['name'] for record in delta['added']] == ['vol1', 'vol2', 'vol3']
+        # vol2 is renamed, vol3 is removed, vol4 is added
+        result = self.run_incremental(mock_request, [self.volumes('vol1', 'vol2_new', 'vol4')])
+        delta = result['ontap_delta']['storage/volumes']
+        assert not delta['full_sync']
+        assert delta['server_filter'] is None
+        assert [record['name'] for record in delta['added']] == ['vol4']
+        assert [record['name'] for record in delta['changed']] == ['vol2_new']
+        assert [record['name'] for record in delta['removed']] == ['vol3']
+        assert [record['name'] for record in result['ontap_info']['storage/volumes']['records']] == ['vol1', 'vol2_new', 'vol4']
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_incremental_server_filter(self, mock_request):
+        set_module_args(self.set_args_incremental(['support/ems/events']))
+
+        def events(*indexes):
+            return (200, {'_links': {'self': {'href': 'dummy_href'}}, 'num_records': len(indexes),
+                          'records': [{'index': index, 'time': '2021-01-0%dT00:00:00Z' % index,
+                                       '_links': {'self': {'href': '/api/support/ems/events/node1/%d' % index}}}
+                                      for index in indexes]}, None)
+        self.run_incremental(mock_request, [events(1, 2)])
+        assert 'time' not in mock_request.call_args[0][2]
+        result = self.run_incremental(mock_request, [events(2, 3)])
+        assert mock_request.call_args[0][2]['time'] == '>=2021-01-02T00:00:00Z'
+        delta = result['ontap_delta']['support/ems/events']
+        assert delta['server_filter'] == {'time': '>=2021-01-02T00:00:00Z'}
+        assert [record['index'] for record in delta['added']] == [3]
+        assert delta['changed'] == delta['removed'] == []
+        assert delta['watermark'] == '2021-01-03T00:00:00Z'
+        # only the records read in this run are reported
+        assert [record['index'] for record in result['ontap_info']['support/ems/events']['records']] == [2, 3]
+        # the snapshot only keeps the records at the watermark
+        snapshot_files = [os.path.join(root, name) for root, dirs, names in os.walk(self.snapshot_dir) for name in names]
+        assert len(snapshot_files) == 1
+        with open(snapshot_files[0]) as snapshot_file:
+            assert len(json.load(snapshot_file)['records']) == 1
+        # no new event, the watermark is kept
+        result = self.run_incremental(mock_request, [events()])
+        assert mock_request.call_args[0][2]['time'] == '>=2021-01-03T00:00:00Z'
+        assert result['ontap_delta']['support/ems/events']['watermark'] == '2021-01-03T00:00:00Z'
+        result = self.run_incremental(mock_request, [events(3, 4)])
+        assert mock_request.call_args[0][2]['time'] == '>=2021-01-03T00:00:00Z'
+        assert [record['index'] for record in result['ontap_delta']['support/ems/events']['added']] == [4]
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_incremental_new_snapshot_when_fields_change_or_check_mode(self, mock_request):
+        args = self.set_args_incremental(['volume_info'])
+        set_module_args(args)
+        self.run_incremental(mock_request, [self.volumes('vol1')])
+        args['fields'] = ['name']
+        args['_ansible_check_mode'] = True
+        set_module_args(args)
+        result = self.run_incremental(mock_request, [self.volumes('vol1', 'vol2')])
+        assert result['ontap_delta']['storage/volumes']['full_sync']
+        # the snapshot is not updated in check mode
+        result = self.run_incremental(mock_request, [self.volumes('vol1', 'vol2')])
+        assert result['ontap_delta']['storage/volumes']['full_sync']
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_incremental_records_without_key(self, mock_request):
+        set_module_args(self.set_args_incremental(['volume_info']))
+        result = self.run_incremental(mock_request, [SRR['get_subset_info']])
+        assert result['ontap_delta'] == {}
+        assert result['ontap_info']['storage/volumes']['num_records'] == 3
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_output_file(self, mock_request):
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+        args = self.set_args_get_all_records_for_volume_info_to_check_next_api_call_functionality_pass()
+        args['gather_subset'] = ['volume_info', 'aggregate_info']
+        args['output_file'] = output_dir + '/info.jsonl'
+        args['parallelism'] = 2
+        set_module_args(args)
+        my_obj = ontap_rest_info_module()
+        mock_request.side_effect = self.mock_send_request_by_api(dict(current=0, max=0))
+
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        ontap_info = exc.value.args[0]['ontap_info']
+        assert ontap_info['storage/volumes']['num_records'] == 5
+        assert ontap_info['storage/aggregates']['num_records'] == 3
+        with open(args['output_file'], 'rb') as output:
+            for subset in ontap_info:
+                output.seek(ontap_info[subset]['offset'])
+                lines = output.read(ontap_info[subset]['length']).decode().splitlines()
+                assert len(lines) == ontap_info[subset]['num_records']
+                assert json.loads(lines[0]) == {'name': 'dummy_vol1'}
@@ -993,7 +993,7 @@ class TestMyModule(unittest.TestCase):
         job = 'job_info'
         success = 'success_modify_async'
         mount = 'job_info'  # not correct, but works
-        kind = [online, job, job, success, mount, job, job]
+        kind = [online, job, success, mount, job]
         obj = self.get_volume_mock_object(kind)
         with pytest.raises(AnsibleExitJson) as exc:
             obj.apply()
@@ -1015,7 +1015,7 @@ class TestMyModule(unittest.TestCase):
         set_module_args(data)
         obj = self.get_volume_mock_object('job_info', job_error='time_out')
         result = obj.check_job_status('123')
-        assert result == 'job completion exceeded expected timer of: 0 seconds'
+        assert result == 'job completion exceeded expected timer of: 0 seconds, after 1 poll(s) in 0.0 seconds'
 
     def test_check_job_status_unexpected(self):
         ''' Test check job status unexpected state '''
@@ -55,4 +55,35 @@ requirements:
 notes:
   - The modules prefixed with na\\_um are built to support the AIQUM/OCUM 9.7 platform.
 
+'''
+
+    # Documentation fragment for the options used to list records with AIQUM/OCUM (um_list)
+    UM_LIST = r'''
+options:
+  max_records:
+      description:
+      - Maximum number of records returned in a single call.
+      - All the records are returned, following next links or using offsets to read one page at a time.
+      type: int
+      default: 1000
+      version_added: '21.1.0'
+  fields:
+      description:
+      - Fields to return for each record.  All fields are returned if not set.
+      type: list
+      elements: str
+      version_added: '21.1.0'
+  order_by:
+      description:
+      - Sort the records on a field, with an optional asc or desc suffix, eg C(name desc).
+      type: str
+      version_added: '21.1.0'
+  parallelism:
+      description:
+      - Maximum number of pages requested concurrently.
+      - With a value greater than 1, pages after the first one are requested concurrently using offsets.
+        Records created or deleted while they are read may be missed or reported twice.
+      type: int
+      default: 1
+      version_added: '21.1.0'
 '''
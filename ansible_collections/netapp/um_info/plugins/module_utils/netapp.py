@@ -34,7 +34,11 @@ common routines for um_info
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+from collections import deque
+from multiprocessing.pool import ThreadPool
 from ansible.module_utils.basic import missing_required_lib
+from ansible.module_utils.six import binary_type, text_type
+from ansible.module_utils.six.moves.urllib.parse import parse_qsl
 
 try:
     from ansible.module_utils.ansible_release import __version__ as ansible_version
@@ -65,9 +69,60 @@ def na_um_host_argument_spec():
     )
 
 
+def na_um_list_argument_spec():
+
+    return dict(
+        max_records=dict(required=False, type='int', default=1000),
+        fields=dict(required=False, type='list', elements='str'),
+        order_by=dict(required=False, type='str'),
+        parallelism=dict(required=False, type='int', default=1),
+    )
+
+
+class DebugLog(object):
+    ''' log of (status_code, message) records, optionally limited to max_entries records of max_size characters
+        same as DebugLog in netapp.ontap, as collections cannot share module_utils
+    '''
+    def __init__(self, max_entries=None, max_size=None):
+        self.records = deque(maxlen=max_entries)
+        self.max_entries = max_entries
+        self.max_size = max_size
+
+    def append(self, record):
+        if self.max_entries == 0:
+            return
+        status_code, message = record
+        if not callable(message):
+            # truncate early, so that large responses are not kept in memory
+            message = self.truncate(message)
+        self.records.append((status_code, message))
+
+    def truncate(self, message):
+        if self.max_size is not None and isinstance(message, (binary_type, text_type)) and len(message) > self.max_size:
+            suffix = '... (%d bytes truncated)' % (len(message) - self.max_size)
+            return message[:self.max_size] + (suffix.encode() if isinstance(message, binary_type) else suffix)
+        return message
+
+    def format(self, record):
+        status_code, message = record
+        if callable(message):
+            message = self.truncate(message())
+        return status_code, message
+
+    def __getitem__(self, index):
+        return self.format(self.records[index])
+
+    def __iter__(self):
+        for record in list(self.records):
+            yield self.format(record)
+
+    def __len__(self):
+        return len(self.records)
+
+
 class UMRestAPI(object):
     ''' send REST request and process response '''
-    def __init__(self, module, timeout=60):
+    def __init__(self, module, timeout=60, debug_log_max_entries=100, debug_log_max_size=1024):
         self.module = module
         self.username = self.module.params['username']
         self.password = self.module.params['password']
@@ -79,7 +134,8 @@ class UMRestAPI(object):
         else:
             self.url = 'https://%s/api/' % self.hostname
         self.errors = list()
-        self.debug_logs = list()
+        # bounded by default, so that response bodies are not all kept in memory, None for no limit
+        self.debug_logs = DebugLog(debug_log_max_entries, debug_log_max_size)
         self.check_required_library()
 
     def check_required_library(self):
@@ -140,6 +196,65 @@ class UMRestAPI(object):
         method = 'GET'
         return self.send_request(method, api, params)
 
+    def get_pages(self, api, params=None, max_records=None, fields=None, order_by=None, parallelism=1):
+        ''' iterator over the pages of a collection, yields (records, error), and stops after an error
+            next links are followed, one page at a time
+            with parallelism > 1, the remaining pages are requested concurrently using offsets, and yielded in order
+        '''
+        params = dict(params or dict())
+        if max_records is not None:
+            params['max_records'] = max_records
+        if fields:
+            params['fields'] = ','.join(fields)
+        if order_by is not None:
+            params['order_by'] = order_by
+        message, error = self.get(api, params)
+        if error:
+            yield None, error
+            return
+        records = (message.get('records') or list()) if message else list()
+        yield records, None
+        if not records:
+            return
+        total_records = message.get('total_records')
+        if parallelism > 1 and isinstance(total_records, int) and total_records > len(records):
+            for records, error in self.get_pages_by_offset(api, params, len(records), total_records, parallelism):
+                yield records, error
+                if error:
+                    return
+            return
+        next_link = message.get('_links', dict()).get('next', dict()).get('href')
+        while next_link:
+            path, dummy, query = next_link.partition('?')
+            message, error = self.get(path.split('/api/', 1)[-1], dict(parse_qsl(query)))
+            if error:
+                yield None, error
+                return
+            yield message.get('records') or list(), None
+            next_link = message.get('_links', dict()).get('next', dict()).get('href')
+
+    def get_pages_by_offset(self, api, params, page_size, total_records, parallelism):
+        ''' request pages after the first one concurrently, yield (records, error) in order '''
+        offsets = list(range(page_size, total_records, page_size))
+        pool = ThreadPool(processes=min(parallelism, len(offsets)))
+        try:
+            results = pool.imap(lambda offset: self.get(api, dict(params, offset=offset, max_records=page_size)), offsets)
+            for message, error in results:
+                yield (None, error) if error else (message.get('records') or list(), None)
+                if error:
+                    return
+        finally:
+            pool.terminate()
+
+    def get_records(self, api, params=None, max_records=None, fields=None, order_by=None, parallelism=1):
+        ''' return all the records for a collection, and an error if any '''
+        all_records = list()
+        for records, error in self.get_pages(api, params, max_records, fields, order_by, parallelism):
+            if error:
+                return None, error
+            all_records.extend(records)
+        return all_records, None
+
     def log_error(self, status_code, message):
         self.errors.append(message)
         self.debug_logs.append((status_code, message))
@@ -21,11 +21,13 @@ module: na_um_list_aggregates
 short_description: NetApp Unified Manager list aggregates.
 extends_documentation_fragment:
     - netapp.um_info.netapp.um
+    - netapp.um_info.netapp.um_list
 version_added: '20.5.0'
 author: NetApp Ansible Team (@carchi8py) <ng-ansibleteam@netapp.com>
 
 description:
 - List Aggregates on AIQUM/OCUM.
+- Records are sorted on performance_capacity.used, unless order_by is set.
 '''
 
 EXAMPLES = """
@@ -115,6 +117,7 @@ class NetAppUMAggregate(object):
 
     def __init__(self):
         self.argument_spec = netapp_utils.na_um_host_argument_spec()
+        self.argument_spec.update(netapp_utils.na_um_list_argument_spec())
         self.module = AnsibleModule(
             argument_spec=self.argument_spec,
             supports_check_mode=True
@@ -132,14 +135,14 @@ class NetAppUMAggregate(object):
             Dictionary of current details if aggregates found
             None if aggregates is not found
         """
-        data = {}
-        api = "datacenter/storage/aggregates?order_by=performance_capacity.used"
-        message, error = self.rest_api.get(api, data)
+        api = "datacenter/storage/aggregates"
+        records, error = self.rest_api.get_records(api, max_records=self.parameters['max_records'],
+                                                   fields=self.parameters.get('fields'),
+                                                   order_by=self.parameters.get('order_by', 'performance_capacity.used'),
+                                                   parallelism=self.parameters['parallelism'])
         if error:
             self.module.fail_json(msg=error)
-        if message['total_records'] != 0:
-            return message['records']
-        return []
+        return records
 
     def apply(self):
         """
@@ -21,11 +21,13 @@ module: na_um_list_nodes
 short_description: NetApp Unified Manager list nodes.
 extends_documentation_fragment:
     - netapp.um_info.netapp.um
+    - netapp.um_info.netapp.um_list
 version_added: '20.5.0'
 author: NetApp Ansible Team (@carchi8py) <ng-ansibleteam@netapp.com>
 
 description:
 - List Nodes on AIQUM/OCUM.
+- Records are sorted on performance_capacity.used, unless order_by is set.
 '''
 
 EXAMPLES = """
@@ -97,6 +99,7 @@ class NetAppUMNode(object):
 
     def __init__(self):
         self.argument_spec = netapp_utils.na_um_host_argument_spec()
+        self.argument_spec.update(netapp_utils.na_um_list_argument_spec())
         self.module = AnsibleModule(
             argument_spec=self.argument_spec,
             supports_check_mode=True
@@ -114,14 +117,14 @@ class NetAppUMNode(object):
             Dictionary of current details if nodes found
             None if nodes is not found
         """
-        data = {}
-        api = "datacenter/cluster/nodes?order_by=performance_capacity.used"
-        message, error = self.rest_api.get(api, data)
+        api = "datacenter/cluster/nodes"
+        records, error = self.rest_api.get_records(api, max_records=self.parameters['max_records'],
+                                                   fields=self.parameters.get('fields'),
+                                                   order_by=self.parameters.get('order_by', 'performance_capacity.used'),
+                                                   parallelism=self.parameters['parallelism'])
         if error:
             self.module.fail_json(msg=error)
-        if message['total_records'] != 0:
-            return message['records']
-        return []
+        return records
 
     def apply(self):
         """
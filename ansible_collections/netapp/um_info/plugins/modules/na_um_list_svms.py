@@ -21,6 +21,7 @@ module: na_um_list_svms
 short_description: NetApp Unified Manager list svms.
 extends_documentation_fragment:
     - netapp.um_info.netapp.um
+    - netapp.um_info.netapp.um_list
 version_added: '20.5.0'
 author: NetApp Ansible Team (@carchi8py) <ng-ansibleteam@netapp.com>
 
@@ -126,6 +127,7 @@ class NetAppUMSVM(object):
 
     def __init__(self):
         self.argument_spec = netapp_utils.na_um_host_argument_spec()
+        self.argument_spec.update(netapp_utils.na_um_list_argument_spec())
         self.module = AnsibleModule(
             argument_spec=self.argument_spec,
             supports_check_mode=True
@@ -143,14 +145,14 @@ class NetAppUMSVM(object):
             Dictionary of current details if svms found
             None if svms is not found
         """
-        data = {}
         api = "datacenter/svm/svms"
-        message, error = self.rest_api.get(api, data)
+        records, error = self.rest_api.get_records(api, max_records=self.parameters['max_records'],
+                                                   fields=self.parameters.get('fields'),
+                                                   order_by=self.parameters.get('order_by'),
+                                                   parallelism=self.parameters['parallelism'])
         if error:
             self.module.fail_json(msg=error)
-        if message['total_records'] != 0:
-            return message['records']
-        return []
+        return records
 
     def apply(self):
         """
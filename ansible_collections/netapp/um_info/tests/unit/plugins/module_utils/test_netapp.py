@@ -0,0 +1,125 @@
+# Copyright (c) 2021 NetApp
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' unit tests for module_utils netapp.py '''
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.netapp.um_info.tests.unit.compat.mock import patch
+import ansible_collections.netapp.um_info.plugins.module_utils.netapp as netapp_utils
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)  # pylint: disable=protected-access
+
+
+def create_restapi_object(**kwargs):
+    set_module_args(dict(hostname='test', username='test_user', password='test_pass!'))
+    module = basic.AnsibleModule(netapp_utils.na_um_host_argument_spec())
+    return netapp_utils.UMRestAPI(module, **kwargs)
+
+
+class MockResponse(object):
+    ''' mock a response from requests '''
+
+    def __init__(self, json_dict):
+        self.status_code = 200
+        self.json_dict = json_dict
+        self.content = json.dumps(json_dict).encode()
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.json_dict
+
+
+@patch('requests.request')
+def test_debug_log_is_bounded_and_truncated(mock_request):
+    ''' only the last records are kept, and large responses are truncated '''
+    mock_request.return_value = MockResponse({'records': [{'name': 'x' * 2000}]})
+    rest_api = create_restapi_object(debug_log_max_entries=2)
+    for dummy in range(3):
+        rest_api.get('datacenter/storage/volumes', None)
+    assert len(rest_api.debug_logs) == 2
+    status_code, message = rest_api.debug_logs[-1]
+    assert status_code == 200
+    assert message.endswith(b'bytes truncated)')
+    assert len(message) < 1100
+
+
+@patch('requests.request')
+def test_debug_log_is_bounded_by_default(mock_request):
+    ''' the last 100 records are kept, truncated to 1024 characters '''
+    mock_request.return_value = MockResponse({'records': [{'name': 'x' * 2000}]})
+    rest_api = create_restapi_object()
+    for dummy in range(150):
+        rest_api.get('datacenter/storage/volumes', None)
+    assert len(rest_api.debug_logs) == 100
+    assert len(rest_api.debug_logs[-1][1]) < 1100
+
+
+@patch('requests.request')
+def test_debug_log_no_limit(mock_request):
+    ''' all records are kept in full when the limits are None '''
+    mock_request.return_value = MockResponse({'records': [{'name': 'x' * 2000}]})
+    rest_api = create_restapi_object(debug_log_max_entries=None, debug_log_max_size=None)
+    for dummy in range(150):
+        rest_api.get('datacenter/storage/volumes', None)
+    assert len(rest_api.debug_logs) == 150
+    assert len(rest_api.debug_logs[-1][1]) > 2000
+
+
+def mock_get_by_offset(total_records, calls):
+    ''' pages of records, with next links, for offset and max_records '''
+    def get(api, params):
+        calls.append((api, dict(params)))
+        offset, max_records = int(params.get('offset', 0)), int(params['max_records'])
+        end = min(offset + max_records, total_records)
+        message = dict(records=[dict(key=index) for index in range(offset, end)], total_records=total_records, _links=dict())
+        if end < total_records:
+            message['_links']['next'] = dict(href='/api/%s?offset=%d&max_records=%d' % (api, end, max_records))
+        return message, None
+    return get
+
+
+def test_get_records_follows_next_links():
+    rest_api = create_restapi_object()
+    calls = list()
+    rest_api.get = mock_get_by_offset(25, calls)
+    records, error = rest_api.get_records('datacenter/storage/volumes', max_records=10, fields=['name', 'uuid'], order_by='name')
+    assert error is None
+    assert [record['key'] for record in records] == list(range(25))
+    assert calls[0] == ('datacenter/storage/volumes', dict(max_records=10, fields='name,uuid', order_by='name'))
+    assert calls[1] == ('datacenter/storage/volumes', dict(offset='10', max_records='10'))
+    assert len(calls) == 3
+
+
+def test_get_records_in_parallel():
+    rest_api = create_restapi_object()
+    calls = list()
+    rest_api.get = mock_get_by_offset(95, calls)
+    records, error = rest_api.get_records('datacenter/storage/volumes', max_records=10, order_by='name', parallelism=4)
+    assert error is None
+    assert [record['key'] for record in records] == list(range(95))
+    assert len(calls) == 10
+    assert sorted(params['offset'] for api, params in calls[1:]) == list(range(10, 95, 10))
+    assert all(params['order_by'] == 'name' for api, params in calls)
+
+
+def test_get_records_error():
+    rest_api = create_restapi_object()
+    calls = list()
+    get = mock_get_by_offset(25, calls)
+    rest_api.get = lambda api, params: (None, 'page error') if 'offset' in params else get(api, params)
+    for parallelism in (1, 2):
+        assert rest_api.get_records('datacenter/storage/volumes', max_records=10, parallelism=parallelism) == (None, 'page error')
+    pages = list(rest_api.get_pages('datacenter/storage/volumes', max_records=10))
+    assert [error for records, error in pages] == [None, 'page error']
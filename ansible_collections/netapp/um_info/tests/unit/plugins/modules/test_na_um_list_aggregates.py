@@ -118,3 +118,12 @@ class TestMyModule(unittest.TestCase):
         my_obj = my_module()
         my_obj.get_aggregates = Mock(return_value=SRR['get_aggregates'])
         assert my_obj.get_aggregates() is not None
+
+    def test_get_aggregates_default_order(self):
+        ''' aggregates are sorted on performance capacity, unless order_by is set '''
+        set_module_args(self.set_default_args())
+        my_obj = my_module()
+        my_obj.rest_api.get_records = Mock(return_value=([SRR['get_aggregates']], None))
+        assert my_obj.get_aggregates() == [SRR['get_aggregates']]
+        my_obj.rest_api.get_records.assert_called_once_with('datacenter/storage/aggregates', max_records=1000, fields=None,
+                                                            order_by='performance_capacity.used', parallelism=1)
@@ -117,3 +117,18 @@ class TestMyModule(unittest.TestCase):
         my_obj = my_module()
         my_obj.get_volumes = Mock(return_value=SRR['get_volumes'])
         assert my_obj.get_volumes() is not None
+
+    def test_get_volumes_all_pages(self):
+        ''' list options are passed to get_records '''
+        args = self.set_default_args()
+        args.update(max_records=500, fields=['name'], parallelism=2)
+        set_module_args(args)
+        my_obj = my_module()
+        my_obj.rest_api.get_records = Mock(return_value=([SRR['get_volumes']], None))
+        assert my_obj.get_volumes() == [SRR['get_volumes']]
+        my_obj.rest_api.get_records.assert_called_once_with('datacenter/storage/volumes', max_records=500, fields=['name'],
+                                                            order_by=None, parallelism=2)
+        my_obj.rest_api.get_records = Mock(return_value=(None, SRR['generic_error'][1]))
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.get_volumes()
+        assert exc.value.args[0]['msg'] == 'Expected error'